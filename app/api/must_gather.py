@@ -1,14 +1,19 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request
 from fastapi.responses import HTMLResponse
-from typing import Optional
+from typing import List, Optional
 import os
+import re
+import asyncio
+import contextlib
 import tempfile
-import shutil
-import zipfile
-import tarfile
+from dataclasses import asdict
 from pathlib import Path
 import logging
-from app.services.must_gather_agent import MustGatherAgent, MustGatherAnalysis
+from app.services.must_gather_agent import MustGatherAgent, MustGatherAnalysis, analysis_to_dict
+from app.services.must_gather_analyzer import must_gather_analyzer
+from app.services.must_gather_jobs import must_gather_jobs
+from app.services.must_gather_patterns import DEFAULT_CLASSIFIER
+from app.services.must_gather_timeline import get_log_timeline, timeline_executor
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +27,49 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "must-gather-analyzer"}
 
+class _ChunkPipe:
+    """Blocking file-like reader fed with chunks from the event loop, for streaming tar parsing
+    
+    Chunks pass through a bounded asyncio queue: feeding awaits on the event loop and only
+    the reading scan thread blocks, so a stalled upload never holds an executor thread.
+    """
+    
+    def __init__(self, max_chunks: int = 64):
+        self._loop = asyncio.get_running_loop()
+        # Bounded so a slow analysis applies backpressure to the upload
+        self._chunks = asyncio.Queue(maxsize=max_chunks)
+        self._buffer = b""
+        self._eof = False
+        self._abandoned = False
+    
+    async def feed(self, chunk: bytes):
+        if not self._abandoned:
+            await self._chunks.put(chunk)
+    
+    async def close(self):
+        await self.feed(b"")
+    
+    def abandon(self):
+        """Stop accepting data once the reader has finished, failed or was cancelled (called on the event loop)"""
+        self._abandoned = True
+        # Unblock a feed waiting for room
+        while not self._chunks.empty():
+            self._chunks.get_nowait()
+        # A reader still in a scan thread after its task was cancelled sees the end of the data
+        self._chunks.put_nowait(b"")
+    
+    def read(self, size: int = -1) -> bytes:
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            chunk = asyncio.run_coroutine_threadsafe(self._chunks.get(), self._loop).result()
+            if not chunk:
+                self._eof = True
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
 @must_gather_router.post("/analyze")
 async def analyze_must_gather(
     must_gather_file: UploadFile = File(...),
@@ -30,87 +78,82 @@ async def analyze_must_gather(
 ):
     """
     Analyze must-gather logs from uploaded file
+    
+    Archives are analyzed member by member straight from the upload, without extraction.
+    The analysis runs inside the request; kept for API compatibility, clients should
+    prefer /jobs/upload, which returns a job id immediately.
     """
     try:
-        # Create temporary directory for extraction
-        with tempfile.TemporaryDirectory() as temp_dir:
-            logger.info(f"Processing must-gather file: {must_gather_file.filename}")
-            
-            # Save uploaded file
-            file_path = os.path.join(temp_dir, must_gather_file.filename)
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(must_gather_file.file, buffer)
-            
-            # Extract if it's an archive file
-            extract_path = temp_dir
-            lower_name = must_gather_file.filename.lower()
-            if lower_name.endswith('.zip'):
-                extract_path = os.path.join(temp_dir, "extracted")
-                os.makedirs(extract_path, exist_ok=True)
-                
-                with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                    zip_ref.extractall(extract_path)
-                
-                # Find the must-gather directory
-                for item in os.listdir(extract_path):
-                    item_path = os.path.join(extract_path, item)
-                    if os.path.isdir(item_path):
-                        extract_path = item_path
-                        break
-            elif lower_name.endswith('.tar') or lower_name.endswith('.tar.gz') or lower_name.endswith('.tgz') or lower_name.endswith('.tar.bz2'):
-                extract_path = os.path.join(temp_dir, "extracted")
-                os.makedirs(extract_path, exist_ok=True)
-                
-                with tarfile.open(file_path, 'r:*') as tar_ref:
-                    tar_ref.extractall(extract_path)
-                
-                # Find the must-gather directory
-                for item in os.listdir(extract_path):
-                    item_path = os.path.join(extract_path, item)
-                    if os.path.isdir(item_path):
-                        extract_path = item_path
-                        break
-            
-            # Analyze the must-gather logs
-            analysis = await must_gather_agent.analyze_must_gather(extract_path, model_preference)
-            
-            # Prepare response
-            response = {
-                "status": "success",
-                "cluster_name": cluster_name or "Unknown",
-                "analysis": {
-                    "summary": analysis.summary,
-                    "root_cause": analysis.root_cause,
-                    "priority": analysis.priority,
-                    "immediate_actions": analysis.immediate_actions,
-                    "long_term_recommendations": analysis.long_term_recommendations,
-                    "next_steps": analysis.next_steps,
-                    "issues_count": len(analysis.issues),
-                    "issues": [
-                        {
-                            "type": issue.issue_type,
-                            "severity": issue.severity,
-                            "description": issue.description,
-                            "affected_components": issue.affected_components,
-                            "recommendations": issue.recommendations,
-                            "evidence_count": len(issue.evidence),
-                            "evidence": issue.evidence[:3]  # Include first 3 evidence items
-                        }
-                        for issue in analysis.issues
-                    ],
-                    "log_evidence": analysis.log_evidence or [],
-                    "analysis_metadata": analysis.analysis_metadata or {},
-                    "confidence": getattr(analysis, 'confidence', 85),
-                    "files_analyzed": getattr(analysis, 'files_analyzed', 'Multiple log files')
-                }
-            }
-            
-            return response
+        logger.info(f"Processing must-gather file: {must_gather_file.filename}")
+        
+        analysis = await must_gather_agent.analyze_must_gather_archive(
+            must_gather_file.file, must_gather_file.filename, model_preference
+        )
+        
+        return {
+            "status": "success",
+            "cluster_name": cluster_name or "Unknown",
+            "analysis": analysis_to_dict(analysis)
+        }
         
     except Exception as e:
         logger.error(f"Error analyzing must-gather: {e}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+@must_gather_router.post("/analyze-stream")
+async def analyze_must_gather_stream(
+    request: Request,
+    filename: str,
+    cluster_name: Optional[str] = None,
+    model_preference: Optional[str] = "ollama"
+):
+    """
+    Analyze a must-gather tar archive sent as the raw request body
+    
+    Analysis starts on the first bytes received and overlaps with the rest of the upload.
+    Zip archives need their central directory, so they are spooled to a temporary file first.
+    """
+    try:
+        logger.info(f"Streaming must-gather upload: {filename}")
+        
+        if filename.lower().endswith('.zip'):
+            with tempfile.TemporaryFile() as spool:
+                async for chunk in request.stream():
+                    spool.write(chunk)
+                spool.seek(0)
+                analysis = await must_gather_agent.analyze_must_gather_archive(spool, filename, model_preference)
+        else:
+            pipe = _ChunkPipe()
+            analysis_task = asyncio.create_task(
+                must_gather_agent.analyze_must_gather_archive(pipe, filename, model_preference)
+            )
+            analysis_task.add_done_callback(lambda _: pipe.abandon())
+            try:
+                async for chunk in request.stream():
+                    if analysis_task.done():
+                        break
+                    if chunk:
+                        await pipe.feed(chunk)
+            except BaseException:
+                # The upload failed (e.g. the client disconnected): stop scanning the partial archive
+                analysis_task.cancel()
+                with contextlib.suppress(Exception, asyncio.CancelledError):
+                    await analysis_task
+                raise
+            finally:
+                await pipe.close()
+            analysis = await analysis_task
+        
+        return {
+            "status": "success",
+            "cluster_name": cluster_name or "Unknown",
+            "analysis": analysis_to_dict(analysis)
+        }
+        
+    except Exception as e:
+        logger.error(f"Error analyzing streamed must-gather: {e}")
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
 @must_gather_router.post("/analyze-path")
 async def analyze_must_gather_path(
     must_gather_path: str = Form(...),
@@ -119,6 +162,9 @@ async def analyze_must_gather_path(
 ):
     """
     Analyze must-gather logs from a local path
+    
+    The analysis runs inside the request; kept for API compatibility, clients should
+    prefer /jobs, which returns a job id immediately.
     """
     try:
         logger.info(f"Analyzing must-gather from path: {must_gather_path}")
@@ -131,31 +177,7 @@ async def analyze_must_gather_path(
             "status": "success",
             "cluster_name": cluster_name or "Unknown",
             "path": must_gather_path,
-            "analysis": {
-                "summary": analysis.summary,
-                "root_cause": analysis.root_cause,
-                "priority": analysis.priority,
-                "immediate_actions": analysis.immediate_actions,
-                "long_term_recommendations": analysis.long_term_recommendations,
-                "next_steps": analysis.next_steps,
-                "issues_count": len(analysis.issues),
-                "issues": [
-                    {
-                        "type": issue.issue_type,
-                        "severity": issue.severity,
-                        "description": issue.description,
-                        "affected_components": issue.affected_components,
-                        "recommendations": issue.recommendations,
-                        "evidence_count": len(issue.evidence),
-                        "evidence": issue.evidence[:3]  # Include first 3 evidence items
-                    }
-                    for issue in analysis.issues
-                ],
-                "log_evidence": analysis.log_evidence or [],
-                "analysis_metadata": analysis.analysis_metadata or {},
-                "confidence": getattr(analysis, 'confidence', 85),
-                "files_analyzed": getattr(analysis, 'files_analyzed', 'Multiple log files')
-            }
+            "analysis": analysis_to_dict(analysis)
         }
         
         return response
@@ -164,16 +186,149 @@ async def analyze_must_gather_path(
         logger.error(f"Error analyzing must-gather path: {e}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+@must_gather_router.post("/compare")
+async def compare_must_gathers(must_gather_paths: List[str] = Form(...)):
+    """
+    Compare two or more must-gathers at local paths; each is diffed against the first
+    
+    Returns added, removed and changed operators, nodes, pods and events.
+    """
+    result = await must_gather_analyzer.compare_must_gathers(must_gather_paths)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return {"status": "success", **result}
+
+@must_gather_router.get("/timeline")
+async def get_log_timeline_window(
+    must_gather_path: str,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    namespaces: Optional[str] = None,
+    pods: Optional[str] = None,
+    grep: Optional[str] = None,
+    errors_only: bool = False,
+    limit: int = 500
+):
+    """
+    Container log lines of a must-gather within a time window, merged across pods in time order
+    
+    since/until take ISO datetimes or times of day (e.g. 10:42) on the collection date;
+    namespaces and pods are comma-separated lists; grep is a case-insensitive regex.
+    """
+    if not os.path.isdir(must_gather_path):
+        raise HTTPException(status_code=404, detail=f"Must-gather path not found: {must_gather_path}")
+    try:
+        pattern = re.compile(grep, re.IGNORECASE) if grep else None
+    except re.error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid grep pattern: {e}")
+    
+    def match(line: str) -> bool:
+        if errors_only and not DEFAULT_CLASSIFIER.is_error(line.lower()):
+            return False
+        return pattern is None or pattern.search(line) is not None
+    
+    def split(value: Optional[str]) -> Optional[list]:
+        return [item.strip() for item in value.split(',') if item.strip()] if value else None
+    
+    try:
+        timeline = get_log_timeline(must_gather_path)
+        entries = await asyncio.get_running_loop().run_in_executor(
+            timeline_executor(), lambda: timeline.query(since, until, split(namespaces), split(pods),
+                                         match if errors_only or pattern else None, limit)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error querying log timeline: {e}")
+        raise HTTPException(status_code=500, detail=f"Timeline query failed: {str(e)}")
+    
+    return {
+        "status": "success",
+        "path": must_gather_path,
+        "count": len(entries),
+        "truncated": len(entries) >= limit,
+        "entries": [asdict(entry) for entry in entries]
+    }
+
+@must_gather_router.post("/jobs")
+async def submit_must_gather_job(
+    must_gather_path: str = Form(...),
+    cluster_name: Optional[str] = Form(None),
+    model_preference: Optional[str] = Form("ollama"),
+    user_id: Optional[str] = Form(None)
+):
+    """
+    Queue analysis of a must-gather at a local path and return its job id immediately
+    
+    Progress is pushed to the /ws connection whose id (sent on connect) is given as user_id.
+    """
+    try:
+        job = await must_gather_jobs.submit_path(must_gather_path, model_preference, cluster_name, user_id)
+        return {"status": "queued", "job_id": job.job_id, "job": job.status_dict()}
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error queueing must-gather job: {e}")
+        raise HTTPException(status_code=500, detail=f"Could not queue analysis: {str(e)}")
+
+@must_gather_router.post("/jobs/upload")
+async def submit_must_gather_upload_job(
+    must_gather_file: UploadFile = File(...),
+    cluster_name: Optional[str] = Form(None),
+    model_preference: Optional[str] = Form("ollama"),
+    user_id: Optional[str] = Form(None)
+):
+    """
+    Queue analysis of an uploaded must-gather archive and return its job id immediately
+    
+    Progress is pushed to the /ws connection whose id (sent on connect) is given as user_id.
+    """
+    try:
+        job = await must_gather_jobs.submit_archive(
+            must_gather_file.file, must_gather_file.filename, model_preference, cluster_name, user_id
+        )
+        return {"status": "queued", "job_id": job.job_id, "job": job.status_dict()}
+    except Exception as e:
+        logger.error(f"Error queueing must-gather upload job: {e}")
+        raise HTTPException(status_code=500, detail=f"Could not queue analysis: {str(e)}")
+
+@must_gather_router.get("/jobs")
+async def list_must_gather_jobs():
+    """
+    List the must-gather jobs of this server run
+    """
+    return {"status": "success", "jobs": must_gather_jobs.list_jobs()}
+
+@must_gather_router.get("/jobs/{job_id}")
+async def get_must_gather_job(job_id: str):
+    """
+    Get the status and progress of a must-gather job
+    """
+    job = must_gather_jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return {"status": "success", "job": job}
+
 @must_gather_router.get("/summary")
 async def get_analysis_summary(analysis_id: str):
     """
     Get a formatted summary of a previous analysis
+    
+    analysis_id is the job id returned by the /jobs endpoints; results are served from storage.
     """
-    # This would typically retrieve from a database
-    # For now, return a placeholder
+    record = must_gather_jobs.get_result(analysis_id)
+    if not record:
+        raise HTTPException(status_code=404, detail=f"Analysis not found: {analysis_id}")
+    
+    job = record["job"]
+    if job["status"] != "completed":
+        return {"status": job["status"], "job": job}
+    
     return {
-        "status": "not_implemented",
-        "message": "Analysis summary retrieval not yet implemented"
+        "status": "success",
+        "cluster_name": job.get("cluster_name") or "Unknown",
+        "job": job,
+        "analysis": record["analysis"]
     }
 
 @must_gather_router.post("/chat")
@@ -182,7 +337,8 @@ async def must_gather_chat(request: dict):
     Chat about must-gather analysis results
     """
     try:
-        from app.services.ai_agent_multi_model import MultiModelAIAgent, ModelType
+        from app.services.ai_agent_multi_model import ModelType
+        from app.services.agent_registry import agent_registry
         
         message = request.get("message", "")
         model_preference = request.get("model", "ollama")
@@ -191,8 +347,8 @@ async def must_gather_chat(request: dict):
         if not message:
             raise HTTPException(status_code=400, detail="Message is required")
         
-        # Create AI agent
-        ai_agent = MultiModelAIAgent()
+        # Shared AI agent; its models are initialized once
+        ai_agent = agent_registry.multi_model_agent
         
         # Map model preference to ModelType
         model_mapping = {
@@ -367,7 +523,7 @@ async def get_must_gather_ui():
             <div id="loading" class="loading bg-white rounded-lg shadow-lg p-6 mb-8">
                 <div class="flex items-center justify-center">
                     <div class="animate-spin rounded-full h-8 w-8 border-b-2 border-blue-600"></div>
-                    <span class="ml-3 text-lg">Analyzing must-gather logs...</span>
+                    <span id="loadingText" class="ml-3 text-lg">Analyzing must-gather logs...</span>
                 </div>
             </div>
             
@@ -524,22 +680,28 @@ async def get_must_gather_ui():
             hideError();
             
             try {
-                console.log('Sending request to /api/must-gather/analyze');
-                const response = await fetch('/api/must-gather/analyze', {
+                // The analysis runs as a job, so a large upload never holds the request open
+                console.log('Sending request to /api/must-gather/jobs/upload');
+                const response = await fetch('/api/must-gather/jobs/upload', {
                     method: 'POST',
                     body: formData
                 });
                 
                 console.log('Response status:', response.status);
-                console.log('Response headers:', response.headers);
                 
-                const result = await response.json();
-                console.log('Response data:', result);
+                const submitted = await response.json();
+                console.log('Response data:', submitted);
                 
-                if (response.ok) {
+                if (!response.ok) {
+                    showError(submitted.detail || 'Analysis failed');
+                    return;
+                }
+                
+                const result = await waitForJob(submitted.job_id);
+                if (result.status === 'success') {
                     displayResults(result);
                 } else {
-                    showError(result.detail || 'Analysis failed');
+                    showError(result.job.error || 'Analysis failed');
                 }
             } catch (error) {
                 console.error('Upload error:', error);
@@ -549,7 +711,31 @@ async def get_must_gather_ui():
             }
         });
         
+        async function waitForJob(jobId) {
+            // Poll the job until it ends, then load its stored result
+            while (true) {
+                const response = await fetch(`/api/must-gather/jobs/${jobId}`);
+                const data = await response.json();
+                if (!response.ok) {
+                    throw new Error(data.detail || 'Job status unavailable');
+                }
+                const job = data.job;
+                if (job.status === 'failed') {
+                    return {status: 'failed', job: job};
+                }
+                if (job.status === 'completed') {
+                    const summary = await fetch(`/api/must-gather/summary?analysis_id=${encodeURIComponent(jobId)}`);
+                    return await summary.json();
+                }
+                const progress = job.progress != null ? ` ${Math.round(job.progress * 100)}%` : '';
+                const eta = job.eta_seconds ? ` (about ${Math.ceil(job.eta_seconds)}s left)` : '';
+                document.getElementById('loadingText').textContent = `Analyzing must-gather logs: ${job.phase}${progress}${eta}`;
+                await new Promise(resolve => setTimeout(resolve, 2000));
+            }
+        }
+        
         function showLoading() {
+            document.getElementById('loadingText').textContent = 'Analyzing must-gather logs...';
             document.getElementById('loading').classList.add('show');
         }
         
@@ -773,6 +959,7 @@ async def get_must_gather_ui():
                                         <span class="text-xs text-gray-500">${log.timestamp || 'N/A'}</span>
                                     </div>
                                     <pre class="text-xs text-gray-700 mt-1 overflow-x-auto whitespace-pre-wrap">${log.message}</pre>
+                                    ${log.count > 1 ? `<span class="text-xs text-gray-500 italic">seen ${log.count.toLocaleString()} times</span>` : ''}
                                     ${log.severity ? `<span class="inline-block mt-1 px-2 py-1 text-xs rounded bg-${log.severity === 'critical' ? 'red' : log.severity === 'high' ? 'orange' : log.severity === 'medium' ? 'yellow' : 'blue'}-100 text-${log.severity === 'critical' ? 'red' : log.severity === 'high' ? 'orange' : log.severity === 'medium' ? 'yellow' : 'blue'}-800">${log.severity.toUpperCase()}</span>` : ''}
                                 </div>
                             `).join('')}
@@ -794,11 +981,12 @@ async def get_must_gather_ui():
                                         <span class="font-medium text-sm">${issue.type.replace(/_/g, ' ').toUpperCase()}</span>
                                         <span class="inline-block px-2 py-1 text-xs rounded bg-${issue.severity === 'critical' ? 'red' : issue.severity === 'high' ? 'orange' : issue.severity === 'medium' ? 'yellow' : 'blue'}-100 text-${issue.severity === 'critical' ? 'red' : issue.severity === 'high' ? 'orange' : issue.severity === 'medium' ? 'yellow' : 'blue'}-800">${issue.severity.toUpperCase()}</span>
                                     </div>
-                                    <div class="text-xs text-gray-600 mb-2">${issue.description}</div>
+                                    <div class="text-xs text-gray-600 mb-2">${issue.description}${issue.occurrences ? ` (seen ${issue.occurrences.toLocaleString()} times)` : ''}</div>
                                     <div class="space-y-1">
-                                        ${issue.evidence.slice(0, 2).map(evidence => `
+                                        ${issue.evidence.slice(0, 2).map((evidence, index) => `
                                             <div class="bg-white border-l-2 border-gray-300 p-2 text-xs">
                                                 <pre class="whitespace-pre-wrap text-gray-700">${evidence}</pre>
+                                                ${issue.evidence_counts && issue.evidence_counts[index] > 1 ? `<div class="text-gray-500 italic">seen ${issue.evidence_counts[index].toLocaleString()} times</div>` : ''}
                                             </div>
                                         `).join('')}
                                         ${issue.evidence.length > 2 ? `<div class="text-xs text-gray-500 italic">... and ${issue.evidence.length - 2} more evidence entries</div>` : ''}
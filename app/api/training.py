@@ -114,9 +114,7 @@ async def import_patterns(filepath: str):
 async def delete_pattern(pattern_id: str):
     """Delete a specific pattern"""
     try:
-        if pattern_id in ai_agent.pattern_trainer.patterns["patterns"]:
-            del ai_agent.pattern_trainer.patterns["patterns"][pattern_id]
-            ai_agent.pattern_trainer._save_patterns()
+        if ai_agent.pattern_trainer.remove_pattern(pattern_id):
             return {"message": f"Pattern {pattern_id} deleted successfully"}
         else:
             raise HTTPException(status_code=404, detail="Pattern not found")
@@ -38,6 +38,15 @@ class Settings(BaseSettings):
     claude_api_key: Optional[str] = None
     claude_model: str = "claude-3-5-sonnet-20241022"
     
+    # LLM Provider Limits (concurrent requests per backend; Granite runs one generation per worker thread)
+    ollama_max_concurrency: int = 2
+    openai_max_concurrency: int = 8
+    gemini_max_concurrency: int = 8
+    claude_max_concurrency: int = 8
+    granite_max_concurrency: int = 1
+    llm_max_connections: int = 20  # Keep-alive connection pool size per backend
+    llm_request_timeout: float = 120.0
+    
     # Jira Configuration
     jira_server_url: str = "https://issues.redhat.com"
     jira_username: str = ""
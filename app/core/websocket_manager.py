@@ -1,5 +1,5 @@
 from fastapi import WebSocket
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
 import json
 import logging
 
@@ -8,22 +8,29 @@ logger = logging.getLogger(__name__)
 class WebSocketManager:
     def __init__(self):
         self.active_connections: List[WebSocket] = []
-        self.user_connections: Dict[str, WebSocket] = {}
+        # A user may have several connections (tabs, devices)
+        self.user_connections: Dict[str, Set[WebSocket]] = {}
+        self.connection_users: Dict[WebSocket, str] = {}
 
     async def connect(self, websocket: WebSocket, user_id: Optional[str] = None):
         """Accept a new WebSocket connection"""
         await websocket.accept()
         self.active_connections.append(websocket)
         if user_id:
-            self.user_connections[user_id] = websocket
+            self.user_connections.setdefault(user_id, set()).add(websocket)
+            self.connection_users[websocket] = user_id
         logger.info(f"WebSocket connection established. Total connections: {len(self.active_connections)}")
 
     def disconnect(self, websocket: WebSocket, user_id: Optional[str] = None):
-        """Remove a WebSocket connection"""
+        """Remove a WebSocket connection; the user's other connections stay registered"""
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
-        if user_id and user_id in self.user_connections:
-            del self.user_connections[user_id]
+        user_id = self.connection_users.pop(websocket, user_id)
+        connections = self.user_connections.get(user_id) if user_id else None
+        if connections is not None:
+            connections.discard(websocket)
+            if not connections:
+                del self.user_connections[user_id]
         logger.info(f"WebSocket connection closed. Total connections: {len(self.active_connections)}")
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
@@ -73,14 +80,16 @@ class WebSocketManager:
     async def send_to_user(self, user_id: str, message: str):
         """Send a message to a specific user"""
         if user_id in self.user_connections:
-            await self.send_personal_message(message, self.user_connections[user_id])
+            for websocket in list(self.user_connections[user_id]):
+                await self.send_personal_message(message, websocket)
         else:
             logger.warning(f"User {user_id} not connected")
 
     async def send_json_to_user(self, user_id: str, data: dict):
         """Send JSON data to a specific user"""
         if user_id in self.user_connections:
-            await self.send_personal_json(data, self.user_connections[user_id])
+            for websocket in list(self.user_connections[user_id]):
+                await self.send_personal_json(data, websocket)
         else:
             logger.warning(f"User {user_id} not connected")
 
@@ -0,0 +1,61 @@
+"""
+Application-scoped agent registry
+
+Agents are expensive to build: AIAgent loads the trained patterns, builds the
+multi-agent orchestrator and initializes its AI provider (possibly loading Granite
+weights), and MultiModelAIAgent initializes every configured model. The registry
+is started once from the FastAPI lifespan and hands the same instances to every
+request and WebSocket message; per-user state lives in Conversations.
+"""
+
+import logging
+
+from app.services.conversation_state import Conversation
+from app.services.llm_providers import close_providers
+
+logger = logging.getLogger(__name__)
+
+
+class AgentRegistry:
+    """The shared agents of the application"""
+
+    def __init__(self):
+        self._ai_agent = None
+        self._multi_model_agent = None
+
+    def start(self):
+        """Create the main agent; called from the application lifespan"""
+        logger.info(f"Agent registry started ({self.ai_agent.get_current_model_info()})")
+
+    async def stop(self):
+        """Write pending trained-pattern changes and close the LLM connection pools"""
+        if self._ai_agent is not None:
+            self._ai_agent.pattern_trainer.flush()
+        await close_providers()
+
+    @property
+    def ai_agent(self):
+        """The AIAgent shared with the REST API (app.services.ai_agent.ai_agent)"""
+        if self._ai_agent is None:
+            from app.services.ai_agent import ai_agent
+            self._ai_agent = ai_agent
+        return self._ai_agent
+
+    @property
+    def multi_model_agent(self):
+        """The MultiModelAIAgent, created on first use"""
+        if self._multi_model_agent is None:
+            from app.services.ai_agent_multi_model import MultiModelAIAgent
+            self._multi_model_agent = MultiModelAIAgent()
+        return self._multi_model_agent
+
+    def conversation(self, user_id: str) -> Conversation:
+        """The conversation of a user with the main agent"""
+        return self.ai_agent.conversations.get(user_id)
+
+    def end_conversation(self, user_id: str):
+        """Forget a conversation, e.g. of an anonymous connection that closed"""
+        self.ai_agent.conversations.drop(user_id)
+
+
+agent_registry = AgentRegistry()
@@ -4,7 +4,6 @@ import logging
 import re
 from datetime import datetime
 from typing import Dict, List, Any, Optional
-import openai
 import httpx
 import base64 # Added for email body fetching
 
@@ -13,38 +12,19 @@ from app.api.auth import get_google_credentials
 from app.services.jira_service import jira_service
 from app.services.pattern_trainer import PatternTrainer
 from app.services.multi_agent_orchestrator import MultiAgentOrchestrator
+from app.services.conversation_state import Conversation, ConversationStore
+from app.services.llm_providers import get_provider
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
-# AI Provider imports
-try:
-    import ollama
-except ImportError:
-    ollama = None
-
-try:
-    from transformers import AutoTokenizer, AutoModelForCausalLM
-    import torch
-except ImportError:
-    AutoTokenizer = None
-    AutoModelForCausalLM = None
-    torch = None
-
-try:
-    import google.generativeai as genai
-except ImportError:
-    genai = None
-
 logger = logging.getLogger(__name__)
 
 class AIAgent:
     def __init__(self):
-        self.conversation_history = []
-        self.context = {}
-        self.last_interaction = None
-        self.granite_model = None
-        self.granite_tokenizer = None
-        self.gemini_model = None
+        # Conversation of callers that do not pass their own (e.g. the REST chat endpoint)
+        self.conversation = Conversation("default")
+        # Per-user conversations; the agent itself is shared by all of them
+        self.conversations = ConversationStore()
         
         # Initialize pattern trainer for permanent learning
         self.pattern_trainer = PatternTrainer("trained_patterns.json")
@@ -159,35 +139,13 @@ Best regards,
 
     def _initialize_ai_providers(self):
         """Initialize AI providers based on configuration"""
-        try:
-            # Initialize OpenAI
-            if settings.openai_api_key and settings.ai_provider == "openai":
-                openai.api_key = settings.openai_api_key
-            
-            # Initialize Granite 3.3 via Transformers
-            elif settings.ai_provider == "granite" and AutoTokenizer and AutoModelForCausalLM:
-                try:
-                    self.granite_tokenizer = AutoTokenizer.from_pretrained(settings.granite_model)
-                    self.granite_model = AutoModelForCausalLM.from_pretrained(
-                        settings.granite_model,
-                        torch_dtype=torch.float16 if torch and torch.cuda.is_available() else None,
-                        device_map="auto" if torch and torch.cuda.is_available() else None
-                    )
-                    logger.info(f"Loaded Granite model: {settings.granite_model}")
-                except Exception as e:
-                    logger.error(f"Failed to load Granite model: {e}")
-            
-            # Initialize Google Gemini
-            elif settings.ai_provider == "gemini" and genai and settings.gemini_api_key:
-                try:
-                    genai.configure(api_key=settings.gemini_api_key)
-                    self.gemini_model = genai.GenerativeModel(settings.gemini_model)
-                    logger.info(f"Loaded Gemini model: {settings.gemini_model}")
-                except Exception as e:
-                    logger.error(f"Failed to load Gemini model: {e}")
-                    
-        except Exception as e:
-            logger.error(f"Error initializing AI providers: {e}")
+        # Shared async providers; clients are created on first use and the Granite
+        # model is loaded in its own executor, off the event loop
+        self.ollama_provider = get_provider("ollama")
+        self.openai_provider = get_provider("openai")
+        self.gemini_provider = get_provider("gemini")
+        self.granite_provider = get_provider("granite")
+        logger.info(f"AI provider: {settings.ai_provider}")
 
     def switch_ai_provider(self, new_provider: str) -> bool:
         """Dynamically switch AI provider"""
@@ -198,24 +156,11 @@ Best regards,
             settings.ai_provider = new_provider
             logger.info(f"Updated provider setting to: {new_provider}")
             
-            # Reinitialize the specific model
-            if new_provider == "gemini" and genai and settings.gemini_api_key:
-                try:
-                    genai.configure(api_key=settings.gemini_api_key)
-                    self.gemini_model = genai.GenerativeModel(settings.gemini_model)
-                    logger.info(f"Reinitialized Gemini model: {settings.gemini_model}")
-                except Exception as e:
-                    logger.error(f"Failed to reinitialize Gemini model: {e}")
-                    return False
-            elif new_provider == "ollama" and ollama:
-                # Ollama doesn't need reinitialization
-                logger.info("Switched to Ollama provider")
-            elif new_provider == "openai" and openai:
-                # OpenAI doesn't need reinitialization
-                logger.info("Switched to OpenAI provider")
-            elif new_provider == "granite":
-                # Granite doesn't need reinitialization
-                logger.info("Switched to Granite provider")
+            # Providers pick up their settings on the next request
+            if new_provider == "gemini" and not self.gemini_provider.available:
+                logger.error("Gemini is not available. Please configure gemini_api_key.")
+                return False
+            logger.info(f"Switched to {new_provider} provider")
             
             return True
                 
@@ -226,34 +171,15 @@ Best regards,
     async def _generate_granite_response(self, message: str) -> str:
         """Generate response using Granite 3.3 model"""
         try:
-            if not self.granite_model or not self.granite_tokenizer:
+            if not self.granite_provider.available:
                 return "Granite model not available. Please check configuration."
             
-            # Format prompt for Granite
-            prompt = f"<|user|>\n{message}\n<|assistant|>\n"
-            
-            # Tokenize and generate
-            inputs = self.granite_tokenizer(prompt, return_tensors="pt")
-            if torch and torch.cuda.is_available():
-                inputs = inputs.to("cuda")
-            
-            with torch.no_grad():
-                outputs = self.granite_model.generate(
-                    **inputs,
-                    max_new_tokens=200,
-                    temperature=0.7,
-                    do_sample=True,
-                    pad_token_id=self.granite_tokenizer.eos_token_id
-                )
-            
-            # Decode response
-            response = self.granite_tokenizer.decode(outputs[0], skip_special_tokens=True)
-            
-            # Extract only the assistant's response
-            if "<|assistant|>" in response:
-                response = response.split("<|assistant|>")[-1].strip()
-            
-            return response
+            # Generated in the Granite executor, not on the event loop
+            return await self.granite_provider.chat(
+                [{"role": "user", "content": message}],
+                temperature=0.7,
+                max_tokens=200
+            )
             
         except Exception as e:
             logger.error(f"Error generating Granite response: {e}")
@@ -262,18 +188,10 @@ Best regards,
     async def _generate_ollama_response(self, message: str) -> str:
         """Generate response using Ollama"""
         try:
-            if not ollama:
-                return "Ollama not available. Please install ollama package."
-            
-            response = ollama.chat(
-                model=settings.ollama_model,
-                messages=[{
-                    'role': 'user',
-                    'content': message
-                }]
-            )
-            
-            return response['message']['content']
+            return await self.ollama_provider.chat([{
+                'role': 'user',
+                'content': message
+            }])
             
         except Exception as e:
             logger.error(f"Error generating Ollama response: {e}")
@@ -282,24 +200,23 @@ Best regards,
     async def _generate_gemini_response(self, message: str) -> str:
         """Generate response using Google Gemini"""
         try:
-            if not genai or not self.gemini_model:
+            if not self.gemini_provider.available:
                 return "Google Gemini not available. Please configure gemini_api_key."
             
             # Build a helpful system prompt
             system_prompt = ("You are a helpful AI assistant specialized in managing digital workflows including "
                            "email, calendar, contacts, and Slack. Provide concise, accurate, and helpful responses.")
             
-            full_prompt = f"{system_prompt}\n\nUser: {message}\nAssistant:"
-            
-            response = self.gemini_model.generate_content(
-                full_prompt,
-                generation_config={
-                    "temperature": 0.7,
-                    "max_output_tokens": 1024,
-                }
+            response = await self.gemini_provider.chat(
+                [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": message}
+                ],
+                temperature=0.7,
+                max_tokens=1024
             )
             
-            return response.text.strip()
+            return response.strip()
             
         except Exception as e:
             logger.error(f"Error generating Gemini response: {e}")
@@ -308,16 +225,15 @@ Best regards,
     async def _generate_openai_response(self, message: str) -> str:
         """Generate response using OpenAI"""
         try:
-            if not openai:
+            if not self.openai_provider.available:
                 return "OpenAI not available. Please configure openai_api_key."
             
             # Build a helpful system prompt
             system_prompt = ("You are a helpful AI assistant specialized in managing digital workflows including "
                            "email, calendar, contacts, and Slack. Provide concise, accurate, and helpful responses.")
             
-            response = openai.ChatCompletion.create(
-                model=settings.openai_model,
-                messages=[
+            response = await self.openai_provider.chat(
+                [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": message}
                 ],
@@ -325,27 +241,30 @@ Best regards,
                 temperature=0.7
             )
             
-            return response.choices[0].message.content.strip()
+            return response.strip()
             
         except Exception as e:
             logger.error(f"Error generating OpenAI response: {e}")
             return "I encountered an error processing your request with OpenAI."
 
-    async def process_message(self, message: str, context: Optional[Dict] = None, model_preference: Optional[str] = None) -> Dict[str, Any]:
+    async def process_message(self, message: str, context: Optional[Dict] = None, model_preference: Optional[str] = None,
+                              conversation: Optional[Conversation] = None) -> Dict[str, Any]:
         """Process user message and return response using multi-agent orchestrator"""
+        conversation = conversation or self.conversation
         try:
             # Update conversation history
-            self.conversation_history.append({
+            conversation.history.append({
                 "role": "user",
                 "content": message,
                 "timestamp": datetime.utcnow().isoformat()
             })
             
             # Use multi-agent orchestrator to process the message
-            response = await self.multi_agent_orchestrator.process_message(message, context.get("user_id") if context else None)
+            user_id = context.get("user_id") if context else None
+            response = await self.multi_agent_orchestrator.process_message(message, user_id or conversation.user_id, conversation.context)
             
             # Update conversation history with response
-            self.conversation_history.append({
+            conversation.history.append({
                 "role": "assistant",
                 "content": response.get("response", ""),
                 "timestamp": datetime.utcnow().isoformat(),
@@ -355,7 +274,7 @@ Best regards,
             })
             
             # Update last interaction time
-            self.last_interaction = datetime.utcnow()
+            conversation.last_interaction = datetime.utcnow()
             
             return response
             
@@ -478,20 +397,15 @@ Best regards,
     def _check_trained_patterns(self, message: str) -> Optional[Dict[str, Any]]:
         """Check if message matches any trained patterns"""
         try:
-            # Get all patterns and sort by success rate
-            all_patterns = self.pattern_trainer.patterns.get("patterns", {})
-            sorted_patterns = sorted(all_patterns.values(), 
-                                   key=lambda x: (x["success_rate"], x["usage_count"]), 
-                                   reverse=True)
-            
-            for pattern_data in sorted_patterns:
-                if self.pattern_trainer._pattern_matches(message, pattern_data["pattern"]):
-                    logger.info(f"DEBUG: Matched trained pattern: {pattern_data['pattern']} -> {pattern_data['intent']}")
-                    return {
-                        "intent": pattern_data["intent"],
-                        "confidence": pattern_data["confidence"],
-                        "entities": pattern_data["entities"]
-                    }
+            # Highest success rate (then usage count) pattern that matches
+            pattern_data = self.pattern_trainer.match(message)
+            if pattern_data:
+                logger.info(f"DEBUG: Matched trained pattern: {pattern_data['pattern']} -> {pattern_data['intent']}")
+                return {
+                    "intent": pattern_data["intent"],
+                    "confidence": pattern_data["confidence"],
+                    "entities": pattern_data["entities"]
+                }
         except Exception as e:
             logger.error(f"Error checking trained patterns: {e}")
         
@@ -1809,13 +1723,13 @@ Content: {email_full['body']}
 Please provide a brief, professional summary highlighting the key points, action items, and important details."""
 
             # Generate summary using the current AI model
-            if settings.ai_provider == "ollama" and ollama:
+            if settings.ai_provider == "ollama":
                 summary = await self._generate_ollama_response(summary_prompt)
-            elif settings.ai_provider == "gemini" and genai and self.gemini_model:
+            elif settings.ai_provider == "gemini" and self.gemini_provider.available:
                 summary = await self._generate_gemini_response(summary_prompt)
-            elif settings.ai_provider == "granite" and self.granite_model:
+            elif settings.ai_provider == "granite" and self.granite_provider.available:
                 summary = await self._generate_granite_response(summary_prompt)
-            elif settings.ai_provider == "openai" and openai:
+            elif settings.ai_provider == "openai" and self.openai_provider.available:
                 summary = await self._generate_openai_response(summary_prompt)
             else:
                 # Fallback to manual summary
@@ -1977,13 +1891,13 @@ Content: {email_full['body']}
 Please identify and list all action items, tasks, deadlines, and follow-up actions mentioned in this email. Format as a clear list with priorities (High/Medium/Low)."""
 
             # Generate action items using AI
-            if settings.ai_provider == "ollama" and ollama:
+            if settings.ai_provider == "ollama":
                 action_items = await self._generate_ollama_response(action_prompt)
-            elif settings.ai_provider == "gemini" and genai and self.gemini_model:
+            elif settings.ai_provider == "gemini" and self.gemini_provider.available:
                 action_items = await self._generate_gemini_response(action_prompt)
-            elif settings.ai_provider == "granite" and self.granite_model:
+            elif settings.ai_provider == "granite" and self.granite_provider.available:
                 action_items = await self._generate_granite_response(action_prompt)
-            elif settings.ai_provider == "openai" and openai:
+            elif settings.ai_provider == "openai" and self.openai_provider.available:
                 action_items = await self._generate_openai_response(action_prompt)
             else:
                 # Fallback to basic extraction
@@ -2090,13 +2004,13 @@ Create a polite, professional follow-up email that:
 Format the response as a complete email with subject and body."""
 
             # Generate follow-up using AI
-            if settings.ai_provider == "ollama" and ollama:
+            if settings.ai_provider == "ollama":
                 followup_content = await self._generate_ollama_response(followup_prompt)
-            elif settings.ai_provider == "gemini" and genai and self.gemini_model:
+            elif settings.ai_provider == "gemini" and self.gemini_provider.available:
                 followup_content = await self._generate_gemini_response(followup_prompt)
-            elif settings.ai_provider == "granite" and self.granite_model:
+            elif settings.ai_provider == "granite" and self.granite_provider.available:
                 followup_content = await self._generate_granite_response(followup_prompt)
-            elif settings.ai_provider == "openai" and openai:
+            elif settings.ai_provider == "openai" and self.openai_provider.available:
                 followup_content = await self._generate_openai_response(followup_prompt)
             else:
                 # Use template-based follow-up
@@ -2925,18 +2839,15 @@ Format the response as a complete email with subject and body."""
             elif settings.ai_provider == "openai" and settings.openai_api_key:
                 # Use OpenAI for general conversation
                 try:
-                    from openai import OpenAI
-                    client = OpenAI(api_key=settings.openai_api_key)
-                    response = client.chat.completions.create(
-                        model=settings.openai_model,
-                        messages=[
+                    response = await self.openai_provider.chat(
+                        [
                             {"role": "system", "content": "You are a helpful AI assistant that specializes in managing emails, calendar events, contacts, and Slack messages. Keep responses concise and helpful."},
                             {"role": "user", "content": message}
                         ],
                         max_tokens=200,
                         temperature=0.7
                     )
-                    ai_response = response.choices[0].message.content.strip()
+                    ai_response = response.strip()
                 except Exception as e:
                     logger.error(f"OpenAI API error: {e}")
                     ai_response = "I'm here to help you manage your digital workspace!"
@@ -4257,27 +4168,28 @@ kubectl get pods -l app=myapp -n <namespace>
 
     def get_conversation_history(self, limit: int = 50) -> List[Dict]:
         """Get conversation history"""
-        return self.conversation_history[-limit:] if limit else self.conversation_history
+        history = list(self.conversation.history)
+        return history[-limit:] if limit else history
 
     def clear_conversation_history(self):
         """Clear conversation history"""
-        self.conversation_history = []
+        self.conversation.history.clear()
 
     def set_context(self, context: Dict[str, Any]):
         """Set conversation context"""
-        self.context.update(context)
+        self.conversation.context.update(context)
 
     def get_context(self) -> Dict[str, Any]:
         """Get current context"""
-        return self.context
+        return self.conversation.context
 
     def has_active_conversation(self) -> bool:
         """Check if there's an active conversation"""
-        return len(self.conversation_history) > 0
+        return len(self.conversation.history) > 0
 
     def get_last_interaction_time(self) -> Optional[str]:
         """Get last interaction timestamp"""
-        return self.last_interaction.isoformat() if self.last_interaction else None
+        return self.conversation.last_interaction.isoformat() if self.conversation.last_interaction else None
 
     def learn_from_example(self, input_message: str, expected_response: str, category: str = None) -> bool:
         """Learn from user examples (placeholder for future ML implementation)"""
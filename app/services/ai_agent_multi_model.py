@@ -9,6 +9,8 @@ from enum import Enum
 
 from app.core.config import settings
 from app.api.auth import get_google_credentials
+from app.services.llm_providers import get_provider
+from app.services.conversation_state import new_history
 
 # AI Provider imports
 try:
@@ -61,7 +63,8 @@ class MultiModelAIAgent:
     """Enhanced AI Agent with intelligent multi-model support"""
     
     def __init__(self):
-        self.conversation_history = []
+        # Bounded: one agent instance is shared by every request
+        self.conversation_history = new_history()
         self.context = {}
         self.last_interaction = None
         
@@ -166,7 +169,7 @@ class MultiModelAIAgent:
             if genai and settings.gemini_api_key:
                 genai.configure(api_key=settings.gemini_api_key)
                 model_name = settings.gemini_model or "gemini-1.5-pro"
-                self.models[ModelType.GEMINI] = genai.GenerativeModel(model_name)
+                self.models[ModelType.GEMINI] = "initialized"
                 self.model_configs[ModelType.GEMINI] = {
                     "model": model_name,
                     "temperature": 0.7,
@@ -182,7 +185,7 @@ class MultiModelAIAgent:
         """Initialize Anthropic Claude models"""
         try:
             if anthropic and settings.claude_api_key:
-                self.models[ModelType.CLAUDE] = anthropic.Anthropic(api_key=settings.claude_api_key)
+                self.models[ModelType.CLAUDE] = "initialized"
                 model_name = settings.claude_model or "claude-3-5-sonnet-20241022"
                 self.model_configs[ModelType.CLAUDE] = {
                     "model": model_name,
@@ -241,21 +244,14 @@ class MultiModelAIAgent:
         }
 
     async def _load_granite_model(self):
-        """Lazy load Granite model when needed"""
+        """Lazy load Granite model when needed, in the Granite executor"""
         if ModelType.GRANITE in self.model_configs and self.model_configs[ModelType.GRANITE]["model"] is None:
-            try:
-                config = self.model_configs[ModelType.GRANITE]
-                config["tokenizer"] = AutoTokenizer.from_pretrained(config["model_name"])
-                config["model"] = AutoModelForCausalLM.from_pretrained(
-                    config["model_name"],
-                    torch_dtype=torch.float16 if torch and torch.cuda.is_available() else None,
-                    device_map="auto" if torch and torch.cuda.is_available() else None
-                )
-                self.models[ModelType.GRANITE] = "loaded"
-                logger.info(f"Loaded Granite model: {config['model_name']}")
-            except Exception as e:
-                logger.error(f"Failed to load Granite model: {e}")
+            granite = get_provider("granite")
+            if not await granite.load_async():
                 return False
+            config = self.model_configs[ModelType.GRANITE]
+            config["tokenizer"], config["model"] = granite.tokenizer, granite.model
+            self.models[ModelType.GRANITE] = "loaded"
         return True
 
     async def select_optimal_model(self, task_type: str, complexity: TaskComplexity = TaskComplexity.MEDIUM, 
@@ -317,17 +313,17 @@ class MultiModelAIAgent:
             # Build context-aware prompt
             system_prompt = self._build_system_prompt(context)
             
-            response = await openai.ChatCompletion.acreate(
-                model=config["model"],
-                messages=[
+            response = await get_provider("openai").chat(
+                [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": message}
                 ],
+                model=config["model"],
                 max_tokens=config["max_tokens"],
                 temperature=config["temperature"]
             )
             
-            return response.choices[0].message.content.strip()
+            return response.strip()
             
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
@@ -340,36 +336,18 @@ class MultiModelAIAgent:
             if not await self._load_granite_model():
                 raise Exception("Granite model not available")
             
-            config = self.model_configs[ModelType.GRANITE]
-            tokenizer = config["tokenizer"]
-            model = config["model"]
-            
             # Build context-aware prompt
             system_prompt = self._build_system_prompt(context)
-            prompt = f"<|system|>\n{system_prompt}\n<|user|>\n{message}\n<|assistant|>\n"
-            
-            # Tokenize and generate
-            inputs = tokenizer(prompt, return_tensors="pt")
-            if torch and torch.cuda.is_available():
-                inputs = inputs.to("cuda")
-            
-            with torch.no_grad():
-                outputs = model.generate(
-                    **inputs,
-                    max_new_tokens=200,
-                    temperature=0.7,
-                    do_sample=True,
-                    pad_token_id=tokenizer.eos_token_id
-                )
-            
-            # Decode response
-            response = tokenizer.decode(outputs[0], skip_special_tokens=True)
-            
-            # Extract only the assistant's response
-            if "<|assistant|>" in response:
-                response = response.split("<|assistant|>")[-1].strip()
             
-            return response
+            # Generated in the Granite executor, not on the event loop
+            return await get_provider("granite").chat(
+                [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": message}
+                ],
+                temperature=0.7,
+                max_tokens=200
+            )
             
         except Exception as e:
             logger.error(f"Granite generation error: {e}")
@@ -393,31 +371,21 @@ class MultiModelAIAgent:
             logger.info(f"Using Ollama model: {model_name} for generation")
             
             # Add timeout to prevent hanging
-            import asyncio
+            ollama_provider = get_provider("ollama")
             try:
-                response = await asyncio.wait_for(
-                    asyncio.to_thread(
-                        ollama.chat,
-                        model=model_name,
-                        messages=messages
-                    ),
+                return await asyncio.wait_for(
+                    ollama_provider.chat(messages, model=model_name),
                     timeout=45.0  # 45 second timeout for code models
                 )
-                return response['message']['content']
             except asyncio.TimeoutError:
                 logger.error(f"Ollama request timed out after 45 seconds with model {model_name}")
                 # Try fallback model
                 fallback_model = settings.ollama_fallback_model
                 logger.info(f"Retrying with fallback model: {fallback_model}")
-                response = await asyncio.wait_for(
-                    asyncio.to_thread(
-                        ollama.chat,
-                        model=fallback_model,
-                        messages=messages
-                    ),
+                return await asyncio.wait_for(
+                    ollama_provider.chat(messages, model=fallback_model),
                     timeout=30.0
                 )
-                return response['message']['content']
             
         except Exception as e:
             logger.error(f"Ollama generation error: {e}")
@@ -488,24 +456,23 @@ class MultiModelAIAgent:
             if ModelType.GEMINI not in self.models:
                 raise Exception("Gemini model not available")
             
-            model = self.models[ModelType.GEMINI]
             config = self.model_configs[ModelType.GEMINI]
             
             # Build context-aware prompt
             system_prompt = self._build_system_prompt(context)
-            full_prompt = f"{system_prompt}\n\nUser: {message}\nAssistant:"
             
             # Generate response
-            response = await asyncio.to_thread(
-                model.generate_content,
-                full_prompt,
-                generation_config={
-                    "temperature": config["temperature"],
-                    "max_output_tokens": config["max_output_tokens"],
-                }
+            response = await get_provider("gemini").chat(
+                [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": message}
+                ],
+                model=config["model"],
+                temperature=config["temperature"],
+                max_tokens=config["max_output_tokens"]
             )
             
-            return response.text.strip()
+            return response.strip()
             
         except Exception as e:
             logger.error(f"Gemini generation error: {e}")
@@ -517,25 +484,23 @@ class MultiModelAIAgent:
             if ModelType.CLAUDE not in self.models:
                 raise Exception("Claude model not available")
             
-            client = self.models[ModelType.CLAUDE]
             config = self.model_configs[ModelType.CLAUDE]
             
             # Build context-aware prompt
             system_prompt = self._build_system_prompt(context)
             
             # Generate response using Claude's messages API
-            response = await asyncio.to_thread(
-                client.messages.create,
+            response = await get_provider("claude").chat(
+                [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": message}
+                ],
                 model=config["model"],
                 max_tokens=config["max_tokens"],
-                temperature=config["temperature"],
-                system=system_prompt,
-                messages=[
-                    {"role": "user", "content": message}
-                ]
+                temperature=config["temperature"]
             )
             
-            return response.content[0].text.strip()
+            return response.strip()
             
         except Exception as e:
             logger.error(f"Claude generation error: {e}")
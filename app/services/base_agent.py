@@ -4,6 +4,7 @@ import logging
 from abc import ABC, abstractmethod
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+from app.services.conversation_state import new_history
 
 logger = logging.getLogger(__name__)
 
@@ -13,7 +14,8 @@ class BaseAgent(ABC):
     def __init__(self, name: str, domain: str):
         self.name = name
         self.domain = domain
-        self.conversation_history = []
+        # Bounded: one agent instance serves every conversation
+        self.conversation_history = new_history()
         self.context = {}
         self.last_interaction = None
         
@@ -90,11 +92,11 @@ class BaseAgent(ABC):
     
     def get_conversation_history(self, limit: int = 10) -> List[Dict]:
         """Get recent conversation history"""
-        return self.conversation_history[-limit:] if self.conversation_history else []
+        return list(self.conversation_history)[-limit:] if self.conversation_history else []
     
     def clear_conversation_history(self):
         """Clear conversation history"""
-        self.conversation_history = []
+        self.conversation_history.clear()
     
     def set_context(self, context: Dict[str, Any]):
         """Set context for this agent"""
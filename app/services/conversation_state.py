@@ -0,0 +1,61 @@
+"""
+Per-user conversation state, kept apart from the shared agents
+
+Agents are created once and shared by every connection; what belongs to one user
+(message history, context, last interaction) lives in a Conversation that is
+passed to the agent with each message.
+"""
+
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, Optional
+
+# Messages kept per conversation (and per shared agent)
+MAX_HISTORY = 100
+
+# Conversations kept at once; the least recently used one is dropped beyond this
+MAX_CONVERSATIONS = 1000
+
+
+def new_history() -> Deque[Dict[str, Any]]:
+    return deque(maxlen=MAX_HISTORY)
+
+
+@dataclass
+class Conversation:
+    """The conversation of one user (or of one anonymous connection)"""
+    user_id: str
+    history: Deque[Dict[str, Any]] = field(default_factory=new_history)
+    context: Dict[str, Any] = field(default_factory=dict)
+    last_interaction: Optional[datetime] = None
+
+
+class ConversationStore:
+    """Conversations by user id, bounded to the most recently used ones"""
+
+    def __init__(self, max_conversations: int = MAX_CONVERSATIONS):
+        self.max_conversations = max_conversations
+        self._conversations: "OrderedDict[str, Conversation]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Conversation:
+        """The conversation of a user, started on first use"""
+        with self._lock:
+            conversation = self._conversations.get(user_id)
+            if conversation is None:
+                conversation = self._conversations[user_id] = Conversation(user_id)
+                if len(self._conversations) > self.max_conversations:
+                    self._conversations.popitem(last=False)
+            else:
+                self._conversations.move_to_end(user_id)
+            return conversation
+
+    def drop(self, user_id: str):
+        """Forget the conversation of a user"""
+        with self._lock:
+            self._conversations.pop(user_id, None)
+
+    def __len__(self) -> int:
+        return len(self._conversations)
@@ -0,0 +1,136 @@
+"""
+Compiled keyword routing for the multi-agent orchestrator
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Messages and keywords are split into runs of letters and digits. Keywords only
+# match whole words, so "oc" matches "oc get pods" but not "document", and
+# "must-gather" also matches "must gather".
+WORD_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(message: str) -> List[str]:
+    """Split a message into the lowercase words keywords are matched against"""
+    return WORD_PATTERN.findall(message.lower())
+
+
+@dataclass(frozen=True)
+class Route:
+    """An agent, the domain reported for it and the keywords that route messages to it"""
+    agent: str
+    domain: str
+    keywords: Tuple[str, ...]
+
+
+@dataclass
+class RoutingDecision:
+    """The selected agent and the keywords that fired, by agent"""
+    agent: str
+    domain: str
+    confidence: float
+    reason: str  # jira_key, keyword, fallback, default
+    keywords: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def hits(self) -> Dict[str, int]:
+        """Keyword hit count per agent"""
+        return {agent: len(fired) for agent, fired in self.keywords.items()}
+
+    def as_tuple(self) -> Tuple[str, str, float]:
+        return self.agent, self.domain, self.confidence
+
+    def breakdown(self) -> Dict[str, object]:
+        return {
+            "reason": self.reason,
+            "hits": self.hits,
+            "keywords": {agent: sorted(set(fired)) for agent, fired in self.keywords.items()},
+        }
+
+
+class KeywordRouter:
+    """Finds the keywords of every route in a message in a single pass.
+
+    All keywords are compiled once into a word trie; a message is tokenized and
+    walked through the trie only from the words that start a keyword, so the cost
+    depends on the message length and not on the number of keywords or routes.
+    Keyword words also match with a trailing "s", so "meetings" counts as "meeting".
+    """
+
+    def __init__(self, routes: Sequence[Route]):
+        self.routes = list(routes)
+        self._compile()
+
+    def _compile(self):
+        # A trie node is (children by word, [(route index, keyword), ...] ending here)
+        root: Tuple[dict, list] = ({}, [])
+        for index, route in enumerate(self.routes):
+            seen = set()
+            for keyword in route.keywords:
+                words = tuple(tokenize(keyword))
+                # "follow up" and "follow-up" are the same keyword
+                if not words or words in seen:
+                    continue
+                seen.add(words)
+                node = root
+                for word in words:
+                    node = node[0].setdefault(word, ({}, []))
+                node[1].append((index, keyword))
+
+        # Plurals share the node of their singular, unless they are keywords themselves
+        pending = [root]
+        while pending:
+            children = pending.pop()[0]
+            pending.extend(children.values())
+            for word, node in list(children.items()):
+                children.setdefault(word + 's', node)
+
+        self._root = root
+        self._first_words = frozenset(root[0])
+
+    def scan(self, words: List[str]) -> Dict[str, List[str]]:
+        """Return the keywords found in a tokenized message by agent, one entry per occurrence.
+
+        Agents without any keyword in the message are left out.
+        """
+        fired: Dict[int, List[str]] = {}
+        first_words = self._first_words
+        if first_words.isdisjoint(words):
+            return {}
+        root_children = self._root[0]
+        count = len(words)
+        for start, word in enumerate(words):
+            if word not in first_words:
+                continue
+            node = root_children[word]
+            position = start
+            while True:
+                for index, keyword in node[1]:
+                    fired.setdefault(index, []).append(keyword)
+                position += 1
+                if position == count:
+                    break
+                node = node[0].get(words[position])
+                if node is None:
+                    break
+        return {self.routes[index].agent: fired[index] for index in sorted(fired)}
+
+    def first(self, words: List[str]) -> Tuple[Optional[Route], Dict[str, List[str]]]:
+        """The first route (in table order) with a keyword in the message, and the scan"""
+        keywords = self.scan(words)
+        for route in self.routes:
+            if route.agent in keywords:
+                return route, keywords
+        return None, keywords
+
+    def best(self, words: List[str]) -> Tuple[Optional[Route], Dict[str, List[str]]]:
+        """The route with the most keyword hits (earliest on ties), and the scan"""
+        keywords = self.scan(words)
+        best_route, best_hits = None, 0
+        for route in self.routes:
+            hits = len(keywords.get(route.agent, ()))
+            if hits > best_hits:
+                best_route, best_hits = route, hits
+        return best_route, keywords
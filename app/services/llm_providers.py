@@ -0,0 +1,400 @@
+"""
+Async LLM providers
+
+One interface, chat(messages), over every backend the agents talk to. Remote
+backends are called through native async clients sharing one keep-alive
+connection pool per backend; Granite runs locally, so its model loading and
+generation are offloaded to a dedicated thread pool. Each provider caps its
+concurrent requests (<backend>_max_concurrency in settings): callers beyond the
+cap wait for a slot without blocking the event loop.
+"""
+
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import httpx
+import openai
+
+from app.core.config import settings
+
+try:
+    import google.generativeai as genai
+except ImportError:
+    genai = None
+
+try:
+    import anthropic
+except ImportError:
+    anthropic = None
+
+try:
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+    import torch
+except ImportError:
+    AutoTokenizer = None
+    AutoModelForCausalLM = None
+    torch = None
+
+logger = logging.getLogger(__name__)
+
+Messages = List[Dict[str, str]]
+
+
+class ProviderUnavailable(Exception):
+    """The backend is not installed or not configured"""
+
+
+def pooled_http_client(**kwargs) -> httpx.AsyncClient:
+    """An async HTTP client keeping up to llm_max_connections connections alive"""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=settings.llm_max_connections,
+                            max_keepalive_connections=settings.llm_max_connections),
+        timeout=httpx.Timeout(settings.llm_request_timeout, connect=10.0),
+        **kwargs
+    )
+
+
+def split_system(messages: Messages) -> Tuple[str, Messages]:
+    """Separate the system prompt from the conversation messages"""
+    system = "\n".join(m["content"] for m in messages if m["role"] == "system")
+    return system, [m for m in messages if m["role"] != "system"]
+
+
+class _Lease:
+    """A backend client and the number of requests using it"""
+
+    def __init__(self, client):
+        self.client = client
+        self.users = 0
+        self.retired = False
+
+
+class LLMProvider(ABC):
+    """An LLM backend behind one async chat interface.
+
+    Clients and the concurrency semaphore belong to the event loop they were
+    created in; they are recreated when chat() runs in another loop, or when the
+    backend's settings (e.g. its API key) changed. A replaced client is closed
+    once the last request using it is done.
+    """
+
+    name = "llm"
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self._lease: Optional[_Lease] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client_settings: Tuple = ()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # The loop only keeps weak references to tasks, so pending closes are held here
+        self._closing: Set[asyncio.Task] = set()
+
+    @property
+    def available(self) -> bool:
+        """Whether the backend is installed and configured"""
+        return True
+
+    def _settings(self) -> Tuple:
+        """The settings the client is created from"""
+        return ()
+
+    def _open(self):
+        """Create the backend client"""
+        return None
+
+    def _bind(self) -> _Lease:
+        """The current client for this loop and settings, taken for one request"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Clients of another loop cannot be closed from this one
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._lease = None
+        if self._lease is None or self._settings() != self._client_settings:
+            if self._lease is not None:
+                self._retire(self._lease)
+            self._client_settings = self._settings()
+            self._lease = _Lease(self._open())
+        self._lease.users += 1
+        return self._lease
+
+    def _retire(self, lease: _Lease):
+        lease.retired = True
+        if lease.users == 0:
+            self._schedule_close(lease.client)
+
+    def _release(self, lease: _Lease):
+        lease.users -= 1
+        if lease.retired and lease.users == 0:
+            self._schedule_close(lease.client)
+
+    def _schedule_close(self, client):
+        task = self._loop.create_task(self._close_client(client))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def chat(self, messages: Messages, model: Optional[str] = None,
+                   temperature: Optional[float] = None, max_tokens: Optional[int] = None) -> str:
+        """Return the backend's reply to the messages (role/content dicts)"""
+        if not self.available:
+            raise ProviderUnavailable(f"{self.name} is not available")
+        lease = self._bind()
+        try:
+            async with self._semaphore:
+                return await self._chat(lease.client, messages, model, temperature, max_tokens)
+        finally:
+            self._release(lease)
+
+    @abstractmethod
+    async def _chat(self, client: Any, messages: Messages, model: Optional[str],
+                    temperature: Optional[float], max_tokens: Optional[int]) -> str:
+        """Send the messages with the given client and return the reply"""
+        pass
+
+    @staticmethod
+    async def _close_client(client):
+        close = getattr(client, "aclose", None) or getattr(client, "close", None)
+        if close is not None:
+            try:
+                await close()
+            except Exception as e:
+                logger.debug(f"Error closing LLM client: {e}")
+
+    async def aclose(self):
+        """Close the backend client, or let the last request using it close it"""
+        lease, self._lease = self._lease, None
+        if lease is None or self._loop is not asyncio.get_running_loop():
+            return
+        if lease.users == 0:
+            await self._close_client(lease.client)
+        else:
+            lease.retired = True
+
+
+class OllamaProvider(LLMProvider):
+    """Ollama's /api/chat over a pooled HTTP client"""
+
+    name = "ollama"
+
+    def __init__(self):
+        super().__init__(settings.ollama_max_concurrency)
+
+    def _settings(self) -> Tuple:
+        return (settings.ollama_base_url,)
+
+    def _open(self):
+        return pooled_http_client(base_url=settings.ollama_base_url)
+
+    async def _chat(self, client, messages, model, temperature, max_tokens):
+        options: Dict[str, Any] = {}
+        if temperature is not None:
+            options["temperature"] = temperature
+        if max_tokens is not None:
+            options["num_predict"] = max_tokens
+        response = await client.post("/api/chat", json={
+            "model": model or settings.ollama_model,
+            "messages": messages,
+            "stream": False,
+            "options": options
+        })
+        response.raise_for_status()
+        return response.json()["message"]["content"]
+
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI chat completions through the SDK's async client"""
+
+    name = "openai"
+
+    def __init__(self):
+        super().__init__(settings.openai_max_concurrency)
+
+    @property
+    def available(self) -> bool:
+        return bool(settings.openai_api_key)
+
+    def _settings(self) -> Tuple:
+        return (settings.openai_api_key,)
+
+    def _open(self):
+        return openai.AsyncOpenAI(api_key=settings.openai_api_key, http_client=pooled_http_client())
+
+    async def _chat(self, client, messages, model, temperature, max_tokens):
+        options: Dict[str, Any] = {}
+        if temperature is not None:
+            options["temperature"] = temperature
+        if max_tokens is not None:
+            options["max_tokens"] = max_tokens
+        response = await client.chat.completions.create(
+            model=model or settings.openai_model,
+            messages=messages,
+            **options
+        )
+        return response.choices[0].message.content
+
+
+class ClaudeProvider(LLMProvider):
+    """Anthropic messages through the SDK's async client"""
+
+    name = "claude"
+
+    def __init__(self):
+        super().__init__(settings.claude_max_concurrency)
+
+    @property
+    def available(self) -> bool:
+        return anthropic is not None and bool(settings.claude_api_key)
+
+    def _settings(self) -> Tuple:
+        return (settings.claude_api_key,)
+
+    def _open(self):
+        return anthropic.AsyncAnthropic(api_key=settings.claude_api_key, http_client=pooled_http_client())
+
+    async def _chat(self, client, messages, model, temperature, max_tokens):
+        system, messages = split_system(messages)
+        options: Dict[str, Any] = {"system": system} if system else {}
+        if temperature is not None:
+            options["temperature"] = temperature
+        response = await client.messages.create(
+            model=model or settings.claude_model,
+            max_tokens=max_tokens or 1024,
+            messages=messages,
+            **options
+        )
+        return response.content[0].text
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini through the SDK's async generate_content"""
+
+    name = "gemini"
+
+    def __init__(self):
+        super().__init__(settings.gemini_max_concurrency)
+
+    @property
+    def available(self) -> bool:
+        return genai is not None and bool(settings.gemini_api_key)
+
+    def _settings(self) -> Tuple:
+        return (settings.gemini_api_key,)
+
+    def _open(self):
+        genai.configure(api_key=settings.gemini_api_key)
+        # GenerativeModel per model name
+        return {}
+
+    @staticmethod
+    async def _close_client(client):
+        pass
+
+    async def _chat(self, client, messages, model, temperature, max_tokens):
+        model_name = model or settings.gemini_model
+        if model_name not in client:
+            client[model_name] = genai.GenerativeModel(model_name)
+        system, messages = split_system(messages)
+        prompt = "\n".join(f"{'User' if m['role'] == 'user' else 'Assistant'}: {m['content']}" for m in messages)
+        prompt = f"{system}\n\n{prompt}\nAssistant:" if system else f"{prompt}\nAssistant:"
+        generation_config: Dict[str, Any] = {}
+        if temperature is not None:
+            generation_config["temperature"] = temperature
+        if max_tokens is not None:
+            generation_config["max_output_tokens"] = max_tokens
+        response = await client[model_name].generate_content_async(prompt, generation_config=generation_config)
+        return response.text
+
+
+class GraniteProvider(LLMProvider):
+    """Local Granite inference, loaded and run in a dedicated thread pool"""
+
+    name = "granite"
+
+    def __init__(self):
+        super().__init__(settings.granite_max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="granite")
+        self._load_lock = threading.Lock()
+        self._load_failed = False
+        self.model = None
+        self.tokenizer = None
+
+    @property
+    def available(self) -> bool:
+        return AutoTokenizer is not None and AutoModelForCausalLM is not None and not self._load_failed
+
+    def load(self) -> bool:
+        """Load the model once (blocking); False if it cannot be loaded"""
+        with self._load_lock:
+            if self.model is None and self.available:
+                try:
+                    self.tokenizer = AutoTokenizer.from_pretrained(settings.granite_model)
+                    self.model = AutoModelForCausalLM.from_pretrained(
+                        settings.granite_model,
+                        torch_dtype=torch.float16 if torch and torch.cuda.is_available() else None,
+                        device_map="auto" if torch and torch.cuda.is_available() else None
+                    )
+                    logger.info(f"Loaded Granite model: {settings.granite_model}")
+                except Exception as e:
+                    logger.error(f"Failed to load Granite model: {e}")
+                    self._load_failed = True
+            return self.model is not None
+
+    async def load_async(self) -> bool:
+        """Load the model in the Granite executor"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.load)
+
+    def _generate(self, prompt: str, temperature: Optional[float], max_tokens: Optional[int]) -> str:
+        if not self.load():
+            raise ProviderUnavailable("Granite model not available")
+        inputs = self.tokenizer(prompt, return_tensors="pt")
+        if torch and torch.cuda.is_available():
+            inputs = inputs.to("cuda")
+        with torch.no_grad():
+            outputs = self.model.generate(
+                **inputs,
+                max_new_tokens=max_tokens or 200,
+                temperature=0.7 if temperature is None else temperature,
+                do_sample=True,
+                pad_token_id=self.tokenizer.eos_token_id
+            )
+        response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+        # Keep only the assistant's reply
+        if "<|assistant|>" in response:
+            response = response.split("<|assistant|>")[-1]
+        return response.strip()
+
+    async def _chat(self, client, messages, model, temperature, max_tokens):
+        prompt = "".join(f"<|{m['role']}|>\n{m['content']}\n" for m in messages) + "<|assistant|>\n"
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._generate, prompt, temperature, max_tokens)
+
+
+PROVIDERS = {
+    "ollama": OllamaProvider,
+    "openai": OpenAIProvider,
+    "claude": ClaudeProvider,
+    "gemini": GeminiProvider,
+    "granite": GraniteProvider,
+}
+
+_providers: Dict[str, LLMProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(name: str) -> LLMProvider:
+    """The shared provider of a backend ("ollama", "openai", "claude", "gemini" or "granite")"""
+    with _providers_lock:
+        provider = _providers.get(name)
+        if provider is None:
+            provider = _providers[name] = PROVIDERS[name]()
+        return provider
+
+
+async def close_providers():
+    """Close the providers' connection pools"""
+    for provider in list(_providers.values()):
+        await provider.aclose()
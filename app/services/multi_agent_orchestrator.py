@@ -8,10 +8,28 @@ from .github_agent import GitHubAgent
 from .calendar_agent import CalendarAgent
 from .general_agent import GeneralAgent
 from .must_gather_agent import MustGatherAgent
+from .keyword_router import KeywordRouter, Route, RoutingDecision, tokenize
 import re
 
 logger = logging.getLogger(__name__)
 
+# Jira issue keys (e.g., OCPQE-30241, OCPBUGS-12345) route to Jira before any keyword
+JIRA_ISSUE_KEY = re.compile(r'[A-Z]+-\d+')
+
+# Explicit domain keywords, in priority order: the first route with a keyword in the
+# message wins. Must-gather comes first to avoid conflicts with other keywords.
+ROUTES = [
+    Route("must_gather", "must_gather", ("must-gather", "mustgather", "gather", "analysis", "cluster", "troubleshoot", "debug", "report", "compare", "extract", "analyze", "diagnostic", "diagnostics")),
+    Route("gmail", "email", ("email", "emails", "gmail", "mail", "inbox", "unread", "sender", "subject", "template", "draft", "sentiment", "translate", "group", "remind", "reminder", "follow up", "follow-up", "followup", "thank you", "thank-you", "thankyou", "thanks", "reply", "respond", "compose", "write")),
+    Route("jira", "jira", ("jira", "issue", "bug", "story", "task", "epic", "sprint", "ocpqe", "ocpbugs")),
+    Route("kubernetes", "kubernetes", ("kubectl", "oc", "pod", "pods", "namespace", "deployment", "service", "kubernetes", "openshift", "ocp", "deploy", "deploying", "list", "get", "describe", "logs", "exec", "scale", "rollout", "ingress", "route", "pvc", "pv", "storage", "network", "rbac", "configmap", "secret", "node", "cluster")),
+    Route("github", "github", ("github", "pr", "pull request", "commit", "repository", "repo")),
+    Route("calendar", "calendar", ("calendar", "cal", "schedule meeting", "schedule call", "meeting", "event", "appointment", "agenda", "show my calendar", "show calendar", "my calendar", "accept meeting", "accept invite", "book call", "set up call", "meeting reminder", "send invite", "send meeting", "invitation")),
+]
+
+# Compiled once for all orchestrators
+KEYWORD_ROUTER = KeywordRouter(ROUTES)
+
 class MultiAgentOrchestrator:
     """Orchestrates routing to specialized agents based on message content"""
     
@@ -68,29 +86,45 @@ class MultiAgentOrchestrator:
             'extract', 'analyze'
         ]
         
+        # Agents' own domain keywords, used when no explicit domain keyword matches.
+        # Agents without domain keywords (must-gather) are only reached by ROUTES.
+        self.fallback_router = KeywordRouter([
+            Route(name, agent.get_domain_keywords()[0], tuple(agent.get_domain_keywords()))
+            for name, agent in self.agents.items()
+            if isinstance(agent, BaseAgent)
+        ])
+        
         # Priority order for agent selection (highest to lowest)
         self.agent_priority = ["jira", "kubernetes", "github", "gmail", "calendar", "general"]
         
         # Track conversation context
         self.conversation_context = {}
         
-    async def process_message(self, message: str, user_id: Optional[str] = None) -> Dict[str, Any]:
-        """Process a message by routing it to the appropriate agent"""
+    async def process_message(self, message: str, user_id: Optional[str] = None,
+                              context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Process a message by routing it to the appropriate agent.
+
+        context is the caller's per-user conversation context; without it the
+        context is tracked here by user_id.
+        """
         try:
             logger.info(f"DEBUG: MultiAgentOrchestrator.process_message called with message: '{message}'")
             # Determine which agent should handle this message
-            selected_agent_name, selected_agent_domain, confidence = self._select_agent(message)
+            decision = self._route(message)
+            selected_agent_name, selected_agent_domain = decision.agent, decision.domain
             
             # Set context for the selected agent
-            if user_id:
-                self.conversation_context[user_id] = {
+            if context is None and user_id:
+                context = self.conversation_context.setdefault(user_id, {})
+            if context is not None:
+                context.update({
                     "last_agent": selected_agent_name,
                     "last_domain": selected_agent_domain,
                     "timestamp": self._get_current_timestamp()
-                }
+                })
             
             # Process the message with the selected agent
-            response = await self.agents[selected_agent_name].process_message(message, self.conversation_context.get(user_id))
+            response = await self.agents[selected_agent_name].process_message(message, context)
             
             # Add orchestrator metadata
             response.update({
@@ -98,7 +132,8 @@ class MultiAgentOrchestrator:
                     "selected_agent": selected_agent_name,
                     "agent_domain": selected_agent_domain,
                     "available_agents": list(self.agents.keys()),
-                    "confidence": response.get("confidence", 0.0)
+                    "confidence": response.get("confidence", 0.0),
+                    "routing": decision.breakdown()
                 }
             })
             
@@ -113,61 +148,29 @@ class MultiAgentOrchestrator:
     
     def _select_agent(self, message: str) -> Tuple[str, str, float]:
         """Select the most appropriate agent for the message"""
-        message_lower = message.lower()
+        return self._route(message).as_tuple()
+    
+    def _route(self, message: str) -> RoutingDecision:
+        """Route a message to an agent, recording which keywords fired"""
+        words = tokenize(message)
+        route, keywords = KEYWORD_ROUTER.first(words)
         
         # Check for Jira issue keys first (highest priority)
-        import re
-        jira_issue_pattern = r'[A-Z]+-\d+'
-        if re.search(jira_issue_pattern, message):
-            # If Jira issue key is found, prioritize Jira agent
+        if '-' in message and JIRA_ISSUE_KEY.search(message):
             logger.debug(f"Jira issue key detected, prioritizing Jira agent")
-            return "jira", "jira", 0.95
-        
-        # Context-aware routing - check for domain-specific keywords
-        email_keywords = ["email", "emails", "gmail", "mail", "inbox", "unread", "sender", "subject", "template", "draft", "sentiment", "translate", "group", "remind", "reminder", "follow up", "follow-up", "followup", "thank you", "thank-you", "thankyou", "thanks", "reply", "respond", "compose", "write"]
-        jira_keywords = ["jira", "issue", "bug", "story", "task", "epic", "sprint", "ocpqe", "ocpbugs"]
-        kubernetes_keywords = ["kubectl", "oc", "pod", "pods", "namespace", "deployment", "service", "kubernetes", "openshift", "ocp", "deploy", "deploying", "list", "get", "describe", "logs", "exec", "scale", "rollout", "ingress", "route", "pvc", "pv", "storage", "network", "rbac", "configmap", "secret", "node", "cluster"]
-        github_keywords = ["github", "pr", "pull request", "commit", "repository", "repo"]
-        calendar_keywords = ["calendar", "cal", "schedule meeting", "schedule call", "meeting", "event", "appointment", "agenda", "show my calendar", "show calendar", "my calendar", "accept meeting", "accept invite", "book call", "set up call", "meeting reminder", "send invite", "send meeting", "invitation"]
-        must_gather_keywords = ["must-gather", "mustgather", "gather", "analysis", "cluster", "troubleshoot", "debug", "report", "compare", "extract", "analyze", "diagnostic", "diagnostics"]
-        
-        # Check for explicit domain keywords and prioritize accordingly
-        # Must-gather should be checked first to avoid conflicts with other keywords
-        logger.debug(f"Checking must-gather keywords: {must_gather_keywords}")
-        logger.debug(f"Message lower: {message_lower}")
-        if any(keyword in message_lower for keyword in must_gather_keywords):
-            logger.debug(f"Must-gather keyword found, routing to must_gather agent")
-            return "must_gather", "must_gather", 0.9
-        
-        if any(keyword in message_lower for keyword in email_keywords):
-            return "gmail", "email", 0.9
-        
-        if any(keyword in message_lower for keyword in jira_keywords):
-            return "jira", "jira", 0.9
-        
-        if any(keyword in message_lower for keyword in kubernetes_keywords):
-            return "kubernetes", "kubernetes", 0.9
+            return RoutingDecision("jira", "jira", 0.95, "jira_key", keywords)
         
-        if any(keyword in message_lower for keyword in github_keywords):
-            return "github", "github", 0.9
+        # Explicit domain keywords, in priority order
+        if route:
+            return RoutingDecision(route.agent, route.domain, 0.9, "keyword", keywords)
         
-        if any(keyword in message_lower for keyword in calendar_keywords):
-            return "calendar", "calendar", 0.9
-        
-        # If no explicit domain keywords, use priority-based scoring
-        agent_scores = {}
-        
-        for agent_name, agent in self.agents.items():
-            score = agent.should_handle(message)
-            agent_scores[agent_name] = score
-        
-        # Select agent with highest score
-        if agent_scores:
-            best_agent = max(agent_scores.items(), key=lambda x: x[1])
-            return best_agent[0], self.agents[best_agent[0]].get_domain_keywords()[0], best_agent[1]
+        # If no explicit domain keywords, use the agents' own domain keywords
+        route, agent_keywords = self.fallback_router.best(words)
+        if route:
+            return RoutingDecision(route.agent, route.domain, 0.7, "fallback", agent_keywords)
         
         # Fallback to general agent
-        return "general", "general", 0.5
+        return RoutingDecision("general", "general", 0.5, "default", keywords)
     
     def _calculate_agent_score(self, agent: BaseAgent, message_lower: str) -> float:
         """Calculate a score for how well an agent matches the message"""
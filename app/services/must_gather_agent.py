@@ -4,17 +4,76 @@ Must-Gather Analysis Agent for OpenShift clusters
 
 import os
 import re
+import time
+import hashlib
+import fnmatch
+import asyncio
 import logging
 import tempfile
 import shutil
 import zipfile
 import tarfile
+from collections import deque
+from functools import partial
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple, Union, BinaryIO, Callable
 from dataclasses import dataclass, field
 
+from app.services.must_gather_cache import MustGatherResultCache, iter_tree_files, merge_tree, walk_tree
+from app.services.must_gather_evidence import EvidenceCollector, message_key
+from app.services.must_gather_patterns import (
+    DEFAULT_CLASSIFIER, EVIDENCE_LINE_LENGTH, ErrorLineClassifier, IssueCategory
+)
+
 logger = logging.getLogger(__name__)
 
+# File types scanned for error lines
+SCAN_EXTENSIONS = ('.log', '.yaml', '.json')
+
+# Distinct error messages whose classification is remembered while scanning one file
+CLASSIFY_MEMO_SIZE = 65536
+
+# Below this many files the process pool costs more than it saves
+PARALLEL_SCAN_MIN_FILES = 64
+
+# Files counted in analysis_metadata['files_analyzed']
+COUNTED_EXTENSIONS = ('.log', '.yaml', '.json', '.txt')
+
+# Archive formats that can be analyzed without extraction
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2')
+ZIP_SUFFIXES = ('.zip',)
+
+CLUSTER_VERSION_FILE = 'cluster-scoped-resources/config.openshift.io/clusterversions.yaml'
+
+# Threads running blocking scans; kept apart from the default executor, which serves
+# every other run_in_executor(None, ...) in the app
+SCAN_THREADS = 4
+
+_scan_executor: Optional[ThreadPoolExecutor] = None
+_scan_executor_lock = threading.Lock()
+
+
+def scan_executor() -> ThreadPoolExecutor:
+    """The dedicated executor for must-gather scans"""
+    global _scan_executor
+    with _scan_executor_lock:
+        if _scan_executor is None:
+            _scan_executor = ThreadPoolExecutor(max_workers=SCAN_THREADS, thread_name_prefix="must-gather-scan")
+        return _scan_executor
+
+# Progress callback: (phase, items done, items total or None when unknown)
+ProgressCallback = Callable[[str, int, Optional[int]], None]
+
+# Files sampled for the log evidence shown in the UI
+SAMPLE_LOG_PATTERNS = [
+    'cluster-scoped-resources/*/events.yaml',
+    'namespaces/openshift-kube-apiserver/pods/*/logs/*',
+    'namespaces/openshift-etcd/pods/*/logs/*'
+]
+
 @dataclass
 class ClusterIssue:
     """Represents a cluster issue found in must-gather"""
@@ -24,6 +83,8 @@ class ClusterIssue:
     affected_components: List[str]
     recommendations: List[str]
     evidence: List[str] = field(default_factory=list)
+    evidence_counts: List[int] = field(default_factory=list)  # times each evidence message was seen
+    occurrences: int = 0  # exact number of matching error lines
 
 @dataclass
 class MustGatherAnalysis:
@@ -40,55 +101,331 @@ class MustGatherAnalysis:
     files_analyzed: str = "Multiple log files"
     log_evidence: List[Dict[str, str]] = None
     analysis_metadata: Dict[str, Any] = None
+    ai_generated: bool = False  # False when the fallback analysis was used
+
+def analysis_to_dict(analysis: MustGatherAnalysis) -> Dict[str, Any]:
+    """Serialize a MustGatherAnalysis for API responses"""
+    return {
+        "summary": analysis.summary,
+        "root_cause": analysis.root_cause,
+        "priority": analysis.priority,
+        "immediate_actions": analysis.immediate_actions,
+        "long_term_recommendations": analysis.long_term_recommendations,
+        "next_steps": analysis.next_steps,
+        "issues_count": len(analysis.issues),
+        "issues": [
+            {
+                "type": issue.issue_type,
+                "severity": issue.severity,
+                "description": issue.description,
+                "affected_components": issue.affected_components,
+                "recommendations": issue.recommendations,
+                "evidence_count": len(issue.evidence),
+                "evidence": issue.evidence[:3],  # Include top 3 evidence items
+                "evidence_counts": issue.evidence_counts[:3],
+                "occurrences": issue.occurrences or len(issue.evidence)
+            }
+            for issue in analysis.issues
+        ],
+        "log_evidence": analysis.log_evidence or [],
+        "analysis_metadata": analysis.analysis_metadata or {},
+        "confidence": getattr(analysis, 'confidence', 85),
+        "files_analyzed": getattr(analysis, 'files_analyzed', 'Multiple log files')
+    }
+
+
+def _scan_file(classifier: ErrorLineClassifier, file_path: str) -> List[ClusterIssue]:
+    """Stream a single file line by line and classify its errors (process pool worker)"""
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            return MustGatherAgent._analyze_file_content(f, file_path, classifier)
+    except Exception as e:
+        logger.warning(f"Could not read file {file_path}: {e}")
+        return []
+
+
+def _hash_and_scan_file(classifier: ErrorLineClassifier, file_path: str) -> Tuple[Optional[str], List[ClusterIssue]]:
+    """Hash a file's content while classifying its lines, in a single read (process pool worker)"""
+    digest = hashlib.sha256()
+    
+    def lines(f):
+        for raw_line in f:
+            digest.update(raw_line)
+            yield raw_line.decode('utf-8', errors='ignore')
+    
+    try:
+        with open(file_path, 'rb') as f:
+            issues = MustGatherAgent._analyze_file_content(lines(f), file_path, classifier)
+        return digest.hexdigest(), issues
+    except Exception as e:
+        logger.warning(f"Could not read file {file_path}: {e}")
+        return None, []
+
+
+def _iter_archive_members(archive: BinaryIO, filename: str) -> Iterator[Tuple[str, Optional[int], BinaryIO]]:
+    """Yield (name, size, binary file object) for each regular file in an uploaded must-gather.
+    
+    Each file object is only valid until the next member is requested. A file that is not
+    a known archive format is yielded as a single member.
+    """
+    lower_name = filename.lower()
+    if lower_name.endswith(ZIP_SUFFIXES):
+        with zipfile.ZipFile(archive) as zip_ref:
+            for info in zip_ref.infolist():
+                if not info.is_dir():
+                    with zip_ref.open(info) as member:
+                        yield info.filename, info.file_size, member
+    elif lower_name.endswith(TAR_SUFFIXES):
+        # Stream mode reads the archive strictly forwards, member by member
+        with tarfile.open(fileobj=archive, mode='r|*') as tar_ref:
+            for info in tar_ref:
+                if info.isfile():
+                    member = tar_ref.extractfile(info)
+                    if member is not None:
+                        yield info.name, info.size, member
+    else:
+        yield filename, None, archive
+
+
+def _tail_lines(file_path: str, count: int, block_size: int = 64 * 1024) -> List[str]:
+    """Last count lines of a file, reading whole blocks backwards from the end"""
+    with open(file_path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        data = b''
+        while position > 0 and data.count(b'\n') <= count:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = data.splitlines()
+    # A partial first line is dropped unless the file was read from its start
+    if position > 0:
+        lines = lines[1:]
+    return [line.decode('utf-8', errors='ignore') for line in lines[-count:]]
+
+
+def _must_gather_relative_path(name: str) -> str:
+    """Strip the archive's leading directories so member names match must-gather layout patterns"""
+    parts = name.replace('\\', '/').split('/')
+    for marker in ('cluster-scoped-resources', 'namespaces', 'etcd_info', 'host_service_logs'):
+        if marker in parts:
+            return '/'.join(parts[parts.index(marker):])
+    return '/'.join(parts)
+
+
+def _decode_lines(member: BinaryIO) -> Iterator[str]:
+    """Decode a binary member line by line (tar stream members are not seekable, which TextIOWrapper needs)"""
+    for raw_line in member:
+        yield raw_line.decode('utf-8', errors='ignore')
+
+
+def _tee_into(lines: Iterable[str], sink: deque) -> Iterator[str]:
+    """Pass lines through while also appending them to sink"""
+    for line in lines:
+        sink.append(line)
+        yield line
+
 
 class MustGatherAgent:
     """Analyzes OpenShift must-gather logs"""
     
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None, issue_categories: Optional[List[IssueCategory]] = None,
+                 result_cache: Optional[MustGatherResultCache] = None, use_result_cache: bool = True):
         self.ai_agent = None
-        
-    async def analyze_must_gather(self, must_gather_path: str, model_preference: str = "ollama") -> MustGatherAnalysis:
+        # Content-addressed cache of scan and LLM results for directory analyses
+        self.result_cache = (result_cache or MustGatherResultCache()) if use_result_cache else None
+        # Extra or replacement issue categories compile into a dedicated classifier
+        self.classifier = ErrorLineClassifier(issue_categories) if issue_categories is not None else DEFAULT_CLASSIFIER
+        # Worker processes used to scan log files; 1 disables the process pool
+        self.max_workers = max_workers or os.cpu_count() or 1
+        
+    async def analyze_must_gather(self, must_gather_path: str, model_preference: str = "ollama",
+                                  progress: Optional[ProgressCallback] = None) -> MustGatherAnalysis:
         """Analyze must-gather logs and return structured analysis"""
         if not os.path.exists(must_gather_path):
             raise FileNotFoundError(f"Must-gather path not found: {must_gather_path}")
         
         logger.info(f"Starting must-gather analysis of {must_gather_path}")
+        loop = asyncio.get_running_loop()
         
         # Extract cluster information
         cluster_info = self._extract_cluster_info(must_gather_path)
         
-        # Analyze logs for issues
-        issues = self._analyze_logs(must_gather_path)
+        # Analyze logs for issues; the scan blocks, so keep it off the event loop
+        scan = self._scan_logs_cached if self.result_cache else self._scan_logs
+        issues, scan_stats = await loop.run_in_executor(scan_executor(), scan, must_gather_path, progress)
+        
+        # Generate AI analysis, reusing an earlier result for identical content and model
+        if progress:
+            progress('ai_analysis', 0, None)
+        analysis = self._cached_ai_analysis(scan_stats, model_preference, cluster_info, issues)
+        if analysis is None:
+            analysis = await self._generate_ai_analysis(cluster_info, issues, model_preference)
+            self._store_ai_analysis(scan_stats, model_preference, analysis)
+        
+        # Add evidence and metadata
+        if progress:
+            progress('collecting_evidence', 0, None)
+        analysis.log_evidence, files_analyzed = await loop.run_in_executor(
+            scan_executor(), lambda: (self._extract_log_evidence(must_gather_path, issues), self._count_analyzed_files(must_gather_path))
+        )
+        analysis.analysis_metadata = self._analysis_metadata(analysis, issues, files_analyzed, scan_stats)
+        
+        return analysis
+    
+    async def analyze_must_gather_archive(self, archive: BinaryIO, filename: str, model_preference: str = "ollama",
+                                          progress: Optional[ProgressCallback] = None) -> MustGatherAnalysis:
+        """Analyze a must-gather archive by streaming its members, without extracting it to disk.
+        
+        Tar archives are read in stream mode, so archive can be a non-seekable stream that
+        is still being received; zip archives need a seekable file.
+        """
+        logger.info(f"Starting streaming must-gather analysis of {filename}")
+        
+        loop = asyncio.get_running_loop()
+        scan = await loop.run_in_executor(scan_executor(), self._scan_archive, archive, filename, progress)
         
         # Generate AI analysis
-        analysis = await self._generate_ai_analysis(cluster_info, issues, model_preference)
+        if progress:
+            progress('ai_analysis', 0, None)
+        analysis = await self._generate_ai_analysis(scan['cluster_info'], scan['issues'], model_preference)
         
         # Add evidence and metadata
-        analysis.log_evidence = self._extract_log_evidence(must_gather_path, issues)
-        analysis.analysis_metadata = {
+        analysis.log_evidence = (self._issue_evidence(scan['issues']) + scan['samples'])[:12]
+        analysis.analysis_metadata = self._analysis_metadata(
+            analysis, scan['issues'], scan['files_analyzed'], scan['stats']
+        )
+        
+        return analysis
+    
+    def _cached_ai_analysis(self, scan_stats: Dict[str, Any], model_preference: str,
+                            cluster_info: Dict[str, Any], issues: List[ClusterIssue]) -> Optional[MustGatherAnalysis]:
+        """LLM analysis cached for this content root and model, if any"""
+        if not self.result_cache or 'content_root' not in scan_stats:
+            return None
+        cached = self.result_cache.get_ai_analysis(scan_stats['content_root'], self.classifier.cache_key, model_preference)
+        if cached is None:
+            return None
+        logger.info(f"Reusing cached {model_preference} analysis for content root {scan_stats['content_root'][:12]}")
+        return MustGatherAnalysis(cluster_info=cluster_info, issues=issues, ai_generated=True, **cached)
+    
+    def _store_ai_analysis(self, scan_stats: Dict[str, Any], model_preference: str, analysis: MustGatherAnalysis):
+        """Cache a model-generated analysis; fallback analyses are not cached so a later run retries the model"""
+        if not self.result_cache or 'content_root' not in scan_stats or not analysis.ai_generated:
+            return
+        self.result_cache.put_ai_analysis(scan_stats['content_root'], self.classifier.cache_key, model_preference, {
+            'summary': analysis.summary,
+            'root_cause': analysis.root_cause,
+            'immediate_actions': analysis.immediate_actions,
+            'long_term_recommendations': analysis.long_term_recommendations,
+            'priority': analysis.priority,
+            'next_steps': analysis.next_steps,
+            'confidence': analysis.confidence
+        })
+    
+    def _analysis_metadata(self, analysis: MustGatherAnalysis, issues: List[ClusterIssue],
+                           files_analyzed: int, scan_stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the analysis_metadata block"""
+        return {
             'analysis_time': datetime.now().isoformat(),
-            'files_analyzed': self._count_analyzed_files(must_gather_path),
+            'files_analyzed': files_analyzed,
             'ai_model_used': 'Multi-Model AI',
             'issues_found': len(issues),
             'priority': analysis.priority,
-            'confidence_factors': self._calculate_confidence_factors(issues)
+            'confidence_factors': self._calculate_confidence_factors(issues),
+            'scan_throughput': scan_stats
         }
-        
-        return analysis
     
-    def _extract_log_evidence(self, must_gather_path: str, issues: List[ClusterIssue]) -> List[Dict[str, str]]:
-        """Extract key log evidence for display"""
+    def _scan_archive(self, archive: BinaryIO, filename: str, progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """Classify every relevant archive member in a single sequential pass"""
+        start = time.perf_counter()
+        cluster_info = self._empty_cluster_info()
+        consolidated_issues: List[ClusterIssue] = []
+        samples: List[Dict[str, str]] = []
+        sampled_per_pattern: Dict[str, int] = {}
+        files_scanned = files_counted = skipped = bytes_scanned = 0
+        
+        for name, size, member in _iter_archive_members(archive, filename):
+            rel_path = _must_gather_relative_path(name)
+            sample_pattern = next((pattern for pattern in SAMPLE_LOG_PATTERNS if fnmatch.fnmatch(rel_path, pattern)), None)
+            is_version_file = rel_path == CLUSTER_VERSION_FILE
+            if name.endswith(COUNTED_EXTENSIONS):
+                files_counted += 1
+            
+            # Irrelevant members are skipped without being read or written anywhere
+            if not (name.endswith(SCAN_EXTENSIONS) or sample_pattern or is_version_file):
+                skipped += 1
+                continue
+            
+            if is_version_file:
+                content = member.read().decode('utf-8', errors='ignore')
+                cluster_info = self._cluster_info_from_version(content)
+                lines: Iterable[str] = content.split('\n')
+            else:
+                lines = _decode_lines(member)
+            
+            # Keep the tail of sampled logs while the classifier consumes the lines
+            tail = deque(maxlen=50) if sample_pattern and len(samples) < 6 and sampled_per_pattern.get(sample_pattern, 0) < 2 else None
+            if tail is not None:
+                lines = _tee_into(lines, tail)
+            
+            if name.endswith(SCAN_EXTENSIONS):
+                files_scanned += 1
+                bytes_scanned += size or 0
+                if progress:
+                    progress('scanning', files_scanned, None)
+                file_issues = self._analyze_file_content(lines, name, self.classifier)
+                if file_issues:
+                    logger.info(f"Found {len(file_issues)} issues in {name}")
+                    consolidated_issues = self._consolidate_issues(consolidated_issues + file_issues)
+            elif tail is not None:
+                deque(lines, maxlen=0)  # drain into the tail
+            
+            if tail is not None:
+                sampled_per_pattern[sample_pattern] = sampled_per_pattern.get(sample_pattern, 0) + 1
+                samples.extend(self._samples_from_lines(tail, os.path.basename(name)))
+                samples = samples[:6]
+        
+        elapsed = max(time.perf_counter() - start, 1e-6)
+        stats = {
+            'files_scanned': files_scanned,
+            'files_skipped': skipped,
+            'bytes_scanned': bytes_scanned,
+            'scan_seconds': round(elapsed, 3),
+            'files_per_second': round(files_scanned / elapsed, 1),
+            'mb_per_second': round(bytes_scanned / (1024 * 1024) / elapsed, 2),
+            'workers': 1,
+            'streamed_from_archive': True
+        }
+        logger.info(f"Streamed {files_scanned} files from {filename} ({skipped} skipped), found {len(consolidated_issues)} unique issues")
+        return {
+            'cluster_info': cluster_info,
+            'issues': consolidated_issues,
+            'samples': samples,
+            'files_analyzed': files_counted,
+            'stats': stats
+        }
+    
+    def _issue_evidence(self, issues: List[ClusterIssue]) -> List[Dict[str, str]]:
+        """Evidence entries taken from the classified issues"""
         evidence = []
-        
-        # Add evidence from issues (processed evidence)
         for issue in issues:
-            for log_entry in issue.evidence[:3]:  # Top 3 evidence per issue
+            for index, log_entry in enumerate(issue.evidence[:3]):  # Top 3 evidence per issue
                 evidence.append({
                     'source': issue.issue_type.replace('_', ' ').title(),
                     'message': log_entry,
                     'severity': issue.severity,
+                    'count': issue.evidence_counts[index] if index < len(issue.evidence_counts) else 1,
                     'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                 })
+        return evidence
+    
+    def _extract_log_evidence(self, must_gather_path: str, issues: List[ClusterIssue]) -> List[Dict[str, str]]:
+        """Extract key log evidence for display"""
+        evidence = []
+        
+        # Add evidence from issues (processed evidence)
+        evidence.extend(self._issue_evidence(issues))
         
         # Try to add some actual log file samples
         try:
@@ -105,13 +442,7 @@ class MustGatherAgent:
         sample_evidence = []
         
         # Look for common log files
-        log_patterns = [
-            'cluster-scoped-resources/*/events.yaml',
-            'namespaces/openshift-kube-apiserver/pods/*/logs/*',
-            'namespaces/openshift-etcd/pods/*/logs/*'
-        ]
-        
-        for pattern in log_patterns:
+        for pattern in SAMPLE_LOG_PATTERNS:
             try:
                 files = glob.glob(os.path.join(must_gather_path, pattern))
                 for log_file in files[:2]:  # Limit to 2 files per pattern
@@ -129,31 +460,31 @@ class MustGatherAgent:
     
     def _extract_log_samples(self, file_path: str) -> List[Dict[str, str]]:
         """Extract sample log entries from a file"""
-        samples = []
-        file_name = os.path.basename(file_path)
-        
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-                
-            # Look for error-like patterns in recent lines
-            recent_lines = lines[-50:] if len(lines) > 50 else lines
-            error_patterns = ['error', 'failed', 'timeout', 'unable', 'connection refused']
-            
-            for line in recent_lines:
-                line = line.strip()
-                if len(line) > 20 and any(pattern in line.lower() for pattern in error_patterns):
-                    samples.append({
-                        'source': file_name,
-                        'message': line[:150] + ('...' if len(line) > 150 else ''),
-                        'severity': 'high' if 'error' in line.lower() or 'failed' in line.lower() else 'medium',
-                        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    })
-                    if len(samples) >= 2:  # Max 2 samples per file
-                        break
-                        
+            # Only the last 50 lines are inspected, read backwards from the end of the file
+            recent_lines = _tail_lines(file_path, 50)
+            return self._samples_from_lines(recent_lines, os.path.basename(file_path))
         except Exception as e:
             logger.debug(f"Error reading {file_path}: {e}")
+            return []
+    
+    def _samples_from_lines(self, recent_lines: Iterable[str], file_name: str) -> List[Dict[str, str]]:
+        """Pick up to 2 error-like sample entries from the recent lines of a log"""
+        samples = []
+        error_patterns = ['error', 'failed', 'timeout', 'unable', 'connection refused']
+        
+        # Look for error-like patterns in recent lines
+        for line in recent_lines:
+            line = line.strip()
+            if len(line) > 20 and any(pattern in line.lower() for pattern in error_patterns):
+                samples.append({
+                    'source': file_name,
+                    'message': line[:150] + ('...' if len(line) > 150 else ''),
+                    'severity': 'high' if 'error' in line.lower() or 'failed' in line.lower() else 'medium',
+                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                })
+                if len(samples) >= 2:  # Max 2 samples per file
+                    break
         
         return samples
     
@@ -162,7 +493,7 @@ class MustGatherAgent:
         count = 0
         for root, dirs, files in os.walk(must_gather_path):
             for file in files:
-                if file.endswith(('.log', '.yaml', '.json', '.txt')):
+                if file.endswith(COUNTED_EXTENSIONS):
                     count += 1
         return count
     
@@ -179,56 +510,113 @@ class MustGatherAgent:
             'evidence_quality': 'high' if total_evidence > 10 else 'medium' if total_evidence > 5 else 'low'
         }
     
-    def _extract_cluster_info(self, must_gather_path: str) -> Dict[str, Any]:
-        """Extract basic cluster information from must-gather"""
-        cluster_info = {
+    def _empty_cluster_info(self) -> Dict[str, Any]:
+        return {
             'cluster_version': 'Unknown',
             'nodes': [],
             'operators': [],
             'etcd_members': [],
             'api_services': []
         }
-        
+    
+    def _cluster_info_from_version(self, content: str) -> Dict[str, Any]:
+        """Build cluster information from the clusterversions.yaml content"""
+        cluster_info = self._empty_cluster_info()
+        version_match = re.search(r'version:\s*([^\s]+)', content)
+        if version_match:
+            cluster_info['cluster_version'] = version_match.group(1)
+        return cluster_info
+    
+    def _extract_cluster_info(self, must_gather_path: str) -> Dict[str, Any]:
+        """Extract basic cluster information from must-gather"""
         # Look for cluster version
-        version_file = os.path.join(must_gather_path, 'cluster-scoped-resources/config.openshift.io/clusterversions.yaml')
+        version_file = os.path.join(must_gather_path, CLUSTER_VERSION_FILE)
         if os.path.exists(version_file):
             try:
                 with open(version_file, 'r') as f:
-                    content = f.read()
-                    version_match = re.search(r'version:\s*([^\s]+)', content)
-                    if version_match:
-                        cluster_info['cluster_version'] = version_match.group(1)
+                    return self._cluster_info_from_version(f.read())
             except Exception as e:
                 logger.warning(f"Could not read cluster version: {e}")
         
-        return cluster_info
+        return self._empty_cluster_info()
     
     def _analyze_logs(self, must_gather_path: str) -> List[ClusterIssue]:
         """Analyze logs for various issues"""
-        all_issues = []
-        files_analyzed = 0
+        issues, _ = self._scan_logs(must_gather_path)
+        return issues
+    
+    def _scan_logs(self, must_gather_path: str, progress: Optional[ProgressCallback] = None) -> Tuple[List[ClusterIssue], Dict[str, Any]]:
+        """Scan all log files, fanning them out across a process pool, and return issues plus throughput stats"""
+        start = time.perf_counter()
+        tree = walk_tree(must_gather_path, SCAN_EXTENSIONS)
+        scan_files = list(iter_tree_files(tree))
+        file_paths = [path for path, _, _ in scan_files]
+        bytes_scanned = sum(size for _, _, size in scan_files)
+        
+        found: Dict[str, List[ClusterIssue]] = {}
+        total_issues = 0
+        
+        for files_done, (file_path, file_issues) in enumerate(zip(file_paths, self._map_files(_scan_file, file_paths)), start=1):
+            if progress:
+                progress('scanning', files_done, len(file_paths))
+            if file_issues:
+                logger.info(f"Found {len(file_issues)} issues in {file_path}")
+                total_issues += len(file_issues)
+                found[file_path] = file_issues
+        
+        # Merged in the same order as the result cache, so both return the same evidence
+        consolidated_issues = merge_tree(tree, lambda path: found.get(path, []), self._consolidate_issues)
+        
+        elapsed = max(time.perf_counter() - start, 1e-6)
+        scan_stats = {
+            'files_scanned': len(file_paths),
+            'bytes_scanned': bytes_scanned,
+            'scan_seconds': round(elapsed, 3),
+            'files_per_second': round(len(file_paths) / elapsed, 1),
+            'mb_per_second': round(bytes_scanned / (1024 * 1024) / elapsed, 2),
+            'workers': self._pool_size(len(file_paths))
+        }
         
-        # Walk through all log files
-        for root, dirs, files in os.walk(must_gather_path):
-            for file in files:
-                if file.endswith(('.log', '.yaml', '.json')):
-                    file_path = os.path.join(root, file)
-                    files_analyzed += 1
-                    try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                            file_issues = self._analyze_file_content(content, file_path)
-                            if file_issues:
-                                logger.info(f"Found {len(file_issues)} issues in {file_path}")
-                            all_issues.extend(file_issues)
-                    except Exception as e:
-                        logger.warning(f"Could not read file {file_path}: {e}")
-        
-        # Consolidate duplicate issues
-        consolidated_issues = self._consolidate_issues(all_issues)
-        
-        logger.info(f"Analyzed {files_analyzed} files, found {len(consolidated_issues)} unique issues (from {len(all_issues)} total)")
-        return consolidated_issues
+        logger.info(f"Analyzed {len(file_paths)} files, found {len(consolidated_issues)} unique issues (from {total_issues} total) "
+                    f"at {scan_stats['files_per_second']} files/s, {scan_stats['mb_per_second']} MB/s")
+        return consolidated_issues, scan_stats
+    
+    def _scan_logs_cached(self, must_gather_path: str, progress: Optional[ProgressCallback] = None) -> Tuple[List[ClusterIssue], Dict[str, Any]]:
+        """Scan through the content-addressed cache, so only changed files and subtrees are rescanned"""
+        issues, scan_stats = self.result_cache.scan(
+            must_gather_path, self.classifier.cache_key, SCAN_EXTENSIONS,
+            hash_and_scan=lambda paths: self._map_files(_hash_and_scan_file, paths),
+            consolidate=self._consolidate_issues, issue_type=ClusterIssue, progress=progress
+        )
+        scan_stats['workers'] = self._pool_size(scan_stats['files_scanned'])
+        return issues, scan_stats
+    
+    def _pool_size(self, file_count: int) -> int:
+        """Number of worker processes used for a scan of file_count files"""
+        if self.max_workers > 1 and file_count >= PARALLEL_SCAN_MIN_FILES:
+            return min(self.max_workers, file_count)
+        return 1
+    
+    def _map_files(self, worker: Callable[[ErrorLineClassifier, str], Any], file_paths: List[str]) -> Iterator[Any]:
+        """Apply a scan worker to every file with this agent's classifier, in order,
+        fanning out across a process pool when worthwhile"""
+        # The classifier travels with every call, so concurrent scans never share worker state
+        worker = partial(worker, self.classifier)
+        done = 0
+        workers = self._pool_size(len(file_paths))
+        if workers > 1:
+            chunksize = max(1, min(64, len(file_paths) // (workers * 4)))
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    for result in pool.map(worker, file_paths, chunksize=chunksize):
+                        done += 1
+                        yield result
+                return
+            except (OSError, BrokenProcessPool) as e:
+                logger.warning(f"Parallel scan unavailable, continuing sequentially: {e}")
+        
+        for file_path in file_paths[done:]:
+            yield worker(file_path)
     
     def _consolidate_issues(self, issues: List[ClusterIssue]) -> List[ClusterIssue]:
         """Consolidate duplicate issues and merge evidence"""
@@ -238,11 +626,14 @@ class MustGatherAgent:
             key = f"{issue.issue_type}_{issue.severity}"
             
             if key in issue_map:
-                # Merge evidence from duplicate issues
+                # Merge evidence from duplicate issues, keeping the top 5 distinct messages
                 existing_issue = issue_map[key]
-                existing_issue.evidence.extend(issue.evidence)
-                # Keep only unique evidence and limit total
-                existing_issue.evidence = list(dict.fromkeys(existing_issue.evidence))[:5]
+                collector = EvidenceCollector(k=5)
+                collector.extend(existing_issue.evidence, existing_issue.evidence_counts)
+                collector.extend(issue.evidence, issue.evidence_counts)
+                existing_issue.evidence, existing_issue.evidence_counts = collector.top()
+                existing_issue.occurrences = ((existing_issue.occurrences or len(existing_issue.evidence))
+                                              + (issue.occurrences or len(issue.evidence)))
                 
                 # Merge affected components
                 existing_issue.affected_components.extend(issue.affected_components)
@@ -251,81 +642,63 @@ class MustGatherAgent:
                 # New issue type
                 issue_map[key] = issue
         
-        return list(issue_map.values())
+        # Sorted so the uncached scan and the cache (which merges per directory) agree
+        for issue in issue_map.values():
+            issue.affected_components = sorted(issue.affected_components)
+        return [issue_map[key] for key in sorted(issue_map)]
     
-    def _analyze_file_content(self, content: str, file_path: str) -> List[ClusterIssue]:
-        """Analyze file content for issues"""
-        issues = []
-        file_name = os.path.basename(file_path)
-        
-        # Extract actual error lines from content
-        lines = content.split('\n')
-        actual_errors = []
+    @staticmethod
+    def _analyze_file_content(content: Union[str, Iterable[str]], file_path: str,
+                              classifier: Optional[ErrorLineClassifier] = None) -> List[ClusterIssue]:
+        """Analyze file content (a string or an iterable of lines) for issues"""
+        classifier = classifier or DEFAULT_CLASSIFIER
+        
+        # Lines are consumed one at a time so open file objects are never loaded whole
+        lines = content.split('\n') if isinstance(content, str) else content
+        # Bounded top-3 per category; every match is still counted
+        collectors = {category.issue_type: EvidenceCollector(k=3) for category in classifier.categories}
+        is_error = classifier.is_error
+        classify = classifier.classify
+        # Logs repeat the same messages with different numbers; each message is classified once
+        classified: Dict[int, List[str]] = {}
+        memoize = classifier.digit_free
         
         for line in lines:
             line = line.strip()
             if len(line) > 20:  # Skip very short lines
                 lower_line = line.lower()
                 
-                # Collect actual error lines for evidence
-                if any(error_word in lower_line for error_word in ['error:', 'failed:', 'timeout:', 'unable to', 'connection refused']):
-                    actual_errors.append(line[:120] + ('...' if len(line) > 120 else ''))
-        
-        # Only create issues if we have actual evidence, and limit duplicates
-        issues_found = set()
-        
-        # Network connectivity issues
-        network_errors = [err for err in actual_errors if any(pattern in err.lower() for pattern in ['connection refused', 'network unreachable', 'timeout', 'unable to connect'])]
-        if network_errors and "NETWORK_CONNECTIVITY" not in issues_found:
-            issues.append(ClusterIssue(
-                issue_type="NETWORK_CONNECTIVITY",
-                severity="high",
-                description="Network connectivity issues detected",
-                affected_components=["all_services"],
-                recommendations=["Check network connectivity between nodes", "Verify DNS resolution"],
-                evidence=network_errors[:3]  # Use actual error lines
-            ))
-            issues_found.add("NETWORK_CONNECTIVITY")
-        
-        # API service failures
-        api_errors = [err for err in actual_errors if any(pattern in err.lower() for pattern in ['api server', 'unauthorized', 'forbidden', 'authentication'])]
-        if api_errors and "API_SERVICE_FAILURE" not in issues_found:
-            issues.append(ClusterIssue(
-                issue_type="API_SERVICE_FAILURE",
-                severity="critical",
-                description="OpenShift API services failing",
-                affected_components=["openshift-apiserver", "authentication", "console"],
-                recommendations=["Check API server logs", "Verify certificates", "Restart API services"],
-                evidence=api_errors[:3]  # Use actual error lines
-            ))
-            issues_found.add("API_SERVICE_FAILURE")
-        
-        # Operator issues
-        operator_errors = [err for err in actual_errors if any(pattern in err.lower() for pattern in ['operator', 'degraded', 'unavailable'])]
-        if operator_errors and "OPERATOR_DEGRADATION" not in issues_found:
-            issues.append(ClusterIssue(
-                issue_type="OPERATOR_DEGRADATION",
-                severity="medium",
-                description="Cluster operators showing degraded status",
-                affected_components=["cluster_operators"],
-                recommendations=["Check operator logs", "Verify operator configurations"],
-                evidence=operator_errors[:3]  # Use actual error lines
-            ))
-            issues_found.add("OPERATOR_DEGRADATION")
-        
-        # ETCD issues
-        etcd_errors = [err for err in actual_errors if any(pattern in err.lower() for pattern in ['etcd', 'quorum', 'leader election'])]
-        if etcd_errors and "ETCD_COMMUNICATION" not in issues_found:
+                # Collect actual error lines for evidence, classified in one pass over all categories
+                if is_error(lower_line):
+                    head = lower_line[:EVIDENCE_LINE_LENGTH]
+                    key = message_key(head)
+                    issue_types = classified.get(key) if memoize else None
+                    if issue_types is None:
+                        issue_types = classify(head)
+                        if memoize and len(classified) < CLASSIFY_MEMO_SIZE:
+                            classified[key] = issue_types
+                    # Lines are truncated for display only once they make the top 3
+                    for issue_type in issue_types:
+                        collectors[issue_type].add(line, 1, head, key)
+        
+        # Only create issues if we have actual evidence, in category table order
+        issues = []
+        for category in classifier.categories:
+            collector = collectors[category.issue_type]
+            if not collector.total:
+                continue
+            top_lines, evidence_counts = collector.top()
+            evidence = [line[:EVIDENCE_LINE_LENGTH] + ('...' if len(line) > EVIDENCE_LINE_LENGTH else '') for line in top_lines]
             issues.append(ClusterIssue(
-                issue_type="ETCD_COMMUNICATION",
-                severity="high",
-                description="etcd cluster communication issues detected",
-                affected_components=["etcd", "openshift-apiserver"],
-                recommendations=["Check etcd cluster health", "Verify etcd certificates"],
-                evidence=etcd_errors[:3]  # Use actual error lines
+                issue_type=category.issue_type,
+                severity=category.severity,
+                description=category.description,
+                affected_components=list(category.affected_components),
+                recommendations=list(category.recommendations),
+                evidence=evidence,  # Use actual error lines
+                evidence_counts=evidence_counts,
+                occurrences=collector.total
             ))
-            issues_found.add("ETCD_COMMUNICATION")
-        
         return issues
     
     async def _generate_ai_analysis(self, cluster_info: Dict[str, Any], issues: List[ClusterIssue], model_preference: str = "ollama") -> MustGatherAnalysis:
@@ -333,9 +706,11 @@ class MustGatherAgent:
         
         # Import AI agent if available
         try:
-            from app.services.ai_agent_multi_model import MultiModelAIAgent, ModelType
+            from app.services.ai_agent_multi_model import ModelType
+            from app.services.agent_registry import agent_registry
             
-            self.ai_agent = MultiModelAIAgent()
+            # Shared agent: its models are initialized once, not per analysis
+            self.ai_agent = agent_registry.multi_model_agent
             
             # Create analysis prompt
             prompt = f"""
@@ -425,7 +800,8 @@ class MustGatherAgent:
             immediate_actions=immediate_actions,
             long_term_recommendations=long_term_recommendations,
             priority=priority,
-            next_steps=next_steps
+            next_steps=next_steps,
+            ai_generated=True
         )
     
     def _generate_fallback_analysis(self, cluster_info: Dict[str, Any], issues: List[ClusterIssue]) -> MustGatherAnalysis:
@@ -1,19 +1,30 @@
 import os
 import json
 import logging
+import time
 import asyncio
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Any, Optional
-import yaml
 import tempfile
 import shutil
 from datetime import datetime
 
+from app.core.config import settings
+from app.services.must_gather_index import (
+    MustGatherIndex, get_must_gather_index, discard_must_gather_index, is_temporary_path
+)
+from app.services.must_gather_timeline import get_log_timeline, discard_log_timeline
+from app.services.must_gather_compare import compare_indexes
+
 logger = logging.getLogger(__name__)
 
 class MustGatherAnalyzer:
-    def __init__(self):
+    def __init__(self, max_workers: int = 4):
+        # Sub-analyses do blocking file I/O and parsing, so they run on a bounded
+        # executor shared by all requests instead of on the event loop
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="must-gather-analysis")
         self.supported_analyses = [
             "cluster_health",
             "etcd_analysis", 
@@ -24,8 +35,29 @@ class MustGatherAnalyzer:
             "storage_issues",
             "kms_encryption",
             "certificate_issues",
-            "performance_analysis"
+            "performance_analysis",
+            "comparison"
         ]
+    
+    def _get_index(self, must_gather_path: str) -> MustGatherIndex:
+        """Parsed-resource index shared by all sub-analyses of a must-gather"""
+        return get_must_gather_index(must_gather_path)
+    
+    def _refresh_index(self, must_gather_path: str) -> Dict[str, Any]:
+        """Open the must-gather index and parse any new or changed files"""
+        return self._get_index(must_gather_path).refresh()
+    
+    def _refresh_timeline(self, must_gather_path: str) -> Dict[str, Any]:
+        """Add timestamp marks for any new or changed container logs"""
+        return get_log_timeline(must_gather_path).refresh()
+    
+    @staticmethod
+    def _release_temporary(must_gather_paths: List[str]):
+        """Delete the index databases of uploaded or extracted must-gathers once they are analyzed"""
+        for path in must_gather_paths:
+            if is_temporary_path(path, (settings.temp_dir,)):
+                discard_must_gather_index(path)
+                discard_log_timeline(path)
         
     async def analyze_must_gather(self, must_gather_path: str, analysis_type: str = "full") -> Dict[str, Any]:
         """Analyze must-gather data and return structured results"""
@@ -43,24 +75,40 @@ class MustGatherAnalyzer:
                 "warnings": []
             }
             
-            # Perform different types of analysis
-            if analysis_type == "full" or analysis_type == "cluster_health":
-                results["findings"]["cluster_health"] = await self._analyze_cluster_health(must_gather_path)
-            
-            if analysis_type == "full" or analysis_type == "etcd_analysis":
-                results["findings"]["etcd"] = await self._analyze_etcd(must_gather_path)
-            
-            if analysis_type == "full" or analysis_type == "node_analysis":
-                results["findings"]["nodes"] = await self._analyze_nodes(must_gather_path)
-            
-            if analysis_type == "full" or analysis_type == "pod_issues":
-                results["findings"]["pods"] = await self._analyze_pods(must_gather_path)
-            
-            if analysis_type == "full" or analysis_type == "operator_status":
-                results["findings"]["operators"] = await self._analyze_cluster_operators(must_gather_path)
+            loop = asyncio.get_running_loop()
             
-            if analysis_type == "full" or analysis_type == "kms_encryption":
-                results["findings"]["kms"] = await self._analyze_kms_encryption(must_gather_path)
+            # Parse new or changed YAML files once; sub-analyses query the index.
+            # Container logs of a must-gather analyzed in place get their timestamp
+            # marks at the same time for window queries. Uploaded or extracted ones
+            # are deleted after the analysis, so their timeline is only built by a query.
+            refresh_index = loop.run_in_executor(self._executor, self._refresh_index, must_gather_path)
+            if is_temporary_path(must_gather_path, (settings.temp_dir,)):
+                results["index_stats"] = await refresh_index
+            else:
+                results["index_stats"], results["timeline_stats"] = await asyncio.gather(
+                    refresh_index,
+                    loop.run_in_executor(self._executor, self._refresh_timeline, must_gather_path)
+                )
+            
+            # Perform different types of analysis concurrently
+            analyses = [
+                ("cluster_health", "cluster_health", self._analyze_cluster_health),
+                ("etcd_analysis", "etcd", self._analyze_etcd),
+                ("node_analysis", "nodes", self._analyze_nodes),
+                ("pod_issues", "pods", self._analyze_pods),
+                ("operator_status", "operators", self._analyze_cluster_operators),
+                ("kms_encryption", "kms", self._analyze_kms_encryption),
+            ]
+            selected = [(key, analyze) for name, key, analyze in analyses if analysis_type in ("full", name)]
+            outcomes = await asyncio.gather(*(
+                loop.run_in_executor(self._executor, self._timed, analyze, must_gather_path)
+                for _, analyze in selected
+            ))
+            
+            results["timings"] = {}
+            for (key, _), (finding, elapsed) in zip(selected, outcomes):
+                results["findings"][key] = finding
+                results["timings"][key] = elapsed
             
             # Generate summary and recommendations
             results["summary"] = self._generate_summary(results["findings"])
@@ -71,8 +119,17 @@ class MustGatherAnalyzer:
         except Exception as e:
             logger.error(f"Error analyzing must-gather: {e}")
             return {"error": str(e)}
+        finally:
+            self._release_temporary([must_gather_path])
+    
+    @staticmethod
+    def _timed(analyze, must_gather_path: str):
+        """Run one sub-analysis and return its result with the elapsed seconds"""
+        start = time.perf_counter()
+        finding = analyze(must_gather_path)
+        return finding, round(time.perf_counter() - start, 3)
     
-    async def _analyze_cluster_health(self, must_gather_path: str) -> Dict[str, Any]:
+    def _analyze_cluster_health(self, must_gather_path: str) -> Dict[str, Any]:
         """Analyze overall cluster health"""
         health_data = {
             "cluster_version": None,
@@ -82,29 +139,23 @@ class MustGatherAnalyzer:
         }
         
         try:
+            index = self._get_index(must_gather_path)
+            
             # Analyze cluster version
-            cv_path = Path(must_gather_path) / "cluster-scoped-resources" / "config.openshift.io" / "clusterversions"
-            if cv_path.exists():
-                for cv_file in cv_path.glob("*.yaml"):
-                    with open(cv_file, 'r') as f:
-                        cv_data = yaml.safe_load(f)
-                        if cv_data and cv_data.get('kind') == 'ClusterVersion':
-                            health_data["cluster_version"] = {
-                                "version": cv_data.get('status', {}).get('desired', {}).get('version'),
-                                "conditions": cv_data.get('status', {}).get('conditions', [])
-                            }
+            for cv in index.resources(kind='ClusterVersion', path_glob="cluster-scoped-resources/config.openshift.io/clusterversions/*.yaml"):
+                cv_data = cv.document
+                health_data["cluster_version"] = {
+                    "version": cv_data.get('status', {}).get('desired', {}).get('version'),
+                    "conditions": cv.conditions
+                }
             
             # Analyze infrastructure
-            infra_path = Path(must_gather_path) / "cluster-scoped-resources" / "config.openshift.io" / "infrastructures"
-            if infra_path.exists():
-                for infra_file in infra_path.glob("*.yaml"):
-                    with open(infra_file, 'r') as f:
-                        infra_data = yaml.safe_load(f)
-                        if infra_data and infra_data.get('kind') == 'Infrastructure':
-                            health_data["infrastructure"] = {
-                                "platform": infra_data.get('status', {}).get('platform'),
-                                "platform_status": infra_data.get('status', {}).get('platformStatus', {})
-                            }
+            for infra in index.resources(kind='Infrastructure', path_glob="cluster-scoped-resources/config.openshift.io/infrastructures/*.yaml"):
+                infra_data = infra.document
+                health_data["infrastructure"] = {
+                    "platform": infra_data.get('status', {}).get('platform'),
+                    "platform_status": infra_data.get('status', {}).get('platformStatus', {})
+                }
             
             return health_data
             
@@ -112,7 +163,7 @@ class MustGatherAnalyzer:
             logger.error(f"Error analyzing cluster health: {e}")
             return {"error": str(e)}
     
-    async def _analyze_etcd(self, must_gather_path: str) -> Dict[str, Any]:
+    def _analyze_etcd(self, must_gather_path: str) -> Dict[str, Any]:
         """Analyze etcd cluster health"""
         etcd_data = {
             "endpoint_health": [],
@@ -153,7 +204,7 @@ class MustGatherAnalyzer:
             logger.error(f"Error analyzing etcd: {e}")
             return {"error": str(e)}
     
-    async def _analyze_nodes(self, must_gather_path: str) -> Dict[str, Any]:
+    def _analyze_nodes(self, must_gather_path: str) -> Dict[str, Any]:
         """Analyze node status and health"""
         nodes_data = {
             "total_nodes": 0,
@@ -164,33 +215,30 @@ class MustGatherAnalyzer:
         }
         
         try:
-            nodes_path = Path(must_gather_path) / "cluster-scoped-resources" / "core" / "nodes"
-            
-            if nodes_path.exists():
-                for node_file in nodes_path.glob("*.yaml"):
-                    with open(node_file, 'r') as f:
-                        node_data = yaml.safe_load(f)
-                        if node_data and node_data.get('kind') == 'Node':
-                            nodes_data["total_nodes"] += 1
-                            
-                            conditions = node_data.get('status', {}).get('conditions', [])
-                            ready_condition = next((c for c in conditions if c.get('type') == 'Ready'), None)
-                            
-                            node_info = {
-                                "name": node_data.get('metadata', {}).get('name'),
-                                "ready": ready_condition.get('status') == 'True' if ready_condition else False,
-                                "conditions": conditions,
-                                "capacity": node_data.get('status', {}).get('capacity', {}),
-                                "allocatable": node_data.get('status', {}).get('allocatable', {})
-                            }
-                            
-                            nodes_data["node_details"].append(node_info)
-                            
-                            if node_info["ready"]:
-                                nodes_data["ready_nodes"] += 1
-                            else:
-                                nodes_data["not_ready_nodes"] += 1
-                                nodes_data["issues"].append(f"Node {node_info['name']} is not ready")
+            index = self._get_index(must_gather_path)
+            
+            for node in index.resources(kind='Node', path_glob="cluster-scoped-resources/core/nodes/*.yaml"):
+                node_status = node.document.get('status', {})
+                nodes_data["total_nodes"] += 1
+                
+                conditions = node.conditions
+                ready_condition = next((c for c in conditions if c.get('type') == 'Ready'), None)
+                
+                node_info = {
+                    "name": node.name,
+                    "ready": ready_condition.get('status') == 'True' if ready_condition else False,
+                    "conditions": conditions,
+                    "capacity": node_status.get('capacity', {}),
+                    "allocatable": node_status.get('allocatable', {})
+                }
+                
+                nodes_data["node_details"].append(node_info)
+                
+                if node_info["ready"]:
+                    nodes_data["ready_nodes"] += 1
+                else:
+                    nodes_data["not_ready_nodes"] += 1
+                    nodes_data["issues"].append(f"Node {node_info['name']} is not ready")
             
             return nodes_data
             
@@ -198,7 +246,7 @@ class MustGatherAnalyzer:
             logger.error(f"Error analyzing nodes: {e}")
             return {"error": str(e)}
     
-    async def _analyze_pods(self, must_gather_path: str) -> Dict[str, Any]:
+    def _analyze_pods(self, must_gather_path: str) -> Dict[str, Any]:
         """Analyze pod status across all namespaces"""
         pods_data = {
             "total_pods": 0,
@@ -210,49 +258,38 @@ class MustGatherAnalyzer:
         }
         
         try:
-            namespaces_path = Path(must_gather_path) / "namespaces"
-            
-            if namespaces_path.exists():
-                for ns_dir in namespaces_path.iterdir():
-                    if ns_dir.is_dir():
-                        namespace = ns_dir.name
-                        pods_path = ns_dir / "core" / "pods"
-                        
-                        if pods_path.exists():
-                            ns_pods = {"total": 0, "running": 0, "failed": 0, "pending": 0}
-                            
-                            for pod_file in pods_path.glob("*.yaml"):
-                                with open(pod_file, 'r') as f:
-                                    pod_data = yaml.safe_load(f)
-                                    if pod_data and pod_data.get('kind') == 'Pod':
-                                        pods_data["total_pods"] += 1
-                                        ns_pods["total"] += 1
-                                        
-                                        phase = pod_data.get('status', {}).get('phase', 'Unknown')
-                                        
-                                        if phase == 'Running':
-                                            pods_data["running_pods"] += 1
-                                            ns_pods["running"] += 1
-                                        elif phase == 'Failed':
-                                            pods_data["failed_pods"] += 1
-                                            ns_pods["failed"] += 1
-                                            pods_data["problematic_pods"].append({
-                                                "name": pod_data.get('metadata', {}).get('name'),
-                                                "namespace": namespace,
-                                                "phase": phase,
-                                                "reason": pod_data.get('status', {}).get('reason', 'Unknown')
-                                            })
-                                        elif phase == 'Pending':
-                                            pods_data["pending_pods"] += 1
-                                            ns_pods["pending"] += 1
-                                            pods_data["problematic_pods"].append({
-                                                "name": pod_data.get('metadata', {}).get('name'),
-                                                "namespace": namespace,
-                                                "phase": phase,
-                                                "reason": pod_data.get('status', {}).get('reason', 'Unknown')
-                                            })
-                            
-                            pods_data["namespace_summary"][namespace] = ns_pods
+            index = self._get_index(must_gather_path)
+            
+            for pod in index.resources(kind='Pod', path_glob="namespaces/*/core/pods/*.yaml"):
+                # Namespace comes from the directory the pod was gathered into
+                namespace = pod.path.split('/')[1]
+                ns_pods = pods_data["namespace_summary"].setdefault(namespace, {"total": 0, "running": 0, "failed": 0, "pending": 0})
+                pods_data["total_pods"] += 1
+                ns_pods["total"] += 1
+                
+                phase = pod.phase or 'Unknown'
+                
+                if phase == 'Running':
+                    pods_data["running_pods"] += 1
+                    ns_pods["running"] += 1
+                elif phase == 'Failed':
+                    pods_data["failed_pods"] += 1
+                    ns_pods["failed"] += 1
+                    pods_data["problematic_pods"].append({
+                        "name": pod.name,
+                        "namespace": namespace,
+                        "phase": phase,
+                        "reason": pod.reason or 'Unknown'
+                    })
+                elif phase == 'Pending':
+                    pods_data["pending_pods"] += 1
+                    ns_pods["pending"] += 1
+                    pods_data["problematic_pods"].append({
+                        "name": pod.name,
+                        "namespace": namespace,
+                        "phase": phase,
+                        "reason": pod.reason or 'Unknown'
+                    })
             
             return pods_data
             
@@ -260,7 +297,7 @@ class MustGatherAnalyzer:
             logger.error(f"Error analyzing pods: {e}")
             return {"error": str(e)}
     
-    async def _analyze_cluster_operators(self, must_gather_path: str) -> Dict[str, Any]:
+    def _analyze_cluster_operators(self, must_gather_path: str) -> Dict[str, Any]:
         """Analyze cluster operator status"""
         operators_data = {
             "total_operators": 0,
@@ -272,37 +309,33 @@ class MustGatherAnalyzer:
         }
         
         try:
-            co_path = Path(must_gather_path) / "cluster-scoped-resources" / "config.openshift.io" / "clusteroperators"
-            
-            if co_path.exists():
-                for co_file in co_path.glob("*.yaml"):
-                    with open(co_file, 'r') as f:
-                        co_data = yaml.safe_load(f)
-                        if co_data and co_data.get('kind') == 'ClusterOperator':
-                            operators_data["total_operators"] += 1
-                            
-                            conditions = co_data.get('status', {}).get('conditions', [])
-                            available = next((c for c in conditions if c.get('type') == 'Available'), None)
-                            degraded = next((c for c in conditions if c.get('type') == 'Degraded'), None)
-                            progressing = next((c for c in conditions if c.get('type') == 'Progressing'), None)
-                            
-                            operator_info = {
-                                "name": co_data.get('metadata', {}).get('name'),
-                                "available": available.get('status') == 'True' if available else False,
-                                "degraded": degraded.get('status') == 'True' if degraded else False,
-                                "progressing": progressing.get('status') == 'True' if progressing else False,
-                                "conditions": conditions
-                            }
-                            
-                            operators_data["operator_details"].append(operator_info)
-                            
-                            if operator_info["available"]:
-                                operators_data["available_operators"] += 1
-                            if operator_info["degraded"]:
-                                operators_data["degraded_operators"] += 1
-                                operators_data["critical_issues"].append(f"Operator {operator_info['name']} is degraded")
-                            if operator_info["progressing"]:
-                                operators_data["progressing_operators"] += 1
+            index = self._get_index(must_gather_path)
+            
+            for co in index.resources(kind='ClusterOperator', path_glob="cluster-scoped-resources/config.openshift.io/clusteroperators/*.yaml"):
+                operators_data["total_operators"] += 1
+                
+                conditions = co.conditions
+                available = next((c for c in conditions if c.get('type') == 'Available'), None)
+                degraded = next((c for c in conditions if c.get('type') == 'Degraded'), None)
+                progressing = next((c for c in conditions if c.get('type') == 'Progressing'), None)
+                
+                operator_info = {
+                    "name": co.name,
+                    "available": available.get('status') == 'True' if available else False,
+                    "degraded": degraded.get('status') == 'True' if degraded else False,
+                    "progressing": progressing.get('status') == 'True' if progressing else False,
+                    "conditions": conditions
+                }
+                
+                operators_data["operator_details"].append(operator_info)
+                
+                if operator_info["available"]:
+                    operators_data["available_operators"] += 1
+                if operator_info["degraded"]:
+                    operators_data["degraded_operators"] += 1
+                    operators_data["critical_issues"].append(f"Operator {operator_info['name']} is degraded")
+                if operator_info["progressing"]:
+                    operators_data["progressing_operators"] += 1
             
             return operators_data
             
@@ -310,7 +343,7 @@ class MustGatherAnalyzer:
             logger.error(f"Error analyzing cluster operators: {e}")
             return {"error": str(e)}
     
-    async def _analyze_kms_encryption(self, must_gather_path: str) -> Dict[str, Any]:
+    def _analyze_kms_encryption(self, must_gather_path: str) -> Dict[str, Any]:
         """Analyze KMS encryption configuration and issues"""
         kms_data = {
             "encryption_config": None,
@@ -321,28 +354,21 @@ class MustGatherAnalyzer:
         }
         
         try:
-            # Check for encryption configuration
-            secrets_path = Path(must_gather_path) / "cluster-scoped-resources" / "core" / "secrets"
+            index = self._get_index(must_gather_path)
             
-            if secrets_path.exists():
-                for secret_file in secrets_path.glob("*encryption-config*.yaml"):
-                    with open(secret_file, 'r') as f:
-                        secret_data = yaml.safe_load(f)
-                        if secret_data and 'encryption-config' in secret_data.get('metadata', {}).get('name', ''):
-                            kms_data["encryption_config"] = secret_data
+            # Check for encryption configuration
+            for secret in index.resources(path_glob="cluster-scoped-resources/core/secrets/*encryption-config*.yaml"):
+                if 'encryption-config' in (secret.name or ''):
+                    kms_data["encryption_config"] = secret.document
             
             # Check for KMS plugin pods
-            kms_ns_path = Path(must_gather_path) / "namespaces" / "openshift-kube-apiserver" / "core" / "pods"
-            if kms_ns_path.exists():
-                for pod_file in kms_ns_path.glob("*kms*.yaml"):
-                    with open(pod_file, 'r') as f:
-                        pod_data = yaml.safe_load(f)
-                        if pod_data and 'kms' in pod_data.get('metadata', {}).get('name', ''):
-                            kms_data["kms_plugins"].append({
-                                "name": pod_data.get('metadata', {}).get('name'),
-                                "phase": pod_data.get('status', {}).get('phase'),
-                                "conditions": pod_data.get('status', {}).get('conditions', [])
-                            })
+            for pod in index.resources(path_glob="namespaces/openshift-kube-apiserver/core/pods/*kms*.yaml"):
+                if 'kms' in (pod.name or ''):
+                    kms_data["kms_plugins"].append({
+                        "name": pod.name,
+                        "phase": pod.phase,
+                        "conditions": pod.conditions
+                    })
             
             # Analyze KMS issues
             if not kms_data["encryption_config"]:
@@ -474,5 +500,43 @@ class MustGatherAnalyzer:
             logger.error(f"Error in quick health check: {e}")
             return {"error": str(e)}
 
+    async def compare_must_gathers(self, must_gather_paths: List[str]) -> Dict[str, Any]:
+        """Structural diff of each must-gather against the first one (e.g. before vs after an upgrade)"""
+        try:
+            if len(must_gather_paths) < 2:
+                return {"error": "At least two must-gather paths are needed for a comparison"}
+            missing = [path for path in must_gather_paths if not os.path.exists(path)]
+            if missing:
+                return {"error": f"Must-gather path not found: {', '.join(missing)}"}
+            
+            loop = asyncio.get_running_loop()
+            start = time.perf_counter()
+            
+            # All bundles are indexed concurrently; unchanged ones are not re-parsed
+            index_stats = await asyncio.gather(*(
+                loop.run_in_executor(self._executor, self._refresh_index, path) for path in must_gather_paths
+            ))
+            
+            base = self._get_index(must_gather_paths[0])
+            comparisons = await asyncio.gather(*(
+                loop.run_in_executor(self._executor, compare_indexes, base, self._get_index(path))
+                for path in must_gather_paths[1:]
+            ))
+            
+            return {
+                "timestamp": datetime.now().isoformat(),
+                "analysis_type": "comparison",
+                "base": must_gather_paths[0],
+                "index_stats": dict(zip(must_gather_paths, index_stats)),
+                "comparisons": comparisons,
+                "seconds": round(time.perf_counter() - start, 3)
+            }
+            
+        except Exception as e:
+            logger.error(f"Error comparing must-gathers: {e}")
+            return {"error": str(e)}
+        finally:
+            self._release_temporary(must_gather_paths)
+
 # Global analyzer instance
 must_gather_analyzer = MustGatherAnalyzer() 
\ No newline at end of file
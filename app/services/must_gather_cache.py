@@ -0,0 +1,346 @@
+"""
+Content-addressed cache of must-gather analysis results
+
+Files are identified by the SHA-256 of their content and directories by a Merkle
+hash over their children, so results are reused whenever the same content is seen
+again, at any path. Two layers are kept:
+
+- the deterministic issue scan, per file and per directory subtree
+- the LLM analysis, per (content root, classifier, model)
+
+A stat memo (path + mtime + size -> digest) avoids re-reading unchanged files, so
+only files that changed are hashed and rescanned, and only the directories on the
+path to them are re-consolidated.
+
+Entries expire CACHE_MAX_AGE after they were written, so the database does not
+grow without bound as must-gathers come and go.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Where the cache database is kept; shared by all must-gathers since it is content-addressed
+DEFAULT_CACHE_DIR = os.environ.get(
+    "MUST_GATHER_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "must-gather-results")
+)
+
+CACHE_SCHEMA_VERSION = 2
+
+# Seconds a cached entry is kept after it was written
+CACHE_MAX_AGE = 14 * 24 * 3600
+
+# Expired entries are deleted at most this often
+_PRUNE_INTERVAL = 3600
+
+_TABLES = ('file_stats', 'file_scans', 'tree_scans', 'ai_analyses')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_stats (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS file_scans (
+    digest TEXT NOT NULL,
+    classifier TEXT NOT NULL,
+    issues TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (digest, classifier)
+);
+CREATE TABLE IF NOT EXISTS tree_scans (
+    digest TEXT NOT NULL,
+    classifier TEXT NOT NULL,
+    issues TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (digest, classifier)
+);
+CREATE TABLE IF NOT EXISTS ai_analyses (
+    root TEXT NOT NULL,
+    classifier TEXT NOT NULL,
+    model TEXT NOT NULL,
+    analysis TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (root, classifier, model)
+);
+"""
+
+
+@dataclass
+class _TreeNode:
+    """A directory in the scanned tree; files map name -> (path, mtime_ns, size)"""
+    dirs: Dict[str, "_TreeNode"] = field(default_factory=dict)
+    files: Dict[str, Tuple[str, int, int]] = field(default_factory=dict)
+    digest: Optional[str] = None
+
+
+def walk_tree(root: str, extensions: Tuple[str, ...]) -> _TreeNode:
+    """Build the directory tree of scannable files under root"""
+    node = _TreeNode()
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    node.dirs[entry.name] = walk_tree(entry.path, extensions)
+                elif entry.name.endswith(extensions) and entry.is_file():
+                    stat = entry.stat()
+                    node.files[entry.name] = (entry.path, stat.st_mtime_ns, stat.st_size)
+    except OSError as e:
+        logger.warning(f"Could not list directory {root}: {e}")
+    return node
+
+
+def iter_tree_files(node: _TreeNode) -> Iterator[Tuple[str, int, int]]:
+    """Yield (path, mtime_ns, size) for every file in the tree"""
+    for child in node.dirs.values():
+        yield from iter_tree_files(child)
+    yield from node.files.values()
+
+
+def _iter_nodes(node: _TreeNode) -> Iterator[_TreeNode]:
+    yield node
+    for child in node.dirs.values():
+        yield from _iter_nodes(child)
+
+
+def merge_tree(node: _TreeNode, file_issues: Callable[[str], list], consolidate: Callable[[list], list],
+               cached: Optional[Callable[[_TreeNode], Optional[list]]] = None,
+               merged: Optional[Callable[[_TreeNode, list], None]] = None) -> list:
+    """Consolidate issues bottom-up: subdirectories by name, then files by name.
+
+    Evidence keeps only the top K lines at every merge, so the result depends on
+    the merge order; the cached and the uncached scan both merge through here to
+    return the same evidence. cached(node) may supply a directory's issues,
+    merged(node, issues) is told about every directory consolidated.
+    """
+    if cached is not None:
+        issues = cached(node)
+        if issues is not None:
+            return issues
+    issues: list = []
+    for name in sorted(node.dirs):
+        issues = consolidate(issues + merge_tree(node.dirs[name], file_issues, consolidate, cached, merged))
+    for name in sorted(node.files):
+        found = file_issues(node.files[name][0])
+        if found:
+            issues = consolidate(issues + found)
+    if merged is not None:
+        merged(node, issues)
+    return issues
+
+
+class MustGatherResultCache:
+    """SQLite-backed content-addressed cache for the issue scan and LLM analysis layers"""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_age: float = CACHE_MAX_AGE):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.db_path = os.path.join(self.cache_dir, "results.sqlite")
+        self.max_age = max_age
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._pruned_at = 0.0
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for one transaction, creating the database on first use"""
+        with self._init_lock:
+            if not self._initialized:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                conn = sqlite3.connect(self.db_path, timeout=30)
+                try:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    with conn:
+                        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+                        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+                        if row is None or int(row[0]) != CACHE_SCHEMA_VERSION:
+                            for table in _TABLES:
+                                conn.execute(f"DROP TABLE IF EXISTS {table}")
+                            conn.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)",
+                                         (str(CACHE_SCHEMA_VERSION),))
+                        conn.executescript(_SCHEMA)
+                finally:
+                    conn.close()
+                self._initialized = True
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def prune(self) -> int:
+        """Delete the entries older than max_age; returns how many were removed"""
+        cutoff = time.time() - self.max_age
+        removed = 0
+        with self._connect() as conn:
+            for table in _TABLES:
+                removed += conn.execute(f"DELETE FROM {table} WHERE created_at < ?", (cutoff,)).rowcount
+        self._pruned_at = time.time()
+        if removed:
+            logger.info(f"Removed {removed} expired must-gather cache entries")
+        return removed
+
+    def scan(self, must_gather_path: str, classifier_key: str, extensions: Tuple[str, ...],
+             hash_and_scan: Callable[[List[str]], Iterator[Tuple[Optional[str], list]]],
+             consolidate: Callable[[list], list], issue_type: type,
+             progress: Optional[Callable[[str, int, Optional[int]], None]] = None) -> Tuple[list, Dict[str, Any]]:
+        """Return the consolidated issues for a must-gather, rescanning only what changed.
+
+        hash_and_scan maps a list of paths to (digest, issues) pairs in order;
+        consolidate merges issue lists; issue_type rebuilds issues from cached dicts.
+        """
+        start = time.perf_counter()
+        if time.time() - self._pruned_at > _PRUNE_INTERVAL:
+            self.prune()
+        root_path = os.path.abspath(must_gather_path)
+        tree = walk_tree(root_path, extensions)
+        files = list(iter_tree_files(tree))
+
+        def load(issues_json: str) -> list:
+            return [issue_type(**item) for item in json.loads(issues_json)]
+
+        def dump(issues: list) -> str:
+            return json.dumps([asdict(issue) for issue in issues])
+
+        # 1. Digests from the stat memo; changed files are hashed and scanned in one read
+        with self._connect() as conn:
+            memo = {
+                (path, mtime_ns, size): digest
+                for path, mtime_ns, size, digest in conn.execute(
+                    "SELECT path, mtime_ns, size, digest FROM file_stats WHERE path >= ? AND path < ?",
+                    (root_path + os.sep, root_path + chr(ord(os.sep) + 1))
+                )
+            }
+        digests: Dict[str, Optional[str]] = {path: memo.get((path, mtime_ns, size)) for path, mtime_ns, size in files}
+        scanned: Dict[str, str] = {}  # digest -> issues JSON, from this run
+        files_by_path = {path: (mtime_ns, size) for path, mtime_ns, size in files}
+        bytes_scanned = 0
+
+        def rescan(paths: List[str]):
+            nonlocal bytes_scanned
+            now = time.time()
+            stat_rows, scan_rows = [], []
+            for done, (path, (digest, issues)) in enumerate(zip(paths, hash_and_scan(paths)), start=1):
+                if progress:
+                    progress('scanning', done, len(paths))
+                if digest is None:
+                    continue
+                bytes_scanned += files_by_path[path][1]
+                digests[path] = digest
+                scanned[digest] = dump(issues)
+                stat_rows.append((path, *files_by_path[path], digest, now))
+                scan_rows.append((digest, classifier_key, scanned[digest], now))
+            # Written after the scan so no write transaction is held while files are read
+            with self._connect() as conn:
+                conn.executemany("INSERT OR REPLACE INTO file_stats VALUES (?,?,?,?,?)", stat_rows)
+                conn.executemany("INSERT OR REPLACE INTO file_scans VALUES (?,?,?,?)", scan_rows)
+
+        changed = [path for path, digest in digests.items() if digest is None]
+        rescan(changed)
+
+        # 2. Merkle digests bottom-up
+        def merkle(node: _TreeNode) -> str:
+            h = hashlib.sha256()
+            for name in sorted(node.dirs):
+                h.update(f"d\0{name}\0{merkle(node.dirs[name])}\n".encode('utf-8'))
+            for name in sorted(node.files):
+                h.update(f"f\0{name}\0{digests.get(node.files[name][0])}\n".encode('utf-8'))
+            node.digest = h.hexdigest()
+            return node.digest
+
+        root_digest = merkle(tree)
+
+        # 3. Find subtrees with no cached result and the file scans they need
+        with self._connect() as conn:
+            cached_trees = {}
+            for node in _iter_nodes(tree):
+                row = conn.execute("SELECT issues FROM tree_scans WHERE digest = ? AND classifier = ?",
+                                   (node.digest, classifier_key)).fetchone()
+                if row:
+                    cached_trees[node.digest] = row[0]
+
+            def uncached_files(node: _TreeNode) -> Iterator[str]:
+                if node.digest in cached_trees:
+                    return
+                for child in node.dirs.values():
+                    yield from uncached_files(child)
+                for path, _, _ in node.files.values():
+                    yield path
+
+            needed = [path for path in uncached_files(tree) if digests[path] and digests[path] not in scanned]
+            missing = []
+            for path in needed:
+                row = conn.execute("SELECT issues FROM file_scans WHERE digest = ? AND classifier = ?",
+                                   (digests[path], classifier_key)).fetchone()
+                if row:
+                    scanned[digests[path]] = row[0]
+                else:
+                    missing.append(path)
+
+        # Content seen before but never scanned with this classifier
+        rescan(missing)
+
+        # 4. Consolidate uncached subtrees bottom-up and remember them
+        reused_dirs = 0
+        new_trees: Dict[str, str] = {}
+
+        def cached(node: _TreeNode) -> Optional[list]:
+            nonlocal reused_dirs
+            if node.digest not in cached_trees:
+                return None
+            reused_dirs += 1
+            return load(cached_trees[node.digest])
+
+        def file_issues(path: str) -> list:
+            digest = digests.get(path)
+            return load(scanned[digest]) if digest and digest in scanned else []
+
+        def merged(node: _TreeNode, issues: list):
+            new_trees[node.digest] = dump(issues)
+
+        issues = merge_tree(tree, file_issues, consolidate, cached, merged)
+        with self._connect() as conn:
+            now = time.time()
+            conn.executemany("INSERT OR REPLACE INTO tree_scans VALUES (?,?,?,?)",
+                             [(digest, classifier_key, issues_json, now) for digest, issues_json in new_trees.items()])
+
+        elapsed = max(time.perf_counter() - start, 1e-6)
+        rescanned = len(changed) + len(missing)
+        stats = {
+            'content_root': root_digest,
+            'files_total': len(files),
+            'files_scanned': rescanned,
+            'files_reused': len(files) - rescanned,
+            'dirs_reused': reused_dirs,
+            'bytes_scanned': bytes_scanned,
+            'scan_seconds': round(elapsed, 3),
+            'files_per_second': round(rescanned / elapsed, 1),
+            'mb_per_second': round(bytes_scanned / (1024 * 1024) / elapsed, 2),
+        }
+        logger.info(f"Cached scan of {must_gather_path}: {stats}")
+        return issues, stats
+
+    def get_ai_analysis(self, root_digest: str, classifier_key: str, model: str) -> Optional[Dict[str, Any]]:
+        """Cached LLM analysis fields for a content root and model, if any"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT analysis FROM ai_analyses WHERE root = ? AND classifier = ? AND model = ? "
+                               "AND created_at >= ?",
+                               (root_digest, classifier_key, model, time.time() - self.max_age)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_ai_analysis(self, root_digest: str, classifier_key: str, model: str, analysis: Dict[str, Any]):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO ai_analyses VALUES (?,?,?,?,?)",
+                         (root_digest, classifier_key, model, json.dumps(analysis, default=str), time.time()))
@@ -0,0 +1,120 @@
+"""
+Structural comparison of must-gather bundles
+
+Bundles are compared through their parsed-resource indexes. Every indexed
+resource carries a content digest that ignores volatile fields, so unchanged
+objects are skipped by comparing hashes alone; documents are only decoded for
+objects whose digest differs. The cost of a comparison therefore follows the
+size of the change set, not the size of the bundles.
+"""
+
+import time
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.must_gather_index import MustGatherIndex
+
+logger = logging.getLogger(__name__)
+
+# Kinds compared between bundles, with the name used in the results
+COMPARED_KINDS = {
+    "operators": "ClusterOperator",
+    "nodes": "Node",
+    "pods": "Pod",
+    "events": "Event",
+}
+
+# Changed objects listed per kind; the counts always cover all of them
+MAX_CHANGES_PER_KIND = 200
+
+
+def _object_name(key: Tuple[Optional[str], Optional[str]]) -> str:
+    namespace, name = key
+    return f"{namespace}/{name}" if namespace else str(name)
+
+
+def _condition_changes(before: List[Dict[str, Any]], after: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Conditions whose status or reason differ, plus conditions that appeared or disappeared"""
+    def by_type(conditions):
+        return {c.get('type'): (c.get('status'), c.get('reason')) for c in conditions if isinstance(c, dict)}
+
+    old, new = by_type(before), by_type(after)
+    changes = []
+    for condition_type in sorted(set(old) | set(new), key=str):
+        if old.get(condition_type) != new.get(condition_type):
+            changes.append({
+                "type": condition_type,
+                "before": dict(zip(("status", "reason"), old[condition_type])) if condition_type in old else None,
+                "after": dict(zip(("status", "reason"), new[condition_type])) if condition_type in new else None,
+            })
+    return changes
+
+
+def _changed_sections(before: Dict[str, Any], after: Dict[str, Any]) -> List[str]:
+    """Top-level sections (spec, status.*, metadata.labels, ...) that differ between two documents"""
+    sections = []
+    for top in ('metadata', 'spec', 'status'):
+        old, new = before.get(top) or {}, after.get(top) or {}
+        if not isinstance(old, dict) or not isinstance(new, dict):
+            if old != new:
+                sections.append(top)
+            continue
+        for field in sorted(set(old) | set(new)):
+            if field in ('resourceVersion', 'managedFields', 'conditions'):
+                continue
+            if old.get(field) != new.get(field):
+                sections.append(f"{top}.{field}")
+    for top in sorted(set(before) | set(after)):
+        if top not in ('metadata', 'spec', 'status', 'apiVersion', 'kind') and before.get(top) != after.get(top):
+            sections.append(top)
+    return sections
+
+
+def diff_kind(base: MustGatherIndex, other: MustGatherIndex, kind: str) -> Dict[str, Any]:
+    """Added, removed and changed objects of one kind between two indexed bundles"""
+    base_prints = base.fingerprints(kind)
+    other_prints = other.fingerprints(kind)
+
+    added = sorted(_object_name(key) for key in other_prints.keys() - base_prints.keys())
+    removed = sorted(_object_name(key) for key in base_prints.keys() - other_prints.keys())
+    changed_keys = sorted(
+        (key for key in base_prints.keys() & other_prints.keys() if base_prints[key][0] != other_prints[key][0]),
+        key=_object_name
+    )
+
+    changed = []
+    for key in changed_keys[:MAX_CHANGES_PER_KIND]:
+        before = base.get(*base_prints[key][1:])
+        after = other.get(*other_prints[key][1:])
+        if before is None or after is None:
+            continue
+        changed.append({
+            "name": _object_name(key),
+            "conditions": _condition_changes(before.conditions, after.conditions),
+            "fields": _changed_sections(before.document, after.document),
+        })
+
+    return {
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+        "counts": {
+            "added": len(added),
+            "removed": len(removed),
+            "changed": len(changed_keys),
+            "unchanged": len(base_prints.keys() & other_prints.keys()) - len(changed_keys),
+        },
+    }
+
+
+def compare_indexes(base: MustGatherIndex, other: MustGatherIndex) -> Dict[str, Any]:
+    """Structural diff of operators, nodes, pods and events between two bundles"""
+    start = time.perf_counter()
+    comparison = {
+        "base": base.must_gather_path,
+        "other": other.must_gather_path,
+        "diff": {name: diff_kind(base, other, kind) for name, kind in COMPARED_KINDS.items()},
+    }
+    comparison["seconds"] = round(time.perf_counter() - start, 3)
+    logger.info(f"Compared {base.must_gather_path} with {other.must_gather_path} in {comparison['seconds']}s")
+    return comparison
@@ -0,0 +1,77 @@
+"""
+Bounded evidence collection for must-gather issue scanning
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Lines mentioning these words rank above other evidence of the same issue
+LINE_SEVERITY = (('panic', 4), ('fatal', 4), ('error', 3), ('failed', 2), ('timeout', 1))
+
+# Digits are dropped before hashing so lines differing only in timestamps, ports or ids dedupe
+_DIGITS = b'0123456789'
+
+
+def message_key(lower_line: str) -> int:
+    """Hash identifying a message regardless of the numbers in it"""
+    # bytes.translate deletes in C; str.translate does a dict lookup per character
+    return hash(lower_line.encode('utf-8', 'ignore').translate(None, _DIGITS))
+
+
+def line_severity(lower_line: str) -> int:
+    """Severity rank of a lowercased evidence line"""
+    for word, rank in LINE_SEVERITY:
+        if word in lower_line:
+            return rank
+    return 0
+
+
+class EvidenceCollector:
+    """Keeps the top-K evidence lines of one issue type in constant memory.
+
+    Every line is counted exactly in total. Distinct messages (by a hash of the
+    line with digits removed) are tracked in at most `capacity` slots; when full,
+    the weakest slot by (severity, count, recency) is replaced. top() returns the
+    strongest lines with how often each message was seen.
+    """
+
+    def __init__(self, k: int = 5, capacity: Optional[int] = None):
+        self.k = k
+        self.capacity = capacity or k * 4
+        self.total = 0
+        self._seq = 0
+        # message hash -> [severity, count, last seen sequence, example line]
+        self._slots: Dict[int, list] = {}
+
+    def add(self, line: str, count: int = 1, lower_line: Optional[str] = None, key: Optional[int] = None):
+        """Record count occurrences of an evidence line; key may be precomputed with message_key()"""
+        self.total += count
+        self._seq += 1
+        lower_line = lower_line if lower_line is not None else line.lower()
+        if key is None:
+            key = message_key(lower_line)
+        slot = self._slots.get(key)
+        if slot is not None:
+            slot[1] += count
+            slot[2] = self._seq
+            slot[3] = line  # keep the most recent example
+            return
+
+        if len(self._slots) >= self.capacity:
+            weakest = min(self._slots, key=lambda h: self._slots[h][:3])
+            del self._slots[weakest]
+        self._slots[key] = [line_severity(lower_line), count, self._seq, line]
+
+    def extend(self, lines: Iterable[str], counts: Optional[Iterable[int]] = None):
+        """Merge lines (and their per-line counts, if known) from another collector's top()"""
+        counts = list(counts or [])
+        for index, line in enumerate(lines):
+            self.add(line, counts[index] if index < len(counts) else 1)
+
+    def top(self, k: Optional[int] = None) -> Tuple[List[str], List[int]]:
+        """Strongest lines and their occurrence counts.
+
+        Ties are broken by the line rather than by recency, so the same evidence
+        ranks the same whatever order it was merged in.
+        """
+        ranked = sorted(self._slots.values(), key=lambda slot: (-slot[0], -slot[1], slot[3]))[:k or self.k]
+        return [slot[3] for slot in ranked], [slot[1] for slot in ranked]
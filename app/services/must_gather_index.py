@@ -0,0 +1,373 @@
+"""
+Persistent parsed-resource index for must-gather directories
+
+Every YAML file in a must-gather is parsed once and its resources are written to a
+SQLite index (kind, namespace, name, phase, reason and conditions extracted, plus the
+document as JSON). Files are keyed by relative path + mtime + size, so re-opening the
+same must-gather only re-parses files that changed.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import PurePosixPath
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+try:
+    _YamlLoader = yaml.CSafeLoader
+except AttributeError:  # libyaml not available
+    _YamlLoader = yaml.SafeLoader
+
+# Where index databases are kept; one file per must-gather root
+DEFAULT_INDEX_DIR = os.environ.get(
+    "MUST_GATHER_INDEX_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "must-gather-index")
+)
+
+INDEX_SCHEMA_VERSION = 2
+
+# Index objects kept open per process; the least recently used are dropped first
+MAX_OPEN_INDEXES = 32
+
+# Index databases not refreshed for this long are deleted from the index directory
+INDEX_MAX_AGE = 30 * 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS resources (
+    path TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    api_version TEXT,
+    kind TEXT,
+    namespace TEXT,
+    name TEXT,
+    phase TEXT,
+    reason TEXT,
+    conditions TEXT,
+    document TEXT,
+    digest TEXT,
+    PRIMARY KEY (path, idx)
+);
+CREATE INDEX IF NOT EXISTS resources_kind ON resources (kind, namespace);
+"""
+
+# Fields that change without the object changing in any way that matters when comparing bundles
+VOLATILE_FIELDS = frozenset(('resourceVersion', 'managedFields', 'lastHeartbeatTime', 'lastProbeTime'))
+
+
+@dataclass
+class IndexedResource:
+    """A resource row from the index; the full document is decoded on demand"""
+    path: str
+    kind: Optional[str]
+    namespace: Optional[str]
+    name: Optional[str]
+    phase: Optional[str]
+    reason: Optional[str]
+    conditions: List[Dict[str, Any]]
+    raw_document: str
+
+    @property
+    def document(self) -> Dict[str, Any]:
+        return json.loads(self.raw_document)
+
+
+def _walk_yamls(root: str) -> Iterator[Tuple[str, int, int]]:
+    """Yield (relative posix path, mtime_ns, size) for every YAML file under root"""
+    pending = [root]
+    while pending:
+        current = pending.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.name.endswith(('.yaml', '.yml')) and entry.is_file():
+                        stat = entry.stat()
+                        rel_path = os.path.relpath(entry.path, root).replace(os.sep, '/')
+                        yield rel_path, stat.st_mtime_ns, stat.st_size
+        except OSError as e:
+            logger.warning(f"Could not list directory {current}: {e}")
+
+
+def _strip_volatile(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _strip_volatile(v) for k, v in value.items() if k not in VOLATILE_FIELDS}
+    if isinstance(value, list):
+        return [_strip_volatile(v) for v in value]
+    return value
+
+
+def resource_digest(doc: Dict[str, Any]) -> str:
+    """Content hash of a resource ignoring volatile fields; equal digests mean no meaningful change"""
+    canonical = json.dumps(_strip_volatile(doc), sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def _resource_row(rel_path: str, idx: int, doc: Dict[str, Any]) -> Tuple:
+    """Extract the indexed columns from a parsed resource"""
+    metadata = doc.get('metadata') or {}
+    status = doc.get('status') if isinstance(doc.get('status'), dict) else {}
+    conditions = status.get('conditions') or []
+    # managedFields is large and never read by the analyzers
+    if 'managedFields' in metadata:
+        doc = dict(doc, metadata={k: v for k, v in metadata.items() if k != 'managedFields'})
+    return (
+        rel_path, idx,
+        doc.get('apiVersion'), doc.get('kind'), metadata.get('namespace'), metadata.get('name'),
+        status.get('phase'), status.get('reason'),
+        json.dumps(conditions, default=str), json.dumps(doc, default=str), resource_digest(doc)
+    )
+
+
+def _parse_file(root: str, rel_path: str) -> List[Tuple]:
+    """Parse one YAML file into resource rows; List kinds also get one row per item"""
+    try:
+        with open(os.path.join(root, rel_path), 'r', encoding='utf-8', errors='ignore') as f:
+            doc = yaml.load(f, Loader=_YamlLoader)
+    except Exception as e:
+        logger.warning(f"Could not parse {rel_path}: {e}")
+        return []
+    if not isinstance(doc, dict):
+        return []
+
+    rows = [_resource_row(rel_path, 0, doc)]
+    items = doc.get('items')
+    if isinstance(items, list) and str(doc.get('kind', '')).endswith('List'):
+        for idx, item in enumerate(items, start=1):
+            if isinstance(item, dict):
+                rows.append(_resource_row(rel_path, idx, item))
+    return rows
+
+
+class MustGatherIndex:
+    """SQLite index of the parsed resources in one must-gather directory"""
+
+    def __init__(self, must_gather_path: str, index_dir: Optional[str] = None):
+        self.must_gather_path = os.path.abspath(must_gather_path)
+        index_dir = index_dir or DEFAULT_INDEX_DIR
+        os.makedirs(index_dir, exist_ok=True)
+        digest = hashlib.sha1(self.must_gather_path.encode('utf-8')).hexdigest()[:16]
+        self.db_path = os.path.join(index_dir, f"{digest}.sqlite")
+        self._lock = threading.Lock()
+        self._refreshed = False
+        self._init_db()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for one transaction; connections are not shared across threads"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if row is None or int(row[0]) != INDEX_SCHEMA_VERSION:
+                # Columns change between versions, so older tables are rebuilt rather than emptied
+                conn.execute("DROP TABLE IF EXISTS files")
+                conn.execute("DROP TABLE IF EXISTS resources")
+                conn.executescript(_SCHEMA)
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (str(INDEX_SCHEMA_VERSION),))
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('root', ?)", (self.must_gather_path,))
+
+    def refresh(self) -> Dict[str, Any]:
+        """Bring the index up to date with the directory, re-parsing only changed files"""
+        with self._lock:
+            start = time.perf_counter()
+            on_disk = {path: (mtime_ns, size) for path, mtime_ns, size in _walk_yamls(self.must_gather_path)}
+
+            with self._connect() as conn:
+                indexed = {path: (mtime_ns, size) for path, mtime_ns, size in conn.execute("SELECT path, mtime_ns, size FROM files")}
+            removed = [path for path in indexed if path not in on_disk]
+            changed = [path for path, key in on_disk.items() if indexed.get(path) != key]
+
+            # Files are parsed before the write transaction, which would otherwise hold
+            # the database lock for the whole parse and time out other processes
+            rows = [(path, _parse_file(self.must_gather_path, path)) for path in changed]
+
+            with self._connect() as conn:
+                for path in removed + changed:
+                    conn.execute("DELETE FROM resources WHERE path = ?", (path,))
+                    conn.execute("DELETE FROM files WHERE path = ?", (path,))
+                for path, resources in rows:
+                    conn.executemany("INSERT INTO resources VALUES (?,?,?,?,?,?,?,?,?,?,?)", resources)
+                    conn.execute("INSERT INTO files VALUES (?,?,?)", (path, *on_disk[path]))
+
+            # The mtime records when the index was last used, for prune_index_dir
+            os.utime(self.db_path)
+            self._refreshed = True
+            stats = {
+                'files': len(on_disk),
+                'parsed': len(changed),
+                'removed': len(removed),
+                'seconds': round(time.perf_counter() - start, 3)
+            }
+            logger.info(f"Must-gather index for {self.must_gather_path}: {stats}")
+            return stats
+
+    def resources(self, kind: Optional[str] = None, path_glob: Optional[str] = None,
+                  namespace: Optional[str] = None, include_list_items: bool = False) -> List[IndexedResource]:
+        """Query indexed resources.
+
+        path_glob is matched against the path relative to the must-gather root with
+        pathlib semantics, so '*' does not cross directory boundaries.
+        """
+        if not self._refreshed:
+            self.refresh()
+
+        clauses, params = [], []
+        if kind is not None:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if namespace is not None:
+            clauses.append("namespace = ?")
+            params.append(namespace)
+        if path_glob is not None:
+            clauses.append("path GLOB ?")
+            params.append(path_glob)
+        if not include_list_items:
+            clauses.append("idx = 0")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT path, kind, namespace, name, phase, reason, conditions, document FROM resources {where} ORDER BY path, idx",
+                params
+            ).fetchall()
+
+        if path_glob is not None:
+            depth = len(PurePosixPath(path_glob).parts)
+            rows = [row for row in rows
+                    if len(PurePosixPath(row[0]).parts) == depth and PurePosixPath(row[0]).match(path_glob)]
+
+        return [_indexed_resource(row) for row in rows]
+
+    def fingerprints(self, kind: str) -> Dict[Tuple[Optional[str], Optional[str]], Tuple[str, str, int]]:
+        """(namespace, name) -> (digest, path, idx) for every resource of a kind, list items included.
+
+        Only hashes are read, so comparing two bundles does not decode any document.
+        When the same object was gathered into several files the first one wins.
+        """
+        if not self._refreshed:
+            self.refresh()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT namespace, name, digest, path, idx FROM resources WHERE kind = ? ORDER BY path, idx", (kind,)
+            ).fetchall()
+        fingerprints = {}
+        for namespace, name, digest, path, idx in rows:
+            fingerprints.setdefault((namespace, name), (digest, path, idx))
+        return fingerprints
+
+    def get(self, path: str, idx: int = 0) -> Optional[IndexedResource]:
+        """A single indexed resource by file path and list position"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT path, kind, namespace, name, phase, reason, conditions, document FROM resources WHERE path = ? AND idx = ?",
+                (path, idx)
+            ).fetchone()
+        return _indexed_resource(row) if row else None
+
+
+def _indexed_resource(row: Tuple) -> IndexedResource:
+    path, kind, namespace, name, phase, reason, conditions, document = row
+    return IndexedResource(path=path, kind=kind, namespace=namespace, name=name, phase=phase, reason=reason,
+                           conditions=json.loads(conditions or '[]'), raw_document=document)
+
+
+def remove_database(db_path: str):
+    """Delete a SQLite database together with its WAL and shared-memory files"""
+    for suffix in ('', '-wal', '-shm'):
+        try:
+            os.remove(db_path + suffix)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove {db_path + suffix}: {e}")
+
+
+def is_temporary_path(must_gather_path: str, temp_dirs: Tuple[str, ...] = ()) -> bool:
+    """Whether a must-gather lives in the system temp directory (or one of temp_dirs).
+
+    Such directories are upload or extract locations that go away, so their
+    indexes are not worth keeping once the analysis is done.
+    """
+    path = os.path.realpath(must_gather_path)
+    for temp_dir in (tempfile.gettempdir(), *temp_dirs):
+        temp_dir = os.path.realpath(temp_dir)
+        if os.path.commonpath([path, temp_dir]) == temp_dir:
+            return True
+    return False
+
+
+def prune_index_dir(index_dir: Optional[str] = None, max_age: float = INDEX_MAX_AGE) -> int:
+    """Delete the index databases not used for max_age seconds; returns how many were removed"""
+    index_dir = index_dir or DEFAULT_INDEX_DIR
+    cutoff = time.time() - max_age
+    removed = 0
+    try:
+        with os.scandir(index_dir) as entries:
+            stale = [entry.path for entry in entries
+                     if entry.name.endswith('.sqlite') and entry.stat().st_mtime < cutoff]
+    except OSError:
+        return 0
+    for db_path in stale:
+        remove_database(db_path)
+        removed += 1
+    if removed:
+        logger.info(f"Removed {removed} must-gather index databases unused for {max_age / 86400:.0f} days")
+    return removed
+
+
+_indexes: "OrderedDict[Tuple[str, Optional[str]], MustGatherIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+_pruned_dirs = set()
+
+
+def get_must_gather_index(must_gather_path: str, index_dir: Optional[str] = None) -> MustGatherIndex:
+    """Return the process-wide index object for a must-gather directory"""
+    key = (os.path.abspath(must_gather_path), index_dir)
+    with _indexes_lock:
+        if index_dir not in _pruned_dirs:
+            # Once per process and directory, so stale databases do not pile up
+            _pruned_dirs.add(index_dir)
+            prune_index_dir(index_dir)
+        if key in _indexes:
+            _indexes.move_to_end(key)
+        else:
+            _indexes[key] = MustGatherIndex(must_gather_path, index_dir)
+            while len(_indexes) > MAX_OPEN_INDEXES:
+                _indexes.popitem(last=False)
+        return _indexes[key]
+
+
+def discard_must_gather_index(must_gather_path: str, index_dir: Optional[str] = None):
+    """Forget a must-gather's index and delete its database"""
+    key = (os.path.abspath(must_gather_path), index_dir)
+    with _indexes_lock:
+        _indexes.pop(key, None)
+    digest = hashlib.sha1(key[0].encode('utf-8')).hexdigest()[:16]
+    remove_database(os.path.join(index_dir or DEFAULT_INDEX_DIR, f"{digest}.sqlite"))
@@ -0,0 +1,269 @@
+"""
+Background job queue for must-gather analysis
+
+Submitting a must-gather returns a job id immediately; a bounded pool of worker
+tasks runs the analyses, pushes progress over the WebSocket manager and persists
+finished results so they can be fetched later by job id.
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.must_gather_agent import MustGatherAgent, analysis_to_dict
+
+logger = logging.getLogger(__name__)
+
+# Seconds between progress updates for a running job
+PROGRESS_INTERVAL = 1.0
+
+# Finished jobs kept in memory and in storage; older ones are evicted with their results
+MAX_FINISHED_JOBS = 100
+
+# Seconds a stored job record is kept, also across server runs
+JOB_TTL = 7 * 24 * 3600
+
+
+@dataclass
+class MustGatherJob:
+    """State of one queued or running must-gather analysis"""
+    job_id: str
+    source: str  # must-gather path or uploaded file name
+    model_preference: str
+    cluster_name: Optional[str] = None
+    user_id: Optional[str] = None  # submitter's /ws connection id; progress goes only there
+    archive_path: Optional[str] = None  # spooled upload, removed when the job ends
+    status: str = "queued"  # queued, running, completed, failed
+    phase: str = "queued"
+    files_scanned: int = 0
+    files_total: Optional[int] = None
+    progress: Optional[float] = None  # 0.0 - 1.0 when known
+    eta_seconds: Optional[float] = None
+    submitted_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+
+    def status_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("archive_path")
+        data.pop("user_id")
+        return data
+
+
+class _CountingReader:
+    """Wraps an archive file to expose how many bytes the streaming scan has consumed"""
+
+    def __init__(self, fileobj: BinaryIO):
+        self._fileobj = fileobj
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._fileobj.read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+class MustGatherJobManager:
+    """Bounded worker pool running must-gather analyses in the background"""
+
+    def __init__(self, agent: Optional[MustGatherAgent] = None, max_concurrent_jobs: int = 2,
+                 storage_dir: Optional[str] = None):
+        self.agent = agent or MustGatherAgent()
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.storage_dir = Path(storage_dir or os.path.join(settings.temp_dir, "must_gather_jobs"))
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.jobs: Dict[str, MustGatherJob] = {}
+        self.websocket_manager = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self, websocket_manager=None):
+        """Start the worker tasks; progress is sent to submitters through websocket_manager if given"""
+        self.websocket_manager = websocket_manager
+        self._evict()
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.max_concurrent_jobs)]
+        logger.info(f"Must-gather job queue started with {self.max_concurrent_jobs} workers")
+
+    async def stop(self):
+        """Cancel the worker tasks; queued jobs are marked failed"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for job in self.jobs.values():
+            if job.status in ("queued", "running"):
+                job.status, job.error = "failed", "Server shut down before the job finished"
+                self._persist(job)
+
+    async def submit_path(self, must_gather_path: str, model_preference: str = "ollama",
+                          cluster_name: Optional[str] = None, user_id: Optional[str] = None) -> MustGatherJob:
+        """Queue analysis of a must-gather directory"""
+        if not os.path.exists(must_gather_path):
+            raise FileNotFoundError(f"Must-gather path not found: {must_gather_path}")
+        return await self._submit(MustGatherJob(
+            job_id=uuid.uuid4().hex, source=must_gather_path,
+            model_preference=model_preference, cluster_name=cluster_name, user_id=user_id
+        ))
+
+    async def submit_archive(self, archive: BinaryIO, filename: str, model_preference: str = "ollama",
+                             cluster_name: Optional[str] = None, user_id: Optional[str] = None) -> MustGatherJob:
+        """Spool an uploaded archive (without extracting it) and queue its analysis"""
+        job = MustGatherJob(
+            job_id=uuid.uuid4().hex, source=filename,
+            model_preference=model_preference, cluster_name=cluster_name, user_id=user_id
+        )
+        job.archive_path = str(self.storage_dir / f"{job.job_id}.upload")
+        await asyncio.get_running_loop().run_in_executor(None, self._spool, archive, job.archive_path)
+        return await self._submit(job)
+
+    @staticmethod
+    def _spool(archive: BinaryIO, target: str):
+        with open(target, "wb") as f:
+            while True:
+                chunk = archive.read(1024 * 1024)
+                if not chunk:
+                    break
+                f.write(chunk)
+
+    async def _submit(self, job: MustGatherJob) -> MustGatherJob:
+        if self._queue is None:
+            raise RuntimeError("Must-gather job queue is not running")
+        self._evict()
+        self.jobs[job.job_id] = job
+        self._persist(job)
+        await self._queue.put(job.job_id)
+        logger.info(f"Queued must-gather job {job.job_id} for {job.source} ({self._queue.qsize()} waiting)")
+        await self._broadcast(job)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job status, from memory or from storage for jobs of earlier server runs"""
+        if job_id in self.jobs:
+            return self.jobs[job_id].status_dict()
+        stored = self.get_result(job_id)
+        return stored.get("job") if stored else None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        return [job.status_dict() for job in self.jobs.values()]
+
+    def get_result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Load a persisted job record (status plus analysis when completed)"""
+        # Job ids are uuid hex; anything else cannot name a stored file
+        if not job_id.isalnum():
+            return None
+        path = self.storage_dir / f"{job_id}.json"
+        if not path.exists():
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _evict(self):
+        """Drop the oldest finished jobs beyond MAX_FINISHED_JOBS and stored records older than JOB_TTL"""
+        finished = [job for job in self.jobs.values() if job.status in ("completed", "failed")]
+        finished.sort(key=lambda job: job.finished_at or job.submitted_at)
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job.job_id]
+            self._remove_record(job.job_id)
+        expired = time.time() - JOB_TTL
+        for path in self.storage_dir.glob("*.json"):
+            try:
+                if path.stat().st_mtime < expired and path.stem not in self.jobs:
+                    path.unlink()
+            except OSError as e:
+                logger.warning(f"Could not remove expired job record {path}: {e}")
+
+    def _remove_record(self, job_id: str):
+        try:
+            (self.storage_dir / f"{job_id}.json").unlink()
+        except FileNotFoundError:
+            pass
+
+    def _persist(self, job: MustGatherJob, analysis: Optional[Dict[str, Any]] = None):
+        record = {"job": job.status_dict(), "analysis": analysis}
+        tmp_path = self.storage_dir / f"{job.job_id}.json.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(record, f, default=str)
+        os.replace(tmp_path, self.storage_dir / f"{job.job_id}.json")
+
+    async def _broadcast(self, job: MustGatherJob):
+        # Only the submitter hears about a job; the status names the analyzed path or file
+        if self.websocket_manager and job.user_id:
+            await self.websocket_manager.send_json_to_user(job.user_id, {"type": "must_gather_job", **job.status_dict()})
+
+    async def _worker(self, worker_id: int):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(self.jobs[job_id])
+            except Exception as e:
+                logger.error(f"Must-gather worker {worker_id} failed on job {job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: MustGatherJob):
+        job.status, job.phase = "running", "scanning"
+        job.started_at = datetime.now().isoformat()
+        started = time.perf_counter()
+        reader: Optional[_CountingReader] = None
+        archive_size = 0
+
+        def on_progress(phase: str, done: int, total: Optional[int]):
+            # Called from the scan thread; only plain attribute updates here
+            job.phase = phase
+            if phase == "scanning":
+                job.files_scanned, job.files_total = done, total
+
+        async def report_progress():
+            while True:
+                if job.phase == "scanning":
+                    if job.files_total:
+                        job.progress = job.files_scanned / job.files_total
+                    elif reader is not None and archive_size:
+                        job.progress = min(reader.bytes_read / archive_size, 1.0)
+                    elapsed = time.perf_counter() - started
+                    job.eta_seconds = round(elapsed * (1 - job.progress) / job.progress, 1) if job.progress else None
+                else:
+                    job.progress, job.eta_seconds = None, None
+                await self._broadcast(job)
+                await asyncio.sleep(PROGRESS_INTERVAL)
+
+        reporter = asyncio.create_task(report_progress())
+        try:
+            if job.archive_path:
+                archive_size = os.path.getsize(job.archive_path)
+                with open(job.archive_path, "rb") as archive:
+                    # Zip needs random access; tar is streamed through the byte counter
+                    reader = _CountingReader(archive)
+                    source = archive if job.source.lower().endswith(".zip") else reader
+                    analysis = await self.agent.analyze_must_gather_archive(source, job.source, job.model_preference, on_progress)
+            else:
+                analysis = await self.agent.analyze_must_gather(job.source, job.model_preference, on_progress)
+
+            job.status, job.phase, job.progress, job.eta_seconds = "completed", "completed", 1.0, 0
+            job.finished_at = datetime.now().isoformat()
+            self._persist(job, analysis_to_dict(analysis))
+            logger.info(f"Must-gather job {job.job_id} completed in {time.perf_counter() - started:.1f}s")
+        except Exception as e:
+            job.status, job.phase, job.error = "failed", "failed", str(e)
+            job.finished_at = datetime.now().isoformat()
+            self._persist(job)
+            logger.error(f"Must-gather job {job.job_id} failed: {e}")
+        finally:
+            reporter.cancel()
+            if job.archive_path and os.path.exists(job.archive_path):
+                os.remove(job.archive_path)
+            await self._broadcast(job)
+
+
+# Global job manager instance
+must_gather_jobs = MustGatherJobManager()
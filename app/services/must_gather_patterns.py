@@ -0,0 +1,124 @@
+"""
+Declarative error classification tables for must-gather log scanning
+"""
+
+import re
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+# Words that mark a log line as an actual error worth classifying
+ERROR_MARKERS = ('error:', 'failed:', 'timeout:', 'unable to', 'connection refused')
+
+# Only this many leading characters of an error line are kept and classified
+EVIDENCE_LINE_LENGTH = 120
+
+
+@dataclass(frozen=True)
+class IssueCategory:
+    """An issue category and the lowercase substrings that put an error line into it"""
+    issue_type: str
+    severity: str  # critical, high, medium, low
+    description: str
+    affected_components: Tuple[str, ...]
+    recommendations: Tuple[str, ...]
+    patterns: Tuple[str, ...]
+
+
+DEFAULT_ISSUE_CATEGORIES: List[IssueCategory] = [
+    IssueCategory(
+        issue_type="NETWORK_CONNECTIVITY",
+        severity="high",
+        description="Network connectivity issues detected",
+        affected_components=("all_services",),
+        recommendations=("Check network connectivity between nodes", "Verify DNS resolution"),
+        patterns=('connection refused', 'network unreachable', 'timeout', 'unable to connect')
+    ),
+    IssueCategory(
+        issue_type="API_SERVICE_FAILURE",
+        severity="critical",
+        description="OpenShift API services failing",
+        affected_components=("openshift-apiserver", "authentication", "console"),
+        recommendations=("Check API server logs", "Verify certificates", "Restart API services"),
+        patterns=('api server', 'unauthorized', 'forbidden', 'authentication')
+    ),
+    IssueCategory(
+        issue_type="OPERATOR_DEGRADATION",
+        severity="medium",
+        description="Cluster operators showing degraded status",
+        affected_components=("cluster_operators",),
+        recommendations=("Check operator logs", "Verify operator configurations"),
+        patterns=('operator', 'degraded', 'unavailable')
+    ),
+    IssueCategory(
+        issue_type="ETCD_COMMUNICATION",
+        severity="high",
+        description="etcd cluster communication issues detected",
+        affected_components=("etcd", "openshift-apiserver"),
+        recommendations=("Check etcd cluster health", "Verify etcd certificates"),
+        patterns=('etcd', 'quorum', 'leader election')
+    ),
+]
+
+
+def _alternation(words: Sequence[str]) -> "re.Pattern":
+    """One regex matching any of the (non-empty) literal words, longest first"""
+    words = sorted(set(words) - {''}, key=len, reverse=True)
+    return re.compile('|'.join(map(re.escape, words)) if words else r'(?!)')
+
+
+class ErrorLineClassifier:
+    """Classifies error lines into every matching issue category in a single pass.
+
+    All category patterns are compiled into one alternation regex and a line is
+    scanned once: each search resumes one character after the previous match, so
+    overlapping patterns are found too, and a match also stands for the shorter
+    patterns inside it. Adding a category only means adding an IssueCategory entry.
+    """
+
+    def __init__(self, categories: Optional[Sequence[IssueCategory]] = None,
+                 error_markers: Sequence[str] = ERROR_MARKERS):
+        self.categories = list(categories if categories is not None else DEFAULT_ISSUE_CATEGORIES)
+        self.error_markers = tuple(error_markers)
+        self._issue_types = [category.issue_type for category in self.categories]
+        self._error_regex = _alternation(self.error_markers)
+
+        types_by_pattern: Dict[str, Set[str]] = {}
+        for category in self.categories:
+            for pattern in category.patterns:
+                types_by_pattern.setdefault(pattern, set()).add(category.issue_type)
+        self._matched_types = {
+            pattern: frozenset(issue_type for other, types in types_by_pattern.items() if other in pattern
+                               for issue_type in types)
+            for pattern in types_by_pattern
+        }
+        self._pattern_regex = _alternation(list(types_by_pattern))
+        # Lines differing only in their numbers classify alike unless a pattern has digits
+        self.digit_free = not any(char.isdigit() for pattern in (*self.error_markers, *types_by_pattern)
+                                  for char in pattern)
+
+    @property
+    def cache_key(self) -> str:
+        """Stable digest of the pattern tables, for caching classification results"""
+        return hashlib.sha256(repr((self.error_markers, self.categories)).encode('utf-8')).hexdigest()[:16]
+
+    def is_error(self, lower_line: str) -> bool:
+        """Whether a lowercased line contains any error marker"""
+        return self._error_regex.search(lower_line) is not None or '' in self.error_markers
+
+    def classify(self, lower_line: str) -> List[str]:
+        """Return the issue types whose patterns occur in a lowercased line, in table order"""
+        search = self._pattern_regex.search
+        match = search(lower_line)
+        # An empty pattern occurs in every line
+        hits = set(self._matched_types.get('', ()))
+        if match is None and not hits:
+            return []
+        while match is not None:
+            hits.update(self._matched_types[match.group()])
+            match = search(lower_line, match.start() + 1)
+        return [issue_type for issue_type in self._issue_types if issue_type in hits]
+
+
+# Shared classifier for the built-in categories
+DEFAULT_CLASSIFIER = ErrorLineClassifier()
@@ -0,0 +1,276 @@
+"""
+Time-windowed log timeline for must-gather container logs
+
+When a must-gather is analyzed in place, or on its first window query, every
+container log gets a sparse index of (timestamp -> byte offset) marks, one per
+MARK_INTERVAL bytes. A window query
+seeks each relevant log to the last mark before the window start, reads only
+until the window end, and merges the per-file streams by timestamp (k-way
+merge), so "all errors in openshift-etcd and kube-apiserver between 10:42 and
+10:47" never scans whole files.
+
+Timestamps, marks, window reads and the bounded merge are shared with omg's
+`omg logs --since/--until` (omg.log.timeline); this module keeps the marks in
+SQLite so queries can filter by namespace and pod.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from omg.log.timeline import build_marks, merge_streams, normalize_bound, read_window
+
+from app.services.must_gather_index import DEFAULT_INDEX_DIR, MAX_OPEN_INDEXES, remove_database
+
+logger = logging.getLogger(__name__)
+
+TIMELINE_SCHEMA_VERSION = 1
+
+# Container logs as laid out by must-gather: namespaces/<ns>/pods/<pod>/<container>/<container>/logs/*.log
+_LOG_PATH = re.compile(r'^namespaces/([^/]+)/pods/([^/]+)/([^/]+)/[^/]+/logs/([^/]+\.log)$')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS logs (
+    path TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    pod TEXT NOT NULL,
+    container TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    first_ts TEXT,
+    last_ts TEXT
+);
+CREATE TABLE IF NOT EXISTS marks (
+    path TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    PRIMARY KEY (path, offset)
+);
+CREATE INDEX IF NOT EXISTS logs_namespace ON logs (namespace);
+"""
+
+
+@dataclass
+class TimelineEntry:
+    """One log line from a window query"""
+    timestamp: str
+    namespace: str
+    pod: str
+    container: str
+    file: str
+    message: str
+
+
+def _walk_logs(root: str) -> Iterator[Tuple[str, Tuple[str, str, str], int, int]]:
+    """Yield (relative path, (namespace, pod, container), mtime_ns, size) for every container log"""
+    namespaces_dir = os.path.join(root, 'namespaces')
+    pending = [namespaces_dir]
+    while pending:
+        current = pending.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.name.endswith('.log') and entry.is_file():
+                        rel_path = os.path.relpath(entry.path, root).replace(os.sep, '/')
+                        match = _LOG_PATH.match(rel_path)
+                        if match:
+                            stat = entry.stat()
+                            yield rel_path, match.groups()[:3], stat.st_mtime_ns, stat.st_size
+        except OSError as e:
+            logger.debug(f"Could not list directory {current}: {e}")
+
+
+class LogTimeline:
+    """Sparse timestamp index over the container logs of one must-gather"""
+
+    def __init__(self, must_gather_path: str, index_dir: Optional[str] = None):
+        self.must_gather_path = os.path.abspath(must_gather_path)
+        index_dir = index_dir or DEFAULT_INDEX_DIR
+        os.makedirs(index_dir, exist_ok=True)
+        digest = hashlib.sha1(self.must_gather_path.encode('utf-8')).hexdigest()[:16]
+        self.db_path = os.path.join(index_dir, f"{digest}.timeline.sqlite")
+        self._lock = threading.Lock()
+        self._refreshed = False
+        self._init_db()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for one transaction; connections are not shared across threads"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if row is None or int(row[0]) != TIMELINE_SCHEMA_VERSION:
+                conn.execute("DELETE FROM logs")
+                conn.execute("DELETE FROM marks")
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (str(TIMELINE_SCHEMA_VERSION),))
+
+    def refresh(self) -> Dict[str, Any]:
+        """Index new or changed container logs; unchanged logs are not read"""
+        with self._lock:
+            start = time.perf_counter()
+            on_disk = {path: (owner, mtime_ns, size) for path, owner, mtime_ns, size in _walk_logs(self.must_gather_path)}
+
+            with self._connect() as conn:
+                indexed = {path: (mtime_ns, size) for path, mtime_ns, size in conn.execute("SELECT path, mtime_ns, size FROM logs")}
+            removed = [path for path in indexed if path not in on_disk]
+            changed = [path for path, (_, mtime_ns, size) in on_disk.items() if indexed.get(path) != (mtime_ns, size)]
+
+            # Logs are read before the write transaction so readers are never blocked on I/O
+            rows = []
+            for path in changed:
+                try:
+                    rows.append((path, build_marks(os.path.join(self.must_gather_path, path))))
+                except OSError as e:
+                    logger.warning(f"Could not index log {path}: {e}")
+
+            with self._connect() as conn:
+                for path in removed + changed:
+                    conn.execute("DELETE FROM marks WHERE path = ?", (path,))
+                    conn.execute("DELETE FROM logs WHERE path = ?", (path,))
+                for path, marks in rows:
+                    (namespace, pod, container), mtime_ns, size = on_disk[path]
+                    conn.execute("INSERT INTO logs VALUES (?,?,?,?,?,?,?,?)",
+                                 (path, namespace, pod, container, mtime_ns, size, marks['first'], marks['last']))
+                    conn.executemany("INSERT INTO marks VALUES (?,?,?)", [(path, ts, offset) for ts, offset in marks['marks']])
+
+            # The mtime records when the timeline was last used, for prune_index_dir
+            os.utime(self.db_path)
+            self._refreshed = True
+            stats = {
+                'logs': len(on_disk),
+                'indexed': len(rows),
+                'removed': len(removed),
+                'seconds': round(time.perf_counter() - start, 3)
+            }
+            logger.info(f"Log timeline for {self.must_gather_path}: {stats}")
+            return stats
+
+    def collection_date(self) -> Optional[str]:
+        """Date of the newest log line, used to interpret bare times of day"""
+        if not self._refreshed:
+            self.refresh()
+        with self._connect() as conn:
+            row = conn.execute("SELECT MAX(last_ts) FROM logs").fetchone()
+        return row[0][:10] if row and row[0] else None
+
+    def query(self, since: Optional[str] = None, until: Optional[str] = None,
+              namespaces: Optional[Sequence[str]] = None, pods: Optional[Sequence[str]] = None,
+              match=None, limit: Optional[int] = 1000) -> List[TimelineEntry]:
+        """Log lines with since <= timestamp <= until across all matching logs, in time order.
+
+        since/until accept ISO datetimes or times of day (see normalize_bound).
+        match, if given, is a callable taking the decoded line and returning whether to keep it.
+        """
+        return list(islice(self.iter_window(since, until, namespaces, pods, match), limit))
+
+    def iter_window(self, since: Optional[str] = None, until: Optional[str] = None,
+                    namespaces: Optional[Sequence[str]] = None, pods: Optional[Sequence[str]] = None,
+                    match=None) -> Iterator[TimelineEntry]:
+        """Stream the lines of a window query as a k-way merge of per-log streams.
+
+        At most omg.log.timeline.MAX_OPEN_LOGS logs are open at once; larger
+        selections are merged in batches.
+        """
+        if not self._refreshed:
+            self.refresh()
+        default_date = self.collection_date() if (since and 'T' not in since) or (until and 'T' not in until) else None
+        since_key = normalize_bound(since, default_date) if since else None
+        until_key = normalize_bound(until, default_date) if until else None
+
+        clauses, params = [], []
+        if namespaces:
+            clauses.append(f"namespace IN ({','.join('?' * len(namespaces))})")
+            params.extend(namespaces)
+        if pods:
+            clauses.append(f"pod IN ({','.join('?' * len(pods))})")
+            params.extend(pods)
+        # Logs entirely outside the window are skipped without being opened
+        if since_key:
+            clauses.append("(last_ts IS NULL OR last_ts >= ?)")
+            params.append(since_key)
+        if until_key:
+            clauses.append("(first_ts IS NULL OR first_ts <= ?)")
+            params.append(until_key)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._connect() as conn:
+            logs = conn.execute(f"SELECT path, namespace, pod, container FROM logs {where} ORDER BY path", params).fetchall()
+            starts = {}
+            for path, *_ in logs:
+                row = None
+                if since_key:
+                    row = conn.execute("SELECT MAX(offset) FROM marks WHERE path = ? AND ts <= ?", (path, since_key)).fetchone()
+                starts[path] = row[0] if row and row[0] is not None else 0
+
+        streams = [
+            read_window(os.path.join(self.must_gather_path, path), (namespace, pod, container, path),
+                        starts[path], since_key, until_key)
+            for path, namespace, pod, container in logs
+        ]
+        for timestamp, (namespace, pod, container, path), line in merge_streams(streams):
+            if match is None or match(line):
+                yield TimelineEntry(timestamp, namespace, pod, container, path, line)
+
+
+# Threads running timeline refreshes and queries; a first query reads every
+# container log, so it is kept off the default executor
+TIMELINE_THREADS = 2
+
+_timeline_executor: Optional[ThreadPoolExecutor] = None
+_timeline_executor_lock = threading.Lock()
+
+_timelines: "OrderedDict[Tuple[str, Optional[str]], LogTimeline]" = OrderedDict()
+_timelines_lock = threading.Lock()
+
+
+def get_log_timeline(must_gather_path: str, index_dir: Optional[str] = None) -> LogTimeline:
+    """Return the process-wide timeline object for a must-gather directory"""
+    key = (os.path.abspath(must_gather_path), index_dir)
+    with _timelines_lock:
+        if key in _timelines:
+            _timelines.move_to_end(key)
+        else:
+            _timelines[key] = LogTimeline(must_gather_path, index_dir)
+            while len(_timelines) > MAX_OPEN_INDEXES:
+                _timelines.popitem(last=False)
+        return _timelines[key]
+
+
+def discard_log_timeline(must_gather_path: str, index_dir: Optional[str] = None):
+    """Forget a must-gather's timeline and delete its database"""
+    key = (os.path.abspath(must_gather_path), index_dir)
+    with _timelines_lock:
+        _timelines.pop(key, None)
+    digest = hashlib.sha1(key[0].encode('utf-8')).hexdigest()[:16]
+    remove_database(os.path.join(index_dir or DEFAULT_INDEX_DIR, f"{digest}.timeline.sqlite"))
+
+
+def timeline_executor() -> ThreadPoolExecutor:
+    """The dedicated executor for timeline queries"""
+    global _timeline_executor
+    with _timeline_executor_lock:
+        if _timeline_executor is None:
+            _timeline_executor = ThreadPoolExecutor(max_workers=TIMELINE_THREADS, thread_name_prefix="must-gather-timeline")
+        return _timeline_executor
@@ -0,0 +1,238 @@
+"""
+Index over trained patterns for matching messages without testing patterns one by one
+"""
+
+import re
+from bisect import insort, bisect_left
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Plain patterns added since the automaton was built are checked one by one until
+# there are this many of them, then the automaton is rebuilt
+MAX_PENDING_SUBSTRINGS = 64
+
+REGEX_PREFIX = "regex:"
+
+
+@lru_cache(maxsize=4096)
+def compile_regex(source: str) -> Optional["re.Pattern"]:
+    """Compile a trained regex pattern once; invalid regexes never match (None)"""
+    try:
+        return re.compile(source, re.IGNORECASE)
+    except re.error:
+        return None
+
+
+class SubstringAutomaton:
+    """Aho-Corasick automaton: finds which of a set of substrings occur in a text in one pass"""
+
+    def __init__(self, words: Iterable[str]):
+        goto: List[Dict[str, int]] = [{}]
+        out: List[Tuple[str, ...]] = [()]
+        for word in words:
+            state = 0
+            for char in word:
+                nxt = goto[state].get(char)
+                if nxt is None:
+                    goto.append({})
+                    out.append(())
+                    nxt = len(goto) - 1
+                    goto[state][char] = nxt
+                state = nxt
+            out[state] += (word,)
+
+        # Failure links, breadth first; a state also outputs the words of its failure state
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and char not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(char, 0)
+                if fail[nxt]:
+                    out[nxt] += out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def find(self, text: str) -> Set[str]:
+        """Return the words that occur in text"""
+        goto, fail, out = self._goto, self._fail, self._out
+        # The empty word (if any) is the root's output and occurs in every text
+        found = set(out[0])
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+class PatternIndex:
+    """Matches messages against the trained patterns of a PatternTrainer.
+
+    Patterns are tried in priority order, highest (success_rate, usage_count) first
+    and in insertion order on ties. Plain patterns (case-insensitive substrings) are
+    compiled into one Aho-Corasick automaton over the lowercased message; regex
+    patterns are compiled once and grouped by intent. The priority order is kept
+    sorted as patterns are added, updated and removed, so finding the best match
+    costs about the same whatever the number of patterns.
+
+    The index reads the pattern dict of a PatternStore and is shared by the
+    trainers on that store; a trainer calls add, update and remove when it
+    changes a pattern.
+    """
+
+    def __init__(self, patterns: Dict[str, Dict[str, Any]]):
+        self.patterns = patterns
+        self.rebuild()
+
+    def rebuild(self):
+        """Re-index every pattern, e.g. after the pattern dict was changed directly"""
+        self._seq = 0
+        self._keys: Dict[str, Tuple] = {}
+        self._order: List[Tuple[Tuple, str]] = []
+        self._regex_order: List[Tuple[Tuple, str]] = []
+        self._regex_by_intent: Dict[str, Set[str]] = {}
+        self._substrings: Dict[str, Set[str]] = {}
+        self._pending: Set[str] = set()
+        self._automaton = SubstringAutomaton(())
+        for pattern_id in list(self.patterns):
+            self._insert(pattern_id)
+        self._build_automaton()
+
+    def _priority(self, pattern_id: str, seq: int) -> Tuple:
+        data = self.patterns[pattern_id]
+        return (-data["success_rate"], -data["usage_count"], seq)
+
+    @staticmethod
+    def _regex_source(data: Dict[str, Any]) -> Optional[str]:
+        pattern = data["pattern"]
+        return pattern[len(REGEX_PREFIX):] if pattern.startswith(REGEX_PREFIX) else None
+
+    def _insert(self, pattern_id: str):
+        data = self.patterns[pattern_id]
+        key = self._priority(pattern_id, self._seq)
+        self._seq += 1
+        self._keys[pattern_id] = key
+        insort(self._order, (key, pattern_id))
+        if self._regex_source(data) is not None:
+            insort(self._regex_order, (key, pattern_id))
+            self._regex_by_intent.setdefault(data["intent"], set()).add(pattern_id)
+        else:
+            text = data["pattern"].lower()
+            if text not in self._substrings:
+                self._substrings[text] = set()
+                self._pending.add(text)
+            self._substrings[text].add(pattern_id)
+
+    def _discard(self, pattern_id: str, data: Dict[str, Any]):
+        key = self._keys.pop(pattern_id)
+        _remove_sorted(self._order, (key, pattern_id))
+        if self._regex_source(data) is not None:
+            _remove_sorted(self._regex_order, (key, pattern_id))
+            self._regex_by_intent.get(data["intent"], set()).discard(pattern_id)
+        else:
+            text = data["pattern"].lower()
+            ids = self._substrings.get(text, set())
+            ids.discard(pattern_id)
+            # The automaton keeps the word; it simply maps to no pattern any more
+            if not ids:
+                self._substrings.pop(text, None)
+                self._pending.discard(text)
+
+    def _build_automaton(self):
+        self._automaton = SubstringAutomaton(self._substrings)
+        self._pending = set()
+
+    def add(self, pattern_id: str, previous: Optional[Dict[str, Any]] = None):
+        """Index a pattern that was added to the pattern dict (previous: the data it replaced)"""
+        if pattern_id in self._keys:
+            self._discard(pattern_id, previous or self.patterns[pattern_id])
+        self._insert(pattern_id)
+
+    def update(self, pattern_id: str):
+        """Re-rank a pattern whose success_rate or usage_count changed"""
+        old_key = self._keys.get(pattern_id)
+        if old_key is None:
+            return
+        key = self._priority(pattern_id, old_key[-1])
+        if key == old_key:
+            return
+        self._keys[pattern_id] = key
+        _remove_sorted(self._order, (old_key, pattern_id))
+        insort(self._order, (key, pattern_id))
+        if self._regex_source(self.patterns[pattern_id]) is not None:
+            _remove_sorted(self._regex_order, (old_key, pattern_id))
+            insort(self._regex_order, (key, pattern_id))
+
+    def remove(self, pattern_id: str, data: Dict[str, Any]):
+        """Drop a pattern that was removed from the pattern dict"""
+        if pattern_id in self._keys:
+            self._discard(pattern_id, data)
+
+    def _sync(self):
+        # Patterns added or deleted behind the index's back
+        if len(self._keys) != len(self.patterns):
+            self.rebuild()
+        elif len(self._pending) > MAX_PENDING_SUBSTRINGS:
+            self._build_automaton()
+
+    def _substring_matches(self, message: str) -> Set[str]:
+        message_lower = message.lower()
+        words = self._automaton.find(message_lower)
+        words.update(text for text in self._pending if text in message_lower)
+        matched: Set[str] = set()
+        for text in words:
+            matched.update(self._substrings.get(text, ()))
+        return matched
+
+    def _regex_matches(self, pattern_id: str, message: str) -> bool:
+        regex = compile_regex(self._regex_source(self.patterns[pattern_id]))
+        return regex is not None and regex.search(message) is not None
+
+    def best_match(self, message: str) -> Optional[str]:
+        """Return the id of the highest priority pattern matching the message"""
+        self._sync()
+        best_key, best_id = None, None
+        for pattern_id in self._substring_matches(message):
+            key = self._keys[pattern_id]
+            if best_key is None or key < best_key:
+                best_key, best_id = key, pattern_id
+        # Only regexes ranked above the best substring match can change the result
+        for key, pattern_id in self._regex_order:
+            if best_key is not None and key > best_key:
+                break
+            if self._regex_matches(pattern_id, message):
+                return pattern_id
+        return best_id
+
+    def matching_ids(self, message: str, intent: Optional[str] = None) -> List[str]:
+        """Return the ids of all patterns (of an intent) matching the message, in pattern dict order"""
+        self._sync()
+        matched = self._substring_matches(message)
+        if intent is not None:
+            matched = {pattern_id for pattern_id in matched if self.patterns[pattern_id]["intent"] == intent}
+            regex_ids = self._regex_by_intent.get(intent, ())
+        else:
+            regex_ids = [pattern_id for _, pattern_id in self._regex_order]
+        matched.update(pattern_id for pattern_id in regex_ids if self._regex_matches(pattern_id, message))
+        return sorted(matched, key=lambda pattern_id: self._keys[pattern_id][-1])
+
+    def best(self, limit: int) -> List[str]:
+        """Ids of the highest priority patterns"""
+        self._sync()
+        return [pattern_id for _, pattern_id in self._order[:limit]]
+
+
+def _remove_sorted(items: List[Tuple[Tuple, str]], item: Tuple[Tuple, str]):
+    index = bisect_left(items, item)
+    if index < len(items) and items[index] == item:
+        del items[index]
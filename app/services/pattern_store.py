@@ -0,0 +1,207 @@
+"""
+Write-behind persistence for trained patterns
+
+The pattern database is kept in memory and written to its JSON snapshot by a
+background flusher, at most once per flush interval, instead of on every change.
+Raw interactions are not part of the snapshot: they are appended to a JSONL log
+next to it (<snapshot>.interactions.jsonl) and only the most recent ones are
+retained; the log is compacted once it holds twice that many. Trainers on the same
+file share one store, so they share the in-memory database and its PatternIndex.
+"""
+
+import os
+import json
+import atexit
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from app.services.pattern_index import PatternIndex
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two writes of the snapshot / interaction log
+FLUSH_INTERVAL = 2.0
+
+# Raw interactions kept in the log; older ones only remain in the aggregated statistics
+MAX_INTERACTIONS = 1000
+
+_stores: Dict[str, "PatternStore"] = {}
+_stores_lock = threading.Lock()
+
+
+def new_interaction_stats() -> Dict[str, Any]:
+    return {"total": 0, "successful": 0, "corrections": 0, "by_intent": {}}
+
+
+def add_interaction_stats(stats: Dict[str, Any], interaction: Dict[str, Any]):
+    """Fold one interaction into the aggregated statistics"""
+    success = bool(interaction.get("success"))
+    stats["total"] += 1
+    stats["successful"] += success
+    if interaction.get("detected_intent") != interaction.get("actual_intent"):
+        stats["corrections"] += 1
+    intent = stats["by_intent"].setdefault(interaction.get("actual_intent") or "unknown", {"total": 0, "successful": 0})
+    intent["total"] += 1
+    intent["successful"] += success
+
+
+class PatternStore:
+    """The in-memory pattern database of one snapshot file and its write-behind flusher"""
+
+    def __init__(self, training_file: str, default: Callable[[], Dict[str, Any]],
+                 flush_interval: float = FLUSH_INTERVAL, max_interactions: int = MAX_INTERACTIONS):
+        self.training_file = training_file
+        self.log_file = os.path.splitext(training_file)[0] + ".interactions.jsonl"
+        self.flush_interval = flush_interval
+        self.max_interactions = max_interactions
+        # Held while the database is changed or serialized
+        self.lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._dirty = False
+        self._pending: List[Dict[str, Any]] = []
+        self._log_lines = 0
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.data = self._load_snapshot() or default()
+        self.data.setdefault("patterns", {})
+        self.data.setdefault("intents", {})
+        self.recent: Deque[Dict[str, Any]] = deque(self._load_log(), maxlen=max_interactions)
+        self._migrate_interactions()
+        # One index for every trainer, so a re-rank by one is seen by all; used under the lock
+        self.index = PatternIndex(self.data["patterns"])
+
+    @classmethod
+    def open(cls, training_file: str, default: Callable[[], Dict[str, Any]]) -> "PatternStore":
+        """The shared store of a snapshot file"""
+        key = os.path.abspath(training_file)
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None or store._closed:
+                store = _stores[key] = cls(training_file, default)
+            return store
+
+    def _load_snapshot(self) -> Optional[Dict[str, Any]]:
+        try:
+            if os.path.exists(self.training_file):
+                with open(self.training_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                logger.info(f"Loaded {len(data.get('patterns', {}))} trained patterns")
+                return data
+        except Exception as e:
+            logger.error(f"Error loading patterns: {e}")
+        return None
+
+    def _load_log(self) -> List[Dict[str, Any]]:
+        """The retained tail of the interaction log"""
+        interactions: Deque[Dict[str, Any]] = deque(maxlen=self.max_interactions)
+        try:
+            if os.path.exists(self.log_file):
+                with open(self.log_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        self._log_lines += 1
+                        try:
+                            interactions.append(json.loads(line))
+                        except ValueError:
+                            # A line cut short by a crash while appending
+                            continue
+        except OSError as e:
+            logger.error(f"Error loading interactions: {e}")
+        return list(interactions)
+
+    def _migrate_interactions(self):
+        """Move the interactions list of older snapshots to the log and the statistics"""
+        interactions = self.data.pop("interactions", None)
+        if "interaction_stats" not in self.data:
+            self.data["interaction_stats"] = new_interaction_stats()
+            for interaction in interactions or []:
+                add_interaction_stats(self.data["interaction_stats"], interaction)
+        if interactions is not None:
+            retained = interactions[-self.max_interactions:]
+            self.recent.extend(retained)
+            self._pending.extend(retained)
+            self.mark_dirty()
+
+    def mark_dirty(self):
+        """Schedule a write of the snapshot"""
+        self._dirty = True
+        self._start()
+
+    def append_interaction(self, interaction: Dict[str, Any]):
+        """Record an interaction in the statistics and schedule its append to the log"""
+        with self.lock:
+            add_interaction_stats(self.data["interaction_stats"], interaction)
+            self.recent.append(interaction)
+            self._pending.append(interaction)
+        self.mark_dirty()
+
+    def _start(self):
+        if self._thread is None and not self._closed:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="pattern-store-flush", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.close)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write pending interactions and, if it changed, the snapshot"""
+        with self._flush_lock:
+            with self.lock:
+                snapshot = json.dumps(self.data, indent=2, ensure_ascii=False) if self._dirty else None
+                self._dirty = False
+                pending, self._pending = self._pending, []
+                lines = [json.dumps(interaction, ensure_ascii=False) + "\n" for interaction in pending]
+            try:
+                if lines:
+                    with open(self.log_file, 'a', encoding='utf-8') as f:
+                        f.write("".join(lines))
+                    self._log_lines += len(lines)
+                    pending = []
+                    if self._log_lines > 2 * self.max_interactions:
+                        self._compact()
+                if snapshot is not None:
+                    self._replace(self.training_file, snapshot)
+                    snapshot = None
+                    logger.debug(f"Saved {len(self.data.get('patterns', {}))} patterns to {self.training_file}")
+            except Exception as e:
+                logger.error(f"Error saving patterns: {e}")
+                # Keep what was not written for the next flush, ahead of newer interactions
+                with self.lock:
+                    self._pending = pending + self._pending
+                    if snapshot is not None:
+                        self._dirty = True
+
+    def _compact(self):
+        """Rewrite the interaction log with the retained interactions only"""
+        with self.lock:
+            # Interactions appended since this flush began are written by the next one
+            retained = list(self.recent)[:max(0, len(self.recent) - len(self._pending))]
+        self._replace(self.log_file, "".join(json.dumps(interaction, ensure_ascii=False) + "\n" for interaction in retained))
+        self._log_lines = len(retained)
+
+    @staticmethod
+    def _replace(path: str, content: str):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def close(self):
+        """Stop the flusher after a last flush"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
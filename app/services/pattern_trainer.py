@@ -1,9 +1,10 @@
 import json
-import os
 import re
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import logging
+from app.services.pattern_index import REGEX_PREFIX, compile_regex
+from app.services.pattern_store import PatternStore, new_interaction_stats
 
 logger = logging.getLogger(__name__)
 
@@ -12,26 +13,21 @@ class PatternTrainer:
     
     def __init__(self, training_file: str = "trained_patterns.json"):
         self.training_file = training_file
-        self.patterns = self._load_patterns()
+        # Shared in-memory database, written behind by the store's flusher
+        self.store = PatternStore.open(training_file, self._default_patterns)
+        self.patterns = self.store.data
+        self.index = self.store.index
         self.confidence_scores = {}
         self.usage_stats = {}
         
-    def _load_patterns(self) -> Dict[str, Any]:
-        """Load existing trained patterns from file"""
-        try:
-            if os.path.exists(self.training_file):
-                with open(self.training_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    logger.info(f"Loaded {len(data.get('patterns', {}))} trained patterns")
-                    return data
-        except Exception as e:
-            logger.error(f"Error loading patterns: {e}")
-        
-        # Default patterns structure
+    @staticmethod
+    def _default_patterns() -> Dict[str, Any]:
+        """Default patterns structure"""
         return {
             "patterns": {},
             "intents": {},
             "entities": {},
+            "interaction_stats": new_interaction_stats(),
             "metadata": {
                 "created": datetime.now().isoformat(),
                 "last_updated": datetime.now().isoformat(),
@@ -40,35 +36,38 @@ class PatternTrainer:
         }
     
     def _save_patterns(self):
-        """Save patterns to file"""
-        try:
-            self.patterns["metadata"]["last_updated"] = datetime.now().isoformat()
-            with open(self.training_file, 'w', encoding='utf-8') as f:
-                json.dump(self.patterns, f, indent=2, ensure_ascii=False)
-            logger.info(f"Saved {len(self.patterns.get('patterns', {}))} patterns to {self.training_file}")
-        except Exception as e:
-            logger.error(f"Error saving patterns: {e}")
+        """Schedule a save of the patterns; the store writes them behind, off the request path"""
+        with self.store.lock:
+            self.patterns.setdefault("metadata", {})["last_updated"] = datetime.now().isoformat()
+        self.store.mark_dirty()
+    
+    def flush(self):
+        """Write pending changes to disk now"""
+        self.store.flush()
     
     def add_pattern(self, intent: str, pattern: str, entities: Dict[str, Any], 
                    confidence: float = 0.8, success_rate: float = 1.0):
         """Add a new pattern to the training database"""
-        pattern_id = f"{intent}_{len(self.patterns['patterns']) + 1}"
-        
-        self.patterns["patterns"][pattern_id] = {
-            "intent": intent,
-            "pattern": pattern,
-            "entities": entities,
-            "confidence": confidence,
-            "success_rate": success_rate,
-            "usage_count": 0,
-            "last_used": None,
-            "created": datetime.now().isoformat()
-        }
-        
-        # Update intent mapping
-        if intent not in self.patterns["intents"]:
-            self.patterns["intents"][intent] = []
-        self.patterns["intents"][intent].append(pattern_id)
+        with self.store.lock:
+            pattern_id = f"{intent}_{len(self.patterns['patterns']) + 1}"
+            previous = self.patterns["patterns"].get(pattern_id)
+            
+            self.patterns["patterns"][pattern_id] = {
+                "intent": intent,
+                "pattern": pattern,
+                "entities": entities,
+                "confidence": confidence,
+                "success_rate": success_rate,
+                "usage_count": 0,
+                "last_used": None,
+                "created": datetime.now().isoformat()
+            }
+            
+            # Update intent mapping
+            if intent not in self.patterns["intents"]:
+                self.patterns["intents"][intent] = []
+            self.patterns["intents"][intent].append(pattern_id)
+            self.index.add(pattern_id, previous)
         
         self._save_patterns()
         logger.info(f"Added pattern {pattern_id}: {pattern} -> {intent}")
@@ -88,19 +87,19 @@ class PatternTrainer:
             "timestamp": datetime.now().isoformat()
         }
         
-        if "interactions" not in self.patterns:
-            self.patterns["interactions"] = []
-        self.patterns["interactions"].append(interaction)
+        # Appended to the interaction log; only aggregated statistics are kept for good
+        self.store.append_interaction(interaction)
         
         # Update pattern success rates
         if success and detected_intent == actual_intent:
             # Find matching patterns and boost their confidence
-            for pattern_id, pattern_data in self.patterns["patterns"].items():
-                if pattern_data["intent"] == detected_intent:
-                    if self._pattern_matches(message, pattern_data["pattern"]):
-                        pattern_data["usage_count"] += 1
-                        pattern_data["last_used"] = datetime.now().isoformat()
-                        pattern_data["success_rate"] = min(1.0, pattern_data["success_rate"] + 0.1)
+            with self.store.lock:
+                for pattern_id in self.index.matching_ids(message, intent=detected_intent):
+                    pattern_data = self.patterns["patterns"][pattern_id]
+                    pattern_data["usage_count"] += 1
+                    pattern_data["last_used"] = datetime.now().isoformat()
+                    pattern_data["success_rate"] = min(1.0, pattern_data["success_rate"] + 0.1)
+                    self.index.update(pattern_id)
         
         # If detection failed, learn from the correct intent
         if not success or detected_intent != actual_intent:
@@ -112,15 +111,31 @@ class PatternTrainer:
         """Check if a message matches a pattern"""
         try:
             # Convert pattern to regex if needed
-            if pattern.startswith("regex:"):
-                regex_pattern = pattern[6:]
-                return bool(re.search(regex_pattern, message, re.IGNORECASE))
+            if pattern.startswith(REGEX_PREFIX):
+                regex = compile_regex(pattern[len(REGEX_PREFIX):])
+                return bool(regex and regex.search(message))
             else:
                 # Simple substring matching
                 return pattern.lower() in message.lower()
         except Exception:
             return False
     
+    def match(self, message: str) -> Optional[Dict[str, Any]]:
+        """Return the highest priority pattern matching a message, if any"""
+        with self.store.lock:
+            pattern_id = self.index.best_match(message)
+            return self.patterns["patterns"][pattern_id] if pattern_id is not None else None
+    
+    def remove_pattern(self, pattern_id: str) -> bool:
+        """Remove a pattern from the training database"""
+        with self.store.lock:
+            pattern_data = self.patterns["patterns"].pop(pattern_id, None)
+            if pattern_data is None:
+                return False
+            self.index.remove(pattern_id, pattern_data)
+        self._save_patterns()
+        return True
+    
     def _learn_correction(self, message: str, correct_intent: str, entities: Dict[str, Any]):
         """Learn from corrections to improve future detection"""
         # Create a new pattern based on the correction
@@ -165,18 +180,17 @@ class PatternTrainer:
     
     def get_best_patterns(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get the best performing patterns"""
-        all_patterns = list(self.patterns["patterns"].values())
-        # Sort by success rate and usage count
-        sorted_patterns = sorted(all_patterns, 
-                               key=lambda x: (x["success_rate"], x["usage_count"]), 
-                               reverse=True)
-        return sorted_patterns[:limit]
+        # The index keeps patterns sorted by success rate and usage count
+        with self.store.lock:
+            return [self.patterns["patterns"][pattern_id] for pattern_id in self.index.best(limit)]
     
     def export_patterns(self, filepath: str):
         """Export patterns to a file"""
         try:
+            with self.store.lock:
+                data = json.dumps(self.patterns, indent=2, ensure_ascii=False)
             with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(self.patterns, f, indent=2, ensure_ascii=False)
+                f.write(data)
             logger.info(f"Exported patterns to {filepath}")
         except Exception as e:
             logger.error(f"Error exporting patterns: {e}")
@@ -187,19 +201,21 @@ class PatternTrainer:
             with open(filepath, 'r', encoding='utf-8') as f:
                 imported_data = json.load(f)
             
-            # Merge patterns
-            for pattern_id, pattern_data in imported_data.get("patterns", {}).items():
-                if pattern_id not in self.patterns["patterns"]:
-                    self.patterns["patterns"][pattern_id] = pattern_data
-            
-            # Update intent mappings
-            for intent, pattern_ids in imported_data.get("intents", {}).items():
-                if intent not in self.patterns["intents"]:
-                    self.patterns["intents"][intent] = []
-                for pattern_id in pattern_ids:
-                    if pattern_id not in self.patterns["intents"][intent]:
-                        self.patterns["intents"][intent].append(pattern_id)
-            
+            with self.store.lock:
+                # Merge patterns
+                for pattern_id, pattern_data in imported_data.get("patterns", {}).items():
+                    if pattern_id not in self.patterns["patterns"]:
+                        self.patterns["patterns"][pattern_id] = pattern_data
+                
+                # Update intent mappings
+                for intent, pattern_ids in imported_data.get("intents", {}).items():
+                    if intent not in self.patterns["intents"]:
+                        self.patterns["intents"][intent] = []
+                    for pattern_id in pattern_ids:
+                        if pattern_id not in self.patterns["intents"][intent]:
+                            self.patterns["intents"][intent].append(pattern_id)
+                
+                self.index.rebuild()
             self._save_patterns()
             logger.info(f"Imported patterns from {filepath}")
         except Exception as e:
@@ -209,13 +225,10 @@ class PatternTrainer:
         """Get training statistics"""
         total_patterns = len(self.patterns["patterns"])
         total_intents = len(self.patterns["intents"])
-        total_interactions = len(self.patterns.get("interactions", []))
-        
-        # Calculate success rates
-        success_count = 0
-        for interaction in self.patterns.get("interactions", []):
-            if interaction["success"]:
-                success_count += 1
+        # Aggregated over every interaction, not just the retained ones
+        stats = self.patterns["interaction_stats"]
+        total_interactions = stats["total"]
+        success_count = stats["successful"]
         
         success_rate = (success_count / total_interactions * 100) if total_interactions > 0 else 0
         
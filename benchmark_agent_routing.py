@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: compiled keyword router vs the original per-domain substring scans
+
+Routes the messages of requests.jsonl (titles and body sentences) and gmail_nlq_examples.json
+through both implementations and reports messages/s and the decisions that changed.
+Usage: python benchmark_agent_routing.py [--rounds 200] [--show 20]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+from app.services.multi_agent_orchestrator import MultiAgentOrchestrator
+
+
+def load_messages():
+    """Request titles and body sentences, plus the Gmail NLQ examples"""
+    messages = []
+    with open(os.path.join(ROOT, "requests.jsonl")) as f:
+        for line in f:
+            if line.strip():
+                request = json.loads(line)
+                messages.append(request["title"])
+                messages.extend(s for s in re.split(r'(?<=[.?!])\s+', request["body"]) if s)
+    with open(os.path.join(ROOT, "gmail_nlq_examples.json")) as f:
+        for examples in json.load(f).values():
+            messages.extend(examples)
+    return messages
+
+
+def legacy_select_agent(orchestrator, message):
+    """The original implementation: keyword lists rebuilt per call, then one any() scan per domain"""
+    message_lower = message.lower()
+    if re.search(r'[A-Z]+-\d+', message):
+        return "jira", "jira", 0.95
+
+    email_keywords = ["email", "emails", "gmail", "mail", "inbox", "unread", "sender", "subject", "template", "draft", "sentiment", "translate", "group", "remind", "reminder", "follow up", "follow-up", "followup", "thank you", "thank-you", "thankyou", "thanks", "reply", "respond", "compose", "write"]
+    jira_keywords = ["jira", "issue", "bug", "story", "task", "epic", "sprint", "ocpqe", "ocpbugs"]
+    kubernetes_keywords = ["kubectl", "oc", "pod", "pods", "namespace", "deployment", "service", "kubernetes", "openshift", "ocp", "deploy", "deploying", "list", "get", "describe", "logs", "exec", "scale", "rollout", "ingress", "route", "pvc", "pv", "storage", "network", "rbac", "configmap", "secret", "node", "cluster"]
+    github_keywords = ["github", "pr", "pull request", "commit", "repository", "repo"]
+    calendar_keywords = ["calendar", "cal", "schedule meeting", "schedule call", "meeting", "event", "appointment", "agenda", "show my calendar", "show calendar", "my calendar", "accept meeting", "accept invite", "book call", "set up call", "meeting reminder", "send invite", "send meeting", "invitation"]
+    must_gather_keywords = ["must-gather", "mustgather", "gather", "analysis", "cluster", "troubleshoot", "debug", "report", "compare", "extract", "analyze", "diagnostic", "diagnostics"]
+
+    if any(keyword in message_lower for keyword in must_gather_keywords):
+        return "must_gather", "must_gather", 0.9
+    if any(keyword in message_lower for keyword in email_keywords):
+        return "gmail", "email", 0.9
+    if any(keyword in message_lower for keyword in jira_keywords):
+        return "jira", "jira", 0.9
+    if any(keyword in message_lower for keyword in kubernetes_keywords):
+        return "kubernetes", "kubernetes", 0.9
+    if any(keyword in message_lower for keyword in github_keywords):
+        return "github", "github", 0.9
+    if any(keyword in message_lower for keyword in calendar_keywords):
+        return "calendar", "calendar", 0.9
+
+    # should_handle on every agent; MustGatherAgent has none, and process_message
+    # fell back to the general agent on the resulting error
+    try:
+        agent_scores = {name: agent.should_handle(message) for name, agent in orchestrator.agents.items()}
+    except AttributeError:
+        return "general", "general", 0.5
+    best_agent = max(agent_scores.items(), key=lambda x: x[1])
+    return best_agent[0], orchestrator.agents[best_agent[0]].get_domain_keywords()[0], best_agent[1]
+
+
+def timed(route, messages, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in messages:
+            route(message)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=200, help="Passes over the message set")
+    parser.add_argument("--show", type=int, default=20, help="Changed decisions to print")
+    args = parser.parse_args()
+
+    orchestrator = MultiAgentOrchestrator()
+    messages = load_messages()
+    total = len(messages) * args.rounds
+    print(f"📝 {len(messages)} messages x {args.rounds} rounds")
+
+    legacy_time = timed(lambda m: legacy_select_agent(orchestrator, m), messages, args.rounds)
+    print(f"⏱️  Legacy substring scans: {legacy_time:.2f}s ({total / legacy_time:,.0f} messages/s)")
+
+    compiled_time = timed(orchestrator._select_agent, messages, args.rounds)
+    print(f"⏱️  Compiled keyword router: {compiled_time:.2f}s ({total / compiled_time:,.0f} messages/s)")
+    print(f"🚀 Speedup: {legacy_time / compiled_time:.2f}x")
+
+    changed = []
+    for message in messages:
+        before = legacy_select_agent(orchestrator, message)[0]
+        decision = orchestrator._route(message)
+        if before != decision.agent:
+            changed.append((message, before, decision))
+    print(f"🔀 {len(changed)}/{len(messages)} routing decisions changed (whole-word keyword matching)")
+    for message, before, decision in changed[:args.show]:
+        fired = {agent: words for agent, words in decision.breakdown()["keywords"].items() if words}
+        print(f"   {before} -> {decision.agent} ({decision.reason}) {fired}: {message[:70]!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: async Ollama provider vs the original blocking call in async code
+
+Starts a stub Ollama server answering /api/chat after a fixed latency, then sends
+concurrent chats through the original pattern (a synchronous HTTP call inside
+async def, as ollama.chat did) and through the pooled async provider. Reports the
+wall time and how long the event loop was blocked (the worst delay of a 10ms ticker).
+Usage: python benchmark_llm_providers.py [--requests 20] [--latency 0.2] [--concurrency 4]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import threading
+
+import httpx
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from app.core.config import settings
+from app.services.llm_providers import get_provider, close_providers
+
+
+def start_stub_server(latency):
+    """Serve a fake Ollama /api/chat from a background thread; returns its base URL"""
+    async def chat(request):
+        body = await request.json()
+        await asyncio.sleep(latency)
+        return web.json_response({"message": {"role": "assistant", "content": f"echo: {body['messages'][-1]['content']}"}})
+
+    ready = threading.Event()
+    address = {}
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        app = web.Application()
+        app.router.add_post("/api/chat", chat)
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        loop.run_until_complete(site.start())
+        address["url"] = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    ready.wait()
+    return address["url"]
+
+
+async def legacy_chat(message):
+    """The original pattern: a blocking client call inside async def"""
+    response = httpx.post(f"{settings.ollama_base_url}/api/chat", json={
+        "model": settings.ollama_model,
+        "messages": [{"role": "user", "content": message}],
+        "stream": False
+    }, timeout=60)
+    return response.json()["message"]["content"]
+
+
+async def provider_chat(message):
+    return await get_provider("ollama").chat([{"role": "user", "content": message}])
+
+
+async def measure(chat, requests):
+    """Run the chats concurrently; returns (seconds, worst ticker delay, replies)"""
+    worst = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal worst
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            worst = max(worst, time.perf_counter() - start - 0.01)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    replies = await asyncio.gather(*(chat(f"message {n}") for n in range(requests)))
+    elapsed = time.perf_counter() - start
+    done = True
+    await tick
+    return elapsed, worst, replies
+
+
+async def run(args):
+    legacy_time, legacy_lag, legacy = await measure(legacy_chat, args.requests)
+    print(f"⏱️  Blocking call:  {legacy_time:.2f}s, event loop blocked up to {legacy_lag * 1000:,.0f}ms")
+    provider_time, provider_lag, replies = await measure(provider_chat, args.requests)
+    print(f"⏱️  Async provider: {provider_time:.2f}s, event loop blocked up to {provider_lag * 1000:,.0f}ms "
+          f"(at most {args.concurrency} requests at a time)")
+    print(f"🚀 Speedup: {legacy_time / provider_time:.1f}x {'✅' if legacy == replies else '❌'} same replies")
+    await close_providers()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20, help="Concurrent chat requests")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub server latency per request (s)")
+    parser.add_argument("--concurrency", type=int, default=4, help="ollama_max_concurrency")
+    args = parser.parse_args()
+
+    settings.ollama_base_url = start_stub_server(args.latency)
+    settings.ollama_max_concurrency = args.concurrency
+    print(f"📝 {args.requests} concurrent chats, {args.latency * 1000:.0f}ms per reply")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
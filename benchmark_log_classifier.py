@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: single-pass must-gather error classifier vs the original per-category scans
+
+Generates a synthetic log corpus (1 GB by default) and times both implementations on it.
+Usage: python benchmark_log_classifier.py [--size-mb 1024] [--keep]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from app.services.must_gather_agent import MustGatherAgent
+
+SAMPLE_LINES = [
+    "I0101 10:00:00.000000       1 reflector.go:255] Listing and watching *v1.Pod from k8s.io/client-go/informers/factory.go:134",
+    "E0101 10:00:01.000000       1 controller.go:114] error: connection refused while dialing 10.0.0.12:2379 etcd member",
+    "W0101 10:00:02.000000       1 dispatcher.go:129] failed: calling webhook, api server returned unauthorized",
+    "I0101 10:00:03.000000       1 status.go:86] clusteroperator/authentication is progressing, waiting for rollout",
+    "E0101 10:00:04.000000       1 operator.go:99] error: operator degraded: deployment openshift-console unavailable",
+    "E0101 10:00:05.000000       1 raft.go:412] timeout: leader election lost, quorum not reached",
+    "I0101 10:00:06.000000       1 healthz.go:255] informer-sync check passed for all endpoints in namespace",
+    "E0101 10:00:07.000000       1 proxier.go:871] unable to connect to service network unreachable 172.30.0.1:443",
+]
+
+
+def legacy_analyze(lines):
+    """The original implementation: collect error lines, then one any() scan per category"""
+    actual_errors = []
+    for line in lines:
+        line = line.strip()
+        if len(line) > 20:
+            lower_line = line.lower()
+            if any(error_word in lower_line for error_word in ['error:', 'failed:', 'timeout:', 'unable to', 'connection refused']):
+                actual_errors.append(line[:120] + ('...' if len(line) > 120 else ''))
+
+    categories = {
+        "NETWORK_CONNECTIVITY": ['connection refused', 'network unreachable', 'timeout', 'unable to connect'],
+        "API_SERVICE_FAILURE": ['api server', 'unauthorized', 'forbidden', 'authentication'],
+        "OPERATOR_DEGRADATION": ['operator', 'degraded', 'unavailable'],
+        "ETCD_COMMUNICATION": ['etcd', 'quorum', 'leader election'],
+    }
+    found = {}
+    for issue_type, patterns in categories.items():
+        errors = [err for err in actual_errors if any(pattern in err.lower() for pattern in patterns)]
+        if errors:
+            found[issue_type] = errors[:3]
+    return found
+
+
+def generate_corpus(path, size_mb):
+    """Write a synthetic log file of roughly size_mb megabytes"""
+    rng = random.Random(42)
+    target = size_mb * 1024 * 1024
+    block = "\n".join(rng.choice(SAMPLE_LINES) for _ in range(10000)) + "\n"
+    written = 0
+    with open(path, "w") as f:
+        while written < target:
+            f.write(block)
+            written += len(block)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=1024, help="Synthetic corpus size in MB")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated corpus file")
+    args = parser.parse_args()
+
+    fd, corpus = tempfile.mkstemp(suffix=".log", prefix="mg-bench-")
+    os.close(fd)
+    try:
+        print(f"📝 Generating {args.size_mb} MB synthetic corpus at {corpus}")
+        size = generate_corpus(corpus, args.size_mb)
+        size_mb = size / (1024 * 1024)
+
+        start = time.perf_counter()
+        with open(corpus, "r", encoding="utf-8", errors="ignore") as f:
+            legacy = legacy_analyze(f)
+        legacy_time = time.perf_counter() - start
+        print(f"⏱️  Legacy per-category scan: {legacy_time:.2f}s ({size_mb / legacy_time:.1f} MB/s)")
+
+        start = time.perf_counter()
+        with open(corpus, "r", encoding="utf-8", errors="ignore") as f:
+            issues = MustGatherAgent._analyze_file_content(f, corpus)
+        compiled_time = time.perf_counter() - start
+        print(f"⏱️  Compiled single-pass scan: {compiled_time:.2f}s ({size_mb / compiled_time:.1f} MB/s)")
+
+        same = sorted(legacy) == sorted(issue.issue_type for issue in issues)
+        print(f"{'✅' if same else '❌'} Issue categories match: {sorted(legacy)}")
+        print(f"🚀 Speedup: {legacy_time / compiled_time:.2f}x")
+    finally:
+        if not args.keep:
+            os.remove(corpus)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: the AGE column of omg table output
+
+Builds synthetic resources of a kind without a table module (NAME and AGE
+columns), created a few seconds apart, then times the table rows against
+computing the same ages with dateutil's relativedelta alone, and checks that
+both agree.
+Usage: python benchmark_omg_age_column.py [--resources 20000]
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+
+from dateutil.relativedelta import relativedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "must-gather-ai-analysis", "o-must-gather"))
+from omg.config.logging import setup_logging
+from omg.get.output.build_table import table_columns, iter_rows
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def relativedelta_age(ts1, ts2):
+    """Age as computed with dateutil's relativedelta"""
+    rd = relativedelta(datetime.utcfromtimestamp(ts2), datetime.fromisoformat(ts1[:-1]))
+    if rd.days > 0 or rd.months > 0 or rd.years > 0:
+        return str(int(rd.years * 365) + int(rd.months * 30) + int(rd.days)) + "d"
+    elif rd.hours > 9:
+        return str(rd.hours) + "h"
+    elif rd.hours > 0:
+        return str(rd.hours) + "h" + str(rd.minutes) + "m"
+    elif rd.minutes > 9:
+        return str(rd.minutes) + "m"
+    elif rd.minutes > 0:
+        return str(rd.minutes) + "m" + str(rd.seconds) + "s"
+    return str(rd.seconds) + "s"
+
+
+def make_widgets(n):
+    ct = datetime(2024, 3, 5, 12)
+    yfile_ts = (ct - EPOCH).total_seconds()
+    return [
+        {
+            "rdef": {"kind": "Widget", "scope": "Namespaced"},
+            "yfile_ts": yfile_ts,
+            "res": {"metadata": {
+                "name": f"e{i}",
+                "creationTimestamp": (ct - timedelta(seconds=i * 13)).isoformat() + "Z",
+            }},
+        }
+        for i in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resources", type=int, default=20000, help="Resources in the table")
+    args = parser.parse_args()
+
+    setup_logging(loglevel="normal")
+    widgets = make_widgets(args.resources)
+    _, head_f = table_columns(widgets[0]["rdef"], None, None, False, False)
+
+    start = time.perf_counter()
+    rows = list(iter_rows(widgets, head_f))
+    table_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = [relativedelta_age(w["res"]["metadata"]["creationTimestamp"], w["yfile_ts"]) for w in widgets]
+    reference_time = time.perf_counter() - start
+
+    same = [row[-1] for row in rows] == expected
+    print(f"📋 {len(rows)} rows in {table_time:.3f}s, ages with relativedelta alone {reference_time:.3f}s "
+          f"({reference_time / table_time:.1f}x) {'✅' if same else '❌'} same ages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: recovering truncated must-gather yaml lists in omg
+
+Dumps synthetic event and pod lists, truncates each inside a multi-line quoted
+scalar of its last item (as a size limit would), then times omg's load_yaml
+against the previous recovery that dropped one line from the end per reload,
+and against one full parse of the untruncated file.
+Usage: python benchmark_omg_load_yaml.py [--events 4000] [--pods 1200]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "must-gather-ai-analysis", "o-must-gather"))
+from omg.config.logging import setup_logging
+from omg.utils.load_yaml import load_yaml, SafeLoader
+
+
+def make_pod(i):
+    pod = {
+        "apiVersion": "v1",
+        "kind": "Pod",
+        "metadata": {
+            "name": f"pod-{i}",
+            "namespace": f"ns-{i % 40}",
+            "labels": {"app": f"app-{i % 7}", "pod-template-hash": f"5d8f7c{i}"},
+            "creationTimestamp": "2024-03-05T10:00:00Z",
+        },
+        "spec": {
+            "nodeName": f"worker-{i % 5}",
+            "containers": [
+                {
+                    "name": f"c{c}",
+                    "image": f"quay.io/openshift/app:{i}",
+                    "args": ["--port=8080", "--v=2"],
+                    "resources": {"requests": {"cpu": "10m", "memory": "50Mi"}},
+                }
+                for c in range(3)
+            ],
+        },
+        "status": {"phase": "Running"},
+    }
+    # Long JSON annotations are dumped as multi-line quoted scalars
+    pod["metadata"]["annotations"] = {"kubectl.kubernetes.io/last-applied-configuration": json.dumps(pod["spec"])}
+    return pod
+
+
+def make_event(i):
+    checks = [f"check-{i}-{c}" for c in range(40)]
+    return {
+        "apiVersion": "v1",
+        "kind": "Event",
+        "metadata": {"name": f"pod-{i}.17b9", "namespace": f"ns-{i % 40}"},
+        "involvedObject": {"kind": "Pod", "name": f"pod-{i}", "namespace": f"ns-{i % 40}"},
+        "reason": "Unhealthy",
+        "type": "Warning",
+        "message": "Readiness probe failed: " + json.dumps({"status": "failure", "checks": checks}),
+        "lastTimestamp": "2024-03-05T10:00:00Z",
+        "count": i % 9 + 1,
+    }
+
+
+def line_skipping_load(y_d):
+    """Previous implementation: skip lines from the end until the yaml loads"""
+    try:
+        return yaml.load(y_d, Loader=SafeLoader)
+    except (yaml.scanner.ScannerError, yaml.parser.ParserError):
+        pass
+    while y_d.count("\n") > 1:
+        y_d = y_d[:y_d.rfind("\n")]
+        try:
+            return yaml.load(y_d, Loader=SafeLoader)
+        except (yaml.scanner.ScannerError, yaml.parser.ParserError):
+            pass
+    return None
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def run(workdir, name, make_item, n_items, marker):
+    items = [make_item(i) for i in range(n_items)]
+    y_d = yaml.dump({"apiVersion": "v1", "items": items, "kind": "List", "metadata": {"resourceVersion": ""}},
+                    default_flow_style=False)
+    truncated = y_d[:y_d.rindex(marker) + 400]
+    path = os.path.join(workdir, name)
+    with open(path, "w") as f:
+        f.write(truncated)
+
+    parse_once, full = timed(yaml.load, y_d, SafeLoader)
+    recovered, ydata = timed(load_yaml, path)
+    line_skipping, _ = timed(line_skipping_load, truncated)
+    same = ydata["items"][:n_items - 1] == full["items"][:n_items - 1]
+    print(f"📄 {name}: {len(truncated) / 1e6:.1f} MB truncated, {len(ydata['items'])} items recovered "
+          f"in {recovered:.3f}s {'✅' if same else '❌'}")
+    print(f"   line skipping {line_skipping:.3f}s ({line_skipping / recovered:.1f}x slower), "
+          f"one full parse {parse_once:.3f}s ({recovered / parse_once:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=4000, help="Events in the truncated event list")
+    parser.add_argument("--pods", type=int, default=1200, help="Pods in the truncated pod list")
+    args = parser.parse_args()
+
+    setup_logging(loglevel="normal")
+    with tempfile.TemporaryDirectory(prefix="omg-yaml-bench-") as workdir:
+        run(workdir, "events.yaml", make_event, args.events, "Readiness probe failed")
+        run(workdir, "pods.yaml", make_pod, args.pods, "last-applied-configuration")
+
+
+if __name__ == "__main__":
+    main()
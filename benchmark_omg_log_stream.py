@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: streaming container logs with omg logs --tail/--since/--until/--grep
+
+Writes a synthetic container log of about 50 MB, then streams it with several
+filters into a sink that only counts bytes, reporting the time, the output size
+and the peak Python memory, which should stay within a few chunks whatever the
+log size.
+Usage: python benchmark_omg_log_stream.py [--lines 200000] [--repeat 4]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "must-gather-ai-analysis", "o-must-gather"))
+from omg.config.logging import setup_logging
+from omg.log import stream
+
+
+def log_lines(n, seed=0):
+    rnd = random.Random(seed)
+    lines = []
+    for i in range(n):
+        ts = f"2021-06-01T{10 + i // 3600 % 10:02d}:{i // 60 % 60:02d}:{i % 60:02d}.{i:06d}Z"
+        component = "etcd" if i % 7 == 0 else "apiserver"
+        lines.append(f"{ts} I0601 {component} request id={i} {'error: timeout' if i % 13 == 0 else 'ok'}")
+        if rnd.random() < 0.05:
+            lines.append(f"    goroutine {i} [running]: continuation without timestamp")
+    return lines
+
+
+class Sink:
+    """Binary output that only counts what is written"""
+    size = 0
+
+    def write(self, data):
+        self.size += len(data)
+
+    def flush(self):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=200000, help="Distinct log lines")
+    parser.add_argument("--repeat", type=int, default=4, help="Times the lines are written to the log")
+    args = parser.parse_args()
+
+    setup_logging(loglevel="normal")
+    lines = log_lines(args.lines)
+    last_id = args.lines - 1
+    with tempfile.TemporaryDirectory(prefix="omg-log-bench-") as workdir:
+        log_file = os.path.join(workdir, "current.log")
+        with open(log_file, "w") as lf:
+            for _ in range(args.repeat):
+                lf.write("\n".join(lines) + "\n")
+        print(f"📄 {os.path.getsize(log_file) / 1e6:.0f} MB log")
+
+        for kwargs in [{"tail": 100}, {"since": "2021-06-01T10:55:00Z", "until": "10:56"},
+                       {"grep": f"id={last_id // 10}[0-9] "}, {}]:
+            out = Sink()
+            tracemalloc.start()
+            start = time.perf_counter()
+            stream.stream_log(log_file, out=out, **kwargs)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            bounded = peak < 3 * stream.CHUNK_SIZE
+            print(f"   {kwargs}: {elapsed:.3f}s, {out.size / 1e6:.1f} MB output, "
+                  f"peak Python memory {peak / 1e6:.1f} MB {'✅' if bounded else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: omg CLI startup and TAB completion of resource names
+
+Times a bare interpreter against one that imports omg.cli (the work done before
+any subcommand or completion callback runs), then builds a synthetic must-gather
+and times completing pod names with an empty and with a warm name index.
+Usage: python benchmark_omg_startup.py [--runs 10] [--namespaces 200] [--pods 50]
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+import tempfile
+
+import yaml
+
+OMG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "must-gather-ai-analysis", "o-must-gather")
+sys.path.insert(0, OMG_DIR)
+
+
+def startup_seconds(code, runs):
+    """Best wall time of a fresh interpreter running code"""
+    env = dict(os.environ, PYTHONPATH=OMG_DIR)
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, env=env)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def make_must_gather(root, n_namespaces, n_pods):
+    for n in range(n_namespaces):
+        ns = f"ns-{n}"
+        ns_dir = os.path.join(root, "namespaces", ns)
+        os.makedirs(os.path.join(ns_dir, "core"))
+        with open(os.path.join(ns_dir, f"{ns}.yaml"), "w") as f:
+            yaml.dump({"apiVersion": "v1", "kind": "Namespace", "metadata": {"name": ns}}, f)
+        pods = [
+            {"apiVersion": "v1", "kind": "Pod",
+             "metadata": {"name": f"pod-{n}-{i}", "namespace": ns, "labels": {"app": f"app-{i % 7}"}},
+             "spec": {"containers": [{"name": "c", "image": f"quay.io/openshift/app:{i}"}]},
+             "status": {"phase": "Running"}}
+            for i in range(n_pods)
+        ]
+        with open(os.path.join(ns_dir, "core", "pods.yaml"), "w") as f:
+            yaml.dump({"apiVersion": "v1", "kind": "PodList", "items": pods}, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10, help="Interpreter starts timed (the best is kept)")
+    parser.add_argument("--namespaces", type=int, default=200, help="Namespaces in the synthetic must-gather")
+    parser.add_argument("--pods", type=int, default=50, help="Pods per namespace")
+    args = parser.parse_args()
+
+    baseline = startup_seconds("pass", args.runs)
+    cli = startup_seconds("import omg.cli", args.runs)
+    print(f"🚀 interpreter {baseline * 1000:.0f} ms, import omg.cli {cli * 1000:.0f} ms "
+          f"(+{(cli - baseline) * 1000:.0f} ms)")
+
+    from omg.config.logging import setup_logging
+    from omg.completion import names
+    from omg.must_gather import manifest
+
+    setup_logging(loglevel="normal")
+    with tempfile.TemporaryDirectory(prefix="omg-startup-bench-") as workdir:
+        names._names_dir = os.path.join(workdir, "names")
+        manifest._manifest_dir = os.path.join(workdir, "manifests")
+        root = os.path.join(workdir, "mg")
+        make_must_gather(root, args.namespaces, args.pods)
+
+        start = time.perf_counter()
+        cold = names.resource_names([root], "pod", ns="_all")
+        cold_time = time.perf_counter() - start
+        start = time.perf_counter()
+        warm = names.resource_names([root], "pod", ns="_all")
+        warm_time = time.perf_counter() - start
+        print(f"⌨️  {len(cold)} pod names: empty index {cold_time * 1000:.0f} ms, "
+              f"warm index {warm_time * 1000:.0f} ms ({cold_time / warm_time:.0f}x) "
+              f"{'✅' if sorted(cold) == sorted(warm) else '❌'} same names")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: indexed trained-pattern matching vs the original sort-and-scan
+
+Builds synthetic trained pattern stores of growing size (plain substrings and regex:
+patterns with varied success rates), then times the best-match lookup of both
+implementations and checks that they pick the same pattern, also after patterns are
+learned from, added and removed.
+Usage: python benchmark_pattern_matching.py [--sizes 100 1000 10000] [--messages 500]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from app.services.pattern_trainer import PatternTrainer
+
+WORDS = [
+    "show", "list", "unread", "emails", "from", "manager", "jira", "issue", "comment", "on",
+    "pods", "in", "namespace", "calendar", "meeting", "tomorrow", "assign", "to", "me", "pr",
+    "review", "cluster", "status", "of", "deployment", "logs", "reply", "with", "thanks", "the",
+]
+INTENTS = ["read_emails", "search_emails", "jira_comment", "list_pods", "show_calendar", "review_pr"]
+
+
+def legacy_match(trainer, message):
+    """The original implementation: sort every pattern, then test them one at a time"""
+    all_patterns = trainer.patterns.get("patterns", {})
+    sorted_patterns = sorted(all_patterns.values(),
+                             key=lambda x: (x["success_rate"], x["usage_count"]),
+                             reverse=True)
+    for pattern_data in sorted_patterns:
+        if trainer._pattern_matches(message, pattern_data["pattern"]):
+            return pattern_data
+    return None
+
+
+def random_pattern(rng):
+    words = rng.sample(WORDS, rng.randint(2, 4)) + [f"x{rng.randint(0, 10**6)}"] * rng.randint(0, 1)
+    if rng.random() < 0.1:
+        return "regex:" + r"\s+".join(words[:2]) + r"\b"
+    return " ".join(words)
+
+
+def make_store(path, size, rng):
+    patterns, intents = {}, {}
+    for n in range(size):
+        intent = rng.choice(INTENTS)
+        pattern_id = f"{intent}_{n + 1}"
+        patterns[pattern_id] = {
+            "intent": intent,
+            "pattern": random_pattern(rng),
+            "entities": {},
+            "confidence": 0.8,
+            "success_rate": rng.choice([0.7, 0.8, 0.9, 1.0]),
+            "usage_count": rng.randint(0, 5),
+            "last_used": None,
+            "created": None,
+        }
+        intents.setdefault(intent, []).append(pattern_id)
+    with open(path, "w") as f:
+        json.dump({"patterns": patterns, "intents": intents, "entities": {}, "metadata": {"last_updated": None}}, f)
+
+
+def random_message(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 12))).capitalize()
+
+
+def timed(match, messages):
+    start = time.perf_counter()
+    results = [match(message) for message in messages]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="Pattern store sizes")
+    parser.add_argument("--messages", type=int, default=500, help="Messages matched per store")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    workdir = tempfile.mkdtemp(prefix="pattern-bench-")
+    for size in args.sizes:
+        path = os.path.join(workdir, f"patterns-{size}.json")
+        make_store(path, size, rng)
+        trainer = PatternTrainer(path)
+        # Keep the store on disk unchanged while learning below
+        trainer._save_patterns = lambda: None
+        messages = [random_message(rng) for _ in range(args.messages)]
+
+        legacy_time, legacy = timed(lambda m: legacy_match(trainer, m), messages)
+        indexed_time, indexed = timed(trainer.match, messages)
+        same = all(a is b for a, b in zip(legacy, indexed))
+        print(f"📦 {size} patterns: legacy {legacy_time / len(messages) * 1e6:,.0f} µs/message, "
+              f"indexed {indexed_time / len(messages) * 1e6:,.0f} µs/message "
+              f"({legacy_time / indexed_time:.1f}x) {'✅' if same else '❌'} same matches")
+
+        # Learn, add and remove patterns, then check the incrementally kept order
+        for message in messages[:50]:
+            best = trainer.match(message)
+            if best:
+                trainer.learn_from_interaction(message, best["intent"], best["intent"], {}, True)
+            trainer.add_pattern(rng.choice(INTENTS), random_pattern(rng), {}, success_rate=rng.choice([0.8, 1.0]))
+            trainer.remove_pattern(rng.choice(list(trainer.patterns["patterns"])))
+        same = all(legacy_match(trainer, m) is trainer.match(m) for m in messages)
+        print(f"   {'✅' if same else '❌'} same matches after learning, adding and removing patterns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: WebSocket chat with shared agents vs an AIAgent built per message
+
+Sends general-conversation messages over /ws (shared agents from the registry, one
+conversation per connection) and over a /ws-legacy route running the original
+handler, which constructed AIAgent() for every message, and reports messages/s.
+Usage: python benchmark_websocket_agents.py [--messages 50] [--connections 2]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+from fastapi import WebSocket, WebSocketDisconnect
+from fastapi.testclient import TestClient
+from main import app, websocket_manager
+from app.services.agent_registry import agent_registry
+
+MESSAGES = [
+    "hello there",
+    "what can you help me with",
+    "thank you so much",
+    "tell me a joke",
+    "how are you today",
+]
+
+
+async def legacy_websocket_endpoint(websocket: WebSocket):
+    """The original /ws handler"""
+    await websocket_manager.connect(websocket)
+    try:
+        while True:
+            data = await websocket.receive_text()
+            from app.services.ai_agent import AIAgent
+            agent = AIAgent()
+            response = await agent.process_message(data)
+            await websocket_manager.send_personal_message(json.dumps(response), websocket)
+    except WebSocketDisconnect:
+        websocket_manager.disconnect(websocket)
+
+
+def run(client, path, messages, connections, histories=None):
+    """Send the messages over each connection in turn; returns seconds and the replies.
+
+    For /ws, the length of each connection's conversation is appended to histories
+    before the connection closes (its conversation is dropped then).
+    """
+    replies = []
+    start = time.perf_counter()
+    for _ in range(connections):
+        with client.websocket_connect(path) as websocket:
+            connection_id = json.loads(websocket.receive_text())["connection_id"] if path == "/ws" else None
+            for message in messages:
+                websocket.send_text(message)
+                replies.append(json.loads(websocket.receive_text()))
+            if connection_id and histories is not None:
+                histories.append(len(agent_registry.conversation(connection_id).history))
+    return time.perf_counter() - start, replies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=50, help="Messages per connection")
+    parser.add_argument("--connections", type=int, default=2, help="WebSocket connections, one after the other")
+    args = parser.parse_args()
+
+    app.add_api_websocket_route("/ws-legacy", legacy_websocket_endpoint)
+    messages = [MESSAGES[n % len(MESSAGES)] for n in range(args.messages)]
+    total = args.messages * args.connections
+
+    with TestClient(app) as client:
+        # Warm up: imports and the registry's agents are created before timing
+        run(client, "/ws", messages[:1], 1)
+        run(client, "/ws-legacy", messages[:1], 1)
+
+        legacy_time, legacy = run(client, "/ws-legacy", messages, args.connections)
+        print(f"⏱️  AIAgent per message: {legacy_time:.2f}s ({total / legacy_time:,.1f} messages/s)")
+
+        histories = []
+        shared_time, shared = run(client, "/ws", messages, args.connections, histories)
+        print(f"⏱️  Shared agents:       {shared_time:.2f}s ({total / shared_time:,.1f} messages/s)")
+        print(f"🚀 Speedup: {legacy_time / shared_time:.1f}x")
+
+    same = all(a.get("orchestrator", {}).get("selected_agent") == b.get("orchestrator", {}).get("selected_agent")
+               for a, b in zip(legacy, shared))
+    print(f"{'✅' if same else '❌'} same agents selected")
+    print(f"💬 Conversation history per connection: {histories} messages (kept apart, bounded)")
+
+
+if __name__ == "__main__":
+    main()
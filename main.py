@@ -3,7 +3,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 import logging
+import json
 import os
+import uuid
 from dotenv import load_dotenv
 
 from app.api.auth import auth_router
@@ -24,6 +26,8 @@ from app.api.report_portal import report_portal_router
 from app.core.config import settings
 from app.core.websocket_manager import WebSocketManager
 from app.services.notification_service import notification_service
+from app.services.must_gather_jobs import must_gather_jobs
+from app.services.agent_registry import agent_registry
 
 # Load environment variables
 load_dotenv()
@@ -40,16 +44,28 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting AI Ultimate Assistant...")
     
+    # Create the shared agents once; requests and WebSocket messages reuse them
+    agent_registry.start()
+    
     # Start notification monitoring service
     import asyncio
     notification_task = asyncio.create_task(notification_service.start_monitoring())
     
+    # Start must-gather analysis workers; progress is pushed to WebSocket clients
+    await must_gather_jobs.start(websocket_manager)
+    
     try:
         yield
     finally:
         # Shutdown
         logger.info("Shutting down AI Ultimate Assistant...")
         
+        # Stop must-gather analysis workers
+        await must_gather_jobs.stop()
+        
+        # Write pending trained-pattern changes, close LLM connection pools
+        await agent_registry.stop()
+        
         # Stop notification service
         await notification_service.stop_monitoring()
         notification_task.cancel()
@@ -95,18 +111,24 @@ app.include_router(report_portal_router, prefix="/api/report-portal", tags=["rep
 # WebSocket endpoint for real-time communication
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    await websocket_manager.connect(websocket)
+    # Each connection gets its own conversation, under an id issued here: clients cannot
+    # pick an id to read or write another connection's conversation. The id is sent to
+    # the client, which passes it as user_id to get must-gather job progress.
+    connection_id = uuid.uuid4().hex
+    await websocket_manager.connect(websocket, connection_id)
     try:
+        await websocket_manager.send_personal_json({"type": "connection", "connection_id": connection_id}, websocket)
         while True:
             data = await websocket.receive_text()
-            # Process the message through AI agent
-            from app.services.ai_agent import AIAgent
-            import json
-            agent = AIAgent()
-            response = await agent.process_message(data)
+            # Process the message through the shared AI agent, in this connection's conversation
+            response = await agent_registry.ai_agent.process_message(
+                data, conversation=agent_registry.conversation(connection_id))
             await websocket_manager.send_personal_message(json.dumps(response), websocket)
     except WebSocketDisconnect:
-        websocket_manager.disconnect(websocket)
+        pass
+    finally:
+        websocket_manager.disconnect(websocket, connection_id)
+        agent_registry.end_conversation(connection_id)
 
 # Health check endpoint
 @app.get("/health")
@@ -1,21 +1,26 @@
 import click
 import os
 import subprocess
+from importlib import import_module
 
 from omg import version
 from omg.config import logging, config
-from omg.use import use
-from omg.project import project, projects
-from omg.project.complete import complete_projects
-from omg.get import get
-from omg.get.complete import complete_get
-from omg.log.complete import complete_pods, complete_containers
-from omg.log import log
-from omg.whoami import whoami
-from omg.components.ceph import ceph
-from omg.components.etcdctl import etcdctl
-from omg.machine_config.compare import mc_compare
-from omg.machine_config.extract import mc_extract
+
+
+# Subcommand modules are imported only when their command (or completion)
+# runs, so `omg <cmd>` and TAB completion do not pay for the whole CLI.
+def _lazy(module, attr):
+    """Return a callable that imports module.attr on first call"""
+    def call(*args, **kwargs):
+        return getattr(import_module(module), attr)(*args, **kwargs)
+    call.__name__ = attr
+    return call
+
+
+complete_projects = _lazy("omg.project.complete", "complete_projects")
+complete_get = _lazy("omg.get.complete", "complete_get")
+complete_pods = _lazy("omg.log.complete", "complete_pods")
+complete_containers = _lazy("omg.log.complete", "complete_containers")
 
 
 # Common Options used by multiple subcommands
@@ -63,6 +68,7 @@ def use_cmd(mg_paths, cwd, loglevel, path):
         logging.setup_logging(loglevel)
     if path:
         config.filtered_path = path
+    from omg.use import use
     use.cmd(mg_paths, cwd)
 
 
@@ -80,6 +86,7 @@ def project_cmd(name, loglevel, path):
         logging.setup_logging(loglevel)
     if path:
         config.filtered_path = path
+    from omg.project import project
     project.cmd(name)
 
 
@@ -95,6 +102,7 @@ def projects_cmd(path, loglevel):
         logging.setup_logging(loglevel)
     if path:
         config.filtered_path = path
+    from omg.project import projects
     projects.cmd()
 
 
@@ -119,18 +127,26 @@ def get_cmd(objects, output, show_labels, loglevel, namespace, all_namespaces, p
         config.namespace = namespace
     if all_namespaces:
         config.all_namespaces = all_namespaces
+    from omg.get import get
     get.cmd(objects, output, show_labels)
 
 
 # omg *log*
 @cli.command("logs")
-@click.argument("resource", shell_complete=complete_pods)
+@click.argument("resource", required=False, shell_complete=complete_pods)
 @click.option("--container", "-c", shell_complete=complete_containers)
 @click.option("--previous", "-p", is_flag=True)
+@click.option("--since", help="Only lines at or after this time (e.g. 10:42 or 2021-06-01T10:42:00)")
+@click.option("--until", help="Only lines at or before this time")
+@click.option("--all-pods", is_flag=True, help="Merge the logs of all pods in the namespace by time")
+@click.option("--tail", type=int, help="Only the last N lines")
+@click.option("--grep", help="Only lines matching this regular expression")
 @o_log_level
 @o_filtered_path
 @o_namespace
-def logs_cmd(resource, container, previous, namespace, loglevel, path):
+@o_all_namespaces
+def logs_cmd(resource, container, previous, since, until, all_pods, tail, grep,
+             namespace, all_namespaces, loglevel, path):
     """
     Print the logs for a container in a pod
     """
@@ -140,7 +156,10 @@ def logs_cmd(resource, container, previous, namespace, loglevel, path):
         config.filtered_path = path
     if namespace:
         config.namespace = namespace
-    log.cmd(resource, container, previous)
+    if all_namespaces:
+        config.all_namespaces = all_namespaces
+    from omg.log import log
+    log.cmd(resource, container, previous, since, until, all_pods, tail, grep)
 
 
 # omg *whoami*
@@ -149,6 +168,7 @@ def whoami_cmd():
     """
     Tell you who you are
     """
+    from omg.whoami import whoami
     whoami.cmd()
 
 
@@ -185,6 +205,7 @@ def ceph_cmd(ceph_args, output, loglevel, path):
         logging.setup_logging(loglevel)
     if path:
         config.filtered_path = path
+    from omg.components.ceph import ceph
     ceph.cmd(ceph_args, output, com="ceph")
 
 
@@ -198,6 +219,7 @@ def rados_cmd(ceph_args, loglevel, path):
         logging.setup_logging(loglevel)
     if path:
         config.filtered_path = path
+    from omg.components.ceph import ceph
     ceph.cmd(ceph_args, None, com="rados")
 
 
@@ -211,6 +233,7 @@ def rbd_cmd(ceph_args, loglevel, path):
         logging.setup_logging(loglevel)
     if path:
         config.filtered_path = path
+    from omg.components.ceph import ceph
     ceph.cmd(ceph_args, None, com="rbd")
 
 
@@ -225,6 +248,7 @@ def etcdctl_cmd(etcdctl_args, output, loglevel, path):
         logging.setup_logging(loglevel)
     if path:
         config.filtered_path = path
+    from omg.components.etcdctl import etcdctl
     etcdctl.cmd(etcdctl_args, output)
 
 
@@ -250,21 +274,23 @@ def extract_mc_cmd(mc_names, loglevel, path):
         logging.setup_logging(loglevel)
     if path:
         config.filtered_path = path
+    from omg.machine_config.extract import mc_extract
     mc_extract(mc_names)
 
 
 # omg machine-config *compare*
 @mc_cmd.command("compare")
-@click.argument("mc_names", nargs=2)
+@click.argument("mc_names", nargs=-1, required=True)
 @click.option("--show-contents", is_flag=True)
 @o_log_level
 @o_filtered_path
 def compare_mc_cmd(mc_names, show_contents, loglevel, path):
     """
-    Compare Machine Configs
+    Compare Machine Configs (the first one with each of the others)
     """
     if loglevel:
         logging.setup_logging(loglevel)
     if path:
         config.filtered_path = path
+    from omg.machine_config.compare import mc_compare
     mc_compare(mc_names, show_contents)
@@ -0,0 +1,126 @@
+""" names.py
+
+Name index used by shell completion.
+
+Completing `omg get pod <TAB>` used to load every pod yaml of the namespace on
+each key press. The names found in each yaml file are cached per must-gather in
+~/.omg.names, keyed by the file's mtime and size, so only new or changed files
+are parsed and repeated completions are served from the cache.
+"""
+
+import os
+import json
+import hashlib
+from os import getenv
+from loguru import logger as lg
+from omg.utils.dget import dget
+
+_names_dir = os.path.join(getenv("HOME") or "", ".omg.names")
+
+# Bumped whenever the cached index layout changes
+_INDEX_VERSION = 1
+
+
+def _index_file(path):
+    digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(_names_dir, digest + ".json")
+
+
+def _load_index(path):
+    index_file = _index_file(path)
+    if os.path.isfile(index_file):
+        try:
+            with open(index_file, "r") as i_f:
+                data = json.load(i_f)
+            if data.get("version") == _INDEX_VERSION:
+                return data.get("names", {})
+        except Exception as e:
+            lg.debug("Ignoring unreadable name index {}: {}".format(index_file, e))
+    return {}
+
+
+def _save_index(path, index):
+    index_file = _index_file(path)
+    try:
+        os.makedirs(_names_dir, exist_ok=True)
+        tmp_file = index_file + ".tmp"
+        with open(tmp_file, "w") as i_f:
+            json.dump({"version": _INDEX_VERSION, "names": index}, i_f)
+        os.replace(tmp_file, index_file)
+    except OSError as e:
+        lg.debug("Could not save name index {}: {}".format(index_file, e))
+
+
+def _names_in_yaml(yfile, rdef):
+    from omg.must_gather.load_resources import load_res_from_yaml
+    from omg.must_gather.exceptions import InvalidResource
+
+    try:
+        res = load_res_from_yaml(yfile, rdef)
+    except InvalidResource:
+        return []
+    return [name for name in (dget(r, ["res", "metadata", "name"]) for r in res) if name]
+
+
+def resource_names(paths, r_type, ns=None):
+    """Names of the resources of a type in the selected must-gathers
+
+    Args:
+        paths (list[str]): Must-gather paths
+        r_type (str): Resource type e.g, pod, node
+        ns (str, optional): Namespace ('_all' for all namespaces)
+
+    Returns:
+        list[str]: Resource names
+    """
+    from omg.must_gather.locate_yamls import locate_yamls
+
+    names = []
+    for path in paths:
+        index = _load_index(path)
+        dirty = False
+        rdef, yamls = locate_yamls(path, r_type, ns=ns)
+        for yfile in yamls:
+            if isinstance(yfile, dict):
+                # namespace directory without its yaml
+                names.append(dget(yfile, ["yaml_missing"]))
+                continue
+            stat = os.stat(yfile)
+            key = "{}|{}".format(dget(rdef, ["kind"]), yfile)
+            entry = index.get(key)
+            if not entry or entry[:2] != [stat.st_mtime_ns, stat.st_size]:
+                entry = [stat.st_mtime_ns, stat.st_size, _names_in_yaml(yfile, rdef)]
+                index[key] = entry
+                dirty = True
+            names.extend(entry[2])
+        if dirty:
+            _save_index(path, index)
+    return names
+
+
+def namespace_names(paths):
+    """Namespace names of the selected must-gathers
+
+    Args:
+        paths (list[str]): Must-gather paths
+
+    Returns:
+        list[str]: Namespace names
+    """
+    names = []
+    for path in paths:
+        ns_dir = os.path.join(path, "namespaces")
+        try:
+            mtime_ns = os.stat(ns_dir).st_mtime_ns
+        except OSError:
+            continue
+        index = _load_index(path)
+        entry = index.get("_namespaces")
+        if not entry or entry[0] != mtime_ns:
+            entry = [mtime_ns, sorted(
+                d.name for d in os.scandir(ns_dir) if d.is_dir()
+            )]
+            index["_namespaces"] = entry
+            _save_index(path, index)
+        names.extend(n for n in entry[1] if n not in names)
+    return names
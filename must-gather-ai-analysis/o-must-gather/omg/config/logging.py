@@ -39,6 +39,9 @@ _success_fmt = (
     "<bold>{message}</bold>"
 )
 
+# Resolved loglevel of the last setup_logging call (for worker processes)
+current_loglevel = None
+
 
 def setup_logging(loglevel):
 
@@ -67,6 +70,9 @@ def setup_logging(loglevel):
     else:
         raise ValueError('Invalid loglevel: ' + str(loglevel))
 
+    global current_loglevel
+    current_loglevel = loglevel
+
     logger.remove()
 
     # debug or trace uses _debug_fmt format
@@ -1,6 +1,6 @@
 from omg.must_gather.RDEFS import RDEFS
 from omg.must_gather.get_rdef import get_generated_rdefs
-from omg.get.get_resources import get_all_resource_names
+from omg.completion.names import resource_names
 from omg.get.parse import parse_get_args, ParseError
 from omg.config import config
 from omg.utils.dget import dget
@@ -50,7 +50,7 @@ def complete_get(ctx, args, incomplete):
             # We're completing something like `oc get pod/<tab>`.
             in_rtype = incomplete.split("/")[0]
             in_rname = incomplete.split("/")[1]
-            names = get_all_resource_names({in_rtype: []}, namespace)
+            names = resource_names(dget(cfg, ["paths"]), in_rtype, namespace)
             return [
                 in_rtype + "/" + n
                 for n in names
@@ -84,7 +84,9 @@ def complete_get(ctx, args, incomplete):
 
         if not slash_mode and not comma_mode and len(parsed_objects) > 0:
             # Autocomplete resource names based on the type: oc get pod mypod1 mypod2
-            names = get_all_resource_names(parsed_objects, namespace)
+            names = []
+            for r_type in parsed_objects:
+                names.extend(resource_names(dget(cfg, ["paths"]), r_type, namespace))
             return [n for n in names if n.startswith(incomplete) and n not in objects]
         # Catch all
         return []
@@ -4,7 +4,7 @@ from omg.config import config
 from omg.get.output.o_raw import o_raw
 from omg.get.output.o_table import o_table
 from omg.utils.dget import dget
-from omg.get.get_resources import get_all_resources
+from omg.get.get_resources import iter_all_resources
 
 
 def cmd(objects, output, show_labels):
@@ -24,25 +24,22 @@ def cmd(objects, output, show_labels):
 
     lg.debug("Namespace resolved to: {}".format(ns))
 
-    # Collect resources
-    all_res_d = get_all_resources(parsed_objects, ns)
+    # Collect resources; they are streamed to the output path by path
+    # Tables only need a few fields of each resource, yaml/json need all of them
+    resources = iter_all_resources(
+        parsed_objects, ns, table=output not in ["yaml", "json", "name"]
+    )
 
-    # No resource type found e.g:
-    # all_res_d == [{}, {}, ..<paths>.. ]
-    if not any(all_res_d):
-        lg.error("Unkown resource type")
-        return 2
-
-    # Resource type found, but no resources found e.g:
-    # [{'pods': []}, {'pods': []}, ..<paths>..]
-    if not any([bool(all_res_d[i][rtype]) for i in all_res_d for rtype in all_res_d[i]]):
-        print("No resources found")
-        return 2
-
-    # Pass the parsed object to respective output function
+    # Pass the resources to respective output function
     if output in ["yaml", "json", "name"]:
-        o_raw(all_res_d, output)
+        found = o_raw(resources, output)
     elif output is None or output == "wide":
-        o_table(all_res_d, ns, output, show_labels)
+        found = o_table(resources, ns, output, show_labels, show_type=len(parsed_objects) > 1)
     else:
         lg.error("Unknow output type: {}".format(output))
+        return 2
+
+    # Resource type found, but no resources found
+    if not found:
+        print("No resources found")
+        return 2
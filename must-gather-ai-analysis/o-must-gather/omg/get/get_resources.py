@@ -1,9 +1,82 @@
+import os
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
 from loguru import logger as lg
 
-from omg.config import config
+from omg.config import config, logging
 from omg.utils.dget import dget
-from omg.must_gather.load_resources import load_res
+from omg.must_gather.locate_yamls import locate_yamls
+from omg.must_gather.load_resources import load_located_yaml, filter_res
 from omg.must_gather.exceptions import NameSpaceRequired, UnkownResourceType
+from omg.get.output.build_table import table_fields
+
+# Below this many yaml files, starting worker processes costs more than it saves
+PARALLEL_MIN_YAMLS = 16
+
+# Yamls are sent to the workers in about this many batches per worker, so a large
+# must-gather does not queue one task per yaml while small files still spread evenly
+CHUNKS_PER_WORKER = 4
+
+
+def _locate_all(paths, parsed_objects, ns, table):
+    """Locate the yamls of every (path, r_type) in output order"""
+    plan = []
+    i = 0
+    for path in paths:
+        i += 1
+        for r_type in parsed_objects:
+            try:
+                rdef, yamls = locate_yamls(path, r_type, ns=ns)
+            except NameSpaceRequired as e:
+                lg.error(e)
+                raise SystemExit(1)
+            except UnkownResourceType:
+                lg.error("Unknow resource type: {}".format(r_type))
+                raise SystemExit(1)
+            fields = table_fields(dget(rdef, ["kind"])) if table else None
+            plan.append((i, r_type, parsed_objects[r_type], rdef, fields, yamls))
+    return plan
+
+
+def iter_all_resources(parsed_objects, ns=None, table=False):
+    """Load resources from all paths, yielding them as they become ready
+
+    The yaml files of all paths and types are parsed in a process pool. Results
+    are yielded in the same order as get_all_resources (path by path, r_type by
+    r_type), each as soon as its own yamls are parsed, so output of the first
+    path can start while later ones are still loading.
+
+    Args:
+        parsed_objects (dict): Parsed object
+        ns (string): Namespace/project
+        table (bool): Only load the fields needed for table output
+
+    Yields:
+        tuple: (path index starting at 1, r_type, list of resources)
+    """
+    lg.debug("FUNC_INIT: {}".format(locals()))
+
+    cfg = config.get()
+    plan = _locate_all(cfg["paths"], parsed_objects, ns, table)
+
+    n_yamls = sum(len(yamls) for _, _, _, _, _, yamls in plan)
+    workers = min(os.cpu_count() or 1, n_yamls)
+    if n_yamls < PARALLEL_MIN_YAMLS or workers < 2:
+        for i, r_type, r_names, rdef, fields, yamls in plan:
+            loaded = (load_located_yaml(y, rdef, fields) for y in yamls)
+            yield i, r_type, filter_res(yamls, loaded, r_names)
+        return
+
+    lg.debug("Parsing {} yamls with {} processes".format(n_yamls, workers))
+    # Workers log at the same level as this process, whatever the start method
+    with ProcessPoolExecutor(max_workers=workers, initializer=logging.setup_logging,
+                             initargs=(logging.current_loglevel,)) as pool:
+        tasks = [(y, rdef, fields) for _, _, _, rdef, fields, yamls in plan for y in yamls]
+        chunksize = max(1, n_yamls // (workers * CHUNKS_PER_WORKER))
+        # map() returns results in task order, i.e. in output order
+        loaded = pool.map(load_located_yaml, *zip(*tasks), chunksize=chunksize)
+        for i, r_type, r_names, rdef, fields, yamls in plan:
+            yield i, r_type, filter_res(yamls, islice(loaded, len(yamls)), r_names)
 
 
 def get_all_resources(parsed_objects, ns=None):
@@ -29,32 +102,10 @@ def get_all_resources(parsed_objects, ns=None):
     """
     lg.debug("FUNC_INIT: {}".format(locals()))
 
-    cfg = config.get()
-    paths = cfg["paths"]
-
     # Resources dicts from selected paths
-    # resd_from_paths = []
     resd_from_paths = {}
-
-    i = 0
-    for path in paths:
-        i += 1
-        resd = {}
-        for r_type in parsed_objects:
-            r_names = parsed_objects[r_type]
-
-            try:
-                res = load_res(path, r_type, r_names, ns)
-            except NameSpaceRequired as e:
-                lg.error(e)
-                raise SystemExit(1)
-            except UnkownResourceType:
-                lg.error("Unknow resource type: {}".format(r_type))
-                raise SystemExit(1)
-            else:
-                resd[r_type] = res
-        # resd_from_paths.append(resd)
-        resd_from_paths[i] = resd
+    for i, r_type, res in iter_all_resources(parsed_objects, ns):
+        resd_from_paths.setdefault(i, {})[r_type] = res
     return resd_from_paths
 
 
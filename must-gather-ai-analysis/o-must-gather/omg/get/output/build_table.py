@@ -2,7 +2,7 @@ from importlib import import_module
 from loguru import logger as lg
 
 from omg.utils.dget import dget
-from omg.utils.age import age
+from omg.utils.age import age, ages
 
 
 def _col_ns(res):
@@ -30,6 +30,13 @@ def _col_age(res):
     return age(pod_ct, yfile_ts)
 
 
+def _col_age_batch(res):
+    return ages(
+        (dget(r, ["res", "metadata", "creationTimestamp"]), dget(r, ["yfile_ts"]))
+        for r in res
+    )
+
+
 def _col_labels(res):
     lab = dget(res, ["res", "metadata", "labels"])
     if lab:
@@ -38,26 +45,89 @@ def _col_labels(res):
         return "<none>"
 
 
-def build_table(res, ns, output, show_type, show_labels):
-    lg.debug("FUNC_INIT: {}".format(locals()))
+# Column functions with an equivalent that computes the column
+# for all the resources of a table in one go
+BATCH_COLUMNS = {
+    _col_age: _col_age_batch,
+}
 
-    rdef = dget(res[0], ["rdef"])
+# Resource fields read by the common columns
+# (NAMESPACE, NAME, AGE, LABELS) and by the resource name filter
+COMMON_FIELDS = [
+    ["apiVersion"],
+    ["kind"],
+    ["metadata", "name"],
+    ["metadata", "namespace"],
+    ["metadata", "creationTimestamp"],
+    ["metadata", "labels"],
+]
+
+# (DEFAULT_COLUMNS, WIDE_COLUMNS, FIELDS) of each kind, resolved once per process
+_kind_table_cache = {}
+
+
+def _kind_table(kind):
+    """Get the default/wide column dicts and the fields for a kind
 
-    # Get columns for the type of resources we are building table for
-    # If we find the matching module in table_modules we will use that
-    # Otherwise the default NAME and AGE columns will be used.
-    kind = dget(rdef, ["kind"])
+    If we find the matching module in table_modules we will use that
+    Otherwise the default NAME and AGE columns will be used.
+    The module is only imported the first time a kind is seen.
+
+    A table module may declare FIELDS, the key paths of the resource fields
+    its columns read. Table output then loads only those fields (plus
+    COMMON_FIELDS) from the yaml files; without FIELDS whole resources are
+    loaded. A column that reads a new field must add it to FIELDS.
+    """
+    try:
+        return _kind_table_cache[kind]
+    except KeyError:
+        pass
     try:
         table_mod = import_module("omg.get.output.table_modules.{}".format(kind))
-        def_cols = table_mod.DEFAULT_COLUMNS
-        wid_cols = table_mod.WIDE_COLUMNS
+        table = (
+            table_mod.DEFAULT_COLUMNS,
+            table_mod.WIDE_COLUMNS,
+            getattr(table_mod, "FIELDS", None),
+        )
     except ModuleNotFoundError:
-        def_cols = {
-            "NAME": None,
-            "AGE": None
-        }
-        wid_cols = {}
-    pass
+        table = ({"NAME": None, "AGE": None}, {}, [])
+    _kind_table_cache[kind] = table
+    return table
+
+
+def table_fields(kind):
+    """Resource fields needed to build the table of a kind
+
+    Args:
+        kind (str): Kind of the resources
+
+    Returns:
+        list: Key paths into the resource (see load_res_from_yaml),
+              or None if the table module does not declare its FIELDS
+    """
+    fields = _kind_table(kind)[2]
+    if fields is None:
+        return None
+    return COMMON_FIELDS + fields
+
+
+def table_columns(rdef, ns, output, show_type, show_labels):
+    """Resolve the header and the column functions of a table
+
+    Args:
+        rdef (dict): Resource definition of the resources in the table
+        ns (str): Namespace (_all adds the NAMESPACE column)
+        output (str): None or "wide"
+        show_type (bool): Prefix names with their type
+        show_labels (bool): Add the LABELS column
+
+    Returns:
+        tuple: (header, head_f) where head_f holds one function per header
+               column that takes a resource and returns the cell value
+    """
+    lg.debug("FUNC_INIT: {}".format(locals()))
+
+    def_cols, wid_cols, _ = _kind_table(dget(rdef, ["kind"]))
 
     # Header and respective header functions
     # We build the table header in header array and alongside,
@@ -67,22 +137,18 @@ def build_table(res, ns, output, show_type, show_labels):
 
     scope = dget(rdef, ["scope"])
 
-    # Populate NAME/AGE in default column dict
-    if dget(def_cols, ["NAME"], "") is None:
-        if show_type:
-            def_cols["NAME"] = _col_name_wtype
-        else:
-            def_cols["NAME"] = _col_name
-    if dget(def_cols, ["AGE"], "") is None:
-        def_cols["AGE"] = _col_age
-
     # Go over default/wide column dicts and populate
     # header and header_fn. Namespace and Labels are added
-    # (first and last respectively) if needed
+    # (first and last respectively) if needed.
+    # NAME/AGE set to None in the default column dict use the generic functions
     if ns == "_all" and scope == "Namespaced":
         header.append("NAMESPACE")
         head_f.append(_col_ns)
     for hd, fn in def_cols.items():
+        if fn is None and hd == "NAME":
+            fn = _col_name_wtype if show_type else _col_name
+        elif fn is None and hd == "AGE":
+            fn = _col_age
         header.append(hd)
         head_f.append(fn)
     if output == "wide":
@@ -93,9 +159,21 @@ def build_table(res, ns, output, show_type, show_labels):
         header.append("LABELS")
         head_f.append(_col_labels)
 
-    # Iterate over resources and call the header function
-    # to build the table body
-    body = []
+    return header, head_f
+
+
+def _batch_column(hf, res):
+    """Column function returning the values of BATCH_COLUMNS precomputed for res in order"""
+    batch_f = BATCH_COLUMNS.get(hf)
+    if batch_f is None:
+        return hf
+    values = iter(batch_f(res))
+    return lambda r: next(values)
+
+
+def iter_rows(res, head_f):
+    """Call the header functions on each resource, yielding table rows"""
+    head_f = [_batch_column(hf, res) for hf in head_f]
     for r in res:
         row = []
         for hf in head_f:
@@ -104,6 +182,13 @@ def build_table(res, ns, output, show_type, show_labels):
             except Exception as e:
                 lg.debug("table cell execption: {}".format(e))
                 row.append("?Unknown?")
-        body.append(row)
+        yield row
+
+
+def build_table(res, ns, output, show_type, show_labels):
+    lg.debug("FUNC_INIT: {}".format(locals()))
+
+    rdef = dget(res[0], ["rdef"])
+    header, head_f = table_columns(rdef, ns, output, show_type, show_labels)
 
-    return [header] + body
+    return [header] + list(iter_rows(res, head_f))
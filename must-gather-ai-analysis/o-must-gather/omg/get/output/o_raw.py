@@ -3,18 +3,30 @@ from omg.config import config
 from omg.utils.dget import dget
 import yaml
 import json
+from itertools import groupby
+from operator import itemgetter
 
 
-def o_raw(resd_from_paths, output):
+def o_raw(resources, output):
+    """Handles yaml, json and name output
+
+    Args:
+        resources (iterable): (path index, r_type, resources) tuples as yielded by
+                              get_resources.iter_all_resources
+        output (str): yaml, json or name
+
+    Returns:
+        bool: True if any resource was printed
+    """
     lg.debug("FUNC_INIT: {}".format(locals()))
 
     cfg = config.get()
     paths = cfg["paths"]
 
-    for i, path_resd in resd_from_paths.items():
+    found = False
+    for i, path_items in groupby(resources, key=itemgetter(0)):
         all_res = []
-        for r_type in path_resd:
-            res = path_resd[r_type]
+        for _, r_type, res in path_items:
             if res:
                 all_res.extend(res)
 
@@ -30,6 +42,7 @@ def o_raw(resd_from_paths, output):
             else:
                 continue
 
+            found = True
             if output == "yaml":
                 print(yaml.dump(out_res))
             elif output == "json":
@@ -49,3 +62,4 @@ def o_raw(resd_from_paths, output):
 
             if (len(paths) > 1):
                 lg.opt(colors=True).success("^^^<e>[{}]</>^^^\n".format(i))
+    return found
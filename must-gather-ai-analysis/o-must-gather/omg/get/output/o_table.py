@@ -1,17 +1,70 @@
 from tabulate import tabulate
 from loguru import logger as lg
 from os import getenv
+from itertools import groupby, islice, chain
+from operator import itemgetter
 from omg.config import config
-from omg.get.output.build_table import build_table
+from omg.utils.dget import dget
+from omg.get.output.build_table import table_columns, iter_rows
 
+# Number of rows used to size the columns before the first row is printed
+WIDTH_WINDOW = 500
 
-def o_table(resd_from_paths, ns, output, show_labels):
+
+def _cell(value):
+    return "" if value is None else str(value).strip()
+
+
+def _plain_line(cells, widths):
+    return "  ".join(c.ljust(w) for c, w in zip(cells, widths)).rstrip()
+
+
+def print_plain(rows, window=WIDTH_WINDOW):
+    """Print rows in tabulate's "plain" format without holding them all
+
+    Column widths come from the first `window` rows, which are printed as
+    soon as they are sized. Later rows are printed as they are produced;
+    a cell wider than its column widens that column from then on.
+
+    Args:
+        rows (iterable): Table rows (lists of cell values), header first
+        window (int): Number of rows used to size the columns
+    """
+    rows = iter(rows)
+    first = [[_cell(v) for v in row] for row in islice(rows, window)]
+
+    widths = []
+    for cells in first:
+        for n, c in enumerate(cells):
+            if n == len(widths):
+                widths.append(len(c))
+            elif len(c) > widths[n]:
+                widths[n] = len(c)
+
+    for cells in first:
+        print(_plain_line(cells, widths))
+
+    for row in rows:
+        cells = [_cell(v) for v in row]
+        for n, c in enumerate(cells):
+            if n == len(widths):
+                widths.append(len(c))
+            elif len(c) > widths[n]:
+                widths[n] = len(c)
+        print(_plain_line(cells, widths))
+
+
+def o_table(resources, ns, output, show_labels, show_type=False):
     """Handles table output.
        Both simple (without -o) and wide (-o wide)
 
+    Tables in the default "plain" format are streamed row by row (see
+    print_plain), other formats (env['OMG_TABLE_FMT']) go through tabulate.
+
     Args:
-        parsed_objects (dict):  Contains parsed dictionary of objects to get.
-                                This dict is the one we get from parse.py module.
+        resources (iterable):   (path index, r_type, resources) tuples as yielded by
+                                get_resources.iter_all_resources. Each path's table is
+                                printed as soon as its resources have been loaded.
 
         ns (str): Namespace is needed if we are showing output for all-namespaces.
 
@@ -19,6 +72,11 @@ def o_table(resd_from_paths, ns, output, show_labels):
                         is simple (-o not set) or wide (-o wide).
 
         show_labels (bool):     This is passed from click (--show-labels)
+
+        show_type (bool):       Prefix names with their type (more than one type requested)
+
+    Returns:
+        bool: True if any resource was printed
     """
     lg.debug("FUNC_INIT: {}".format(locals()))
 
@@ -27,21 +85,26 @@ def o_table(resd_from_paths, ns, output, show_labels):
 
     tablefmt = getenv("OMG_TABLE_FMT") or "plain"
 
-    show_type = False
-    if max([len(resd_from_paths[i]) for i in resd_from_paths]) > 1:
-        show_type = True
-
-    for i, path_resd in resd_from_paths.items():
-        table_all_res = None
-        for r_type in path_resd:
-            res = path_resd[r_type]
-            if res:
-                res_table = build_table(res, ns, output, show_type, show_labels)
-                if table_all_res:
-                    table_all_res += [[""]] + res_table
-                else:
-                    table_all_res = res_table
-        if table_all_res:
-            print(tabulate(table_all_res, tablefmt=tablefmt))
+    found = False
+    for i, path_items in groupby(resources, key=itemgetter(0)):
+        printed = False
+        for _, r_type, res in path_items:
+            if not res:
+                continue
+            header, head_f = table_columns(
+                dget(res[0], ["rdef"]), ns, output, show_type, show_labels
+            )
+            # Tables of different types are separated by an empty line
+            if printed:
+                print("")
+            rows = chain([header], iter_rows(res, head_f))
+            if tablefmt == "plain":
+                print_plain(rows)
+            else:
+                print(tabulate(list(rows), tablefmt=tablefmt))
+            printed = True
+        if printed:
+            found = True
             if (len(paths) > 1):
                 lg.opt(colors=True).success("^^^<e>[{}]</>^^^\n".format(i))
+    return found
@@ -45,3 +45,11 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["spec", "source", "type"],
+    ["spec", "strategy", "type"],
+    ["status", "duration"],
+    ["status", "phase"],
+    ["status", "startTimestamp"],
+]
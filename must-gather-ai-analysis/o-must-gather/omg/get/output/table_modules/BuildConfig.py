@@ -29,3 +29,9 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["spec", "source", "type"],
+    ["spec", "strategy", "type"],
+    ["status", "lastVersion"],
+]
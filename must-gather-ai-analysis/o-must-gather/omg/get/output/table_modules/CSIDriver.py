@@ -30,3 +30,9 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["spec", "attachRequired"],
+    ["spec", "podInfoOnMount"],
+    ["spec", "volumeLifecycleModes"],
+]
@@ -23,3 +23,7 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["spec", "drivers"],
+]
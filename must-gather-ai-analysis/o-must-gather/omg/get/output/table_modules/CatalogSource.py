@@ -30,3 +30,9 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["spec", "displayName"],
+    ["spec", "publisher"],
+    ["spec", "sourceType"],
+]
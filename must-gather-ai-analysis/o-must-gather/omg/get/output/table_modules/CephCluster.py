@@ -45,3 +45,12 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["spec", "dataDirHostPath"],
+    ["spec", "external", "enable"],
+    ["spec", "mon", "count"],
+    ["status", "ceph", "health"],
+    ["status", "message"],
+    ["status", "phase"],
+]
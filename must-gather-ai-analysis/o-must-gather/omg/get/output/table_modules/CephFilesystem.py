@@ -25,3 +25,8 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["spec", "metadataServer", "activeCount"],
+    ["status", "phase"],
+]
@@ -33,3 +33,9 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["spec", "signerName"],
+    ["spec", "username"],
+    ["status", "conditions"],
+]
@@ -34,3 +34,10 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["spec", "displayName"],
+    ["spec", "replaces"],
+    ["spec", "version"],
+    ["status", "phase"],
+]
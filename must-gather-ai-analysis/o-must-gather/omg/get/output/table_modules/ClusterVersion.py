@@ -66,3 +66,8 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["status", "conditions"],
+    ["status", "history"],
+]
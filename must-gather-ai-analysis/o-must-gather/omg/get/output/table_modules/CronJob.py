@@ -42,3 +42,10 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["spec", "schedule"],
+    ["spec", "suspend"],
+    ["status", "active"],
+    ["status", "lastScheduleTime"],
+]
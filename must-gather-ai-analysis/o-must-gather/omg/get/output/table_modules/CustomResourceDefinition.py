@@ -19,3 +19,7 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["metadata", "creationTimestamp"],
+]
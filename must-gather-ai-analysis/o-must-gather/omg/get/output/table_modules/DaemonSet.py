@@ -68,3 +68,13 @@ WIDE_COLUMNS = {
     "CONTAINERS": _col_containers,
     "IMAGES": _col_images,
 }
+
+FIELDS = [
+    ["spec", "template", "spec", "containers"],
+    ["spec", "template", "spec", "nodeSelector"],
+    ["status", "currentNumberScheduled"],
+    ["status", "desiredNumberScheduled"],
+    ["status", "numberAvailable"],
+    ["status", "numberReady"],
+    ["status", "updatedNumberScheduled"],
+]
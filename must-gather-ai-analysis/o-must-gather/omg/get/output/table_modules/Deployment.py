@@ -57,3 +57,12 @@ WIDE_COLUMNS = {
     "IMAGES": _col_images,
     "SELECTOR": _col_selector
 }
+
+FIELDS = [
+    ["spec", "replicas"],
+    ["spec", "selector", "matchLabels"],
+    ["spec", "template", "spec", "containers"],
+    ["status", "availableReplicas"],
+    ["status", "readyReplicas"],
+    ["status", "updatedReplicas"],
+]
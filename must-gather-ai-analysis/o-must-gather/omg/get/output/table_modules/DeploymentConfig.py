@@ -44,3 +44,10 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["spec", "replicas"],
+    ["spec", "triggers"],
+    ["status", "latestVersion"],
+    ["status", "readyReplicas"],
+]
@@ -69,3 +69,9 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["addressType"],
+    ["endpoints"],
+    ["ports"],
+]
@@ -49,3 +49,12 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["involvedObject", "kind"],
+    ["involvedObject", "name"],
+    ["lastTimestamp"],
+    ["message"],
+    ["reason"],
+    ["type"],
+]
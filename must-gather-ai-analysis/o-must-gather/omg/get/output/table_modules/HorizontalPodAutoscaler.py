@@ -46,3 +46,13 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["spec", "maxReplicas"],
+    ["spec", "minReplicas"],
+    ["spec", "scaleTargetRef", "kind"],
+    ["spec", "scaleTargetRef", "name"],
+    ["spec", "targetCPUUtilizationPercentage"],
+    ["status", "currentCPUUtilizationPercentage"],
+    ["status", "currentReplicas"],
+]
@@ -39,3 +39,11 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["egressCIDRs"],
+    ["egressIPs"],
+    ["host"],
+    ["hostIP"],
+    ["subnet"],
+]
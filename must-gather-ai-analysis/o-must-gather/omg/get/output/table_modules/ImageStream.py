@@ -74,3 +74,8 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["status", "publicDockerImageRepository"],
+    ["status", "tags"],
+]
@@ -31,3 +31,9 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["spec", "approval"],
+    ["spec", "approved"],
+    ["spec", "clusterServiceVersionNames"],
+]
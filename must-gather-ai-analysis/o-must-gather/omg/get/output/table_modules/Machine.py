@@ -35,3 +35,10 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["metadata", "labels", "machine.openshift.io/instance-type"],
+    ["metadata", "labels", "machine.openshift.io/region"],
+    ["metadata", "labels", "machine.openshift.io/zone"],
+    ["status", "phase"],
+]
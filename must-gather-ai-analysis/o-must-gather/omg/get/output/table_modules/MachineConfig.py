@@ -28,3 +28,8 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["metadata", "annotations", "machineconfiguration.openshift.io/generated-by-controller-version"],
+    ["spec", "config", "ignition", "version"],
+]
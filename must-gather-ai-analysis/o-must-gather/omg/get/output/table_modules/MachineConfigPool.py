@@ -70,3 +70,12 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["spec", "configuration", "name"],
+    ["status", "conditions"],
+    ["status", "degradedMachineCount"],
+    ["status", "machineCount"],
+    ["status", "readyMachineCount"],
+    ["status", "updatedMachineCount"],
+]
@@ -35,3 +35,10 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["spec", "replicas"],
+    ["status", "availableReplicas"],
+    ["status", "readyReplicas"],
+    ["status", "replicas"],
+]
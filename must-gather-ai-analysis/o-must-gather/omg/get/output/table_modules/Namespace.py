@@ -24,3 +24,8 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["metadata", "annotations", "openshift.io/display-name"],
+    ["status", "phase"],
+]
@@ -39,3 +39,8 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["spec", "podSelector", "matchExpressions"],
+    ["spec", "podSelector", "matchLabels"],
+]
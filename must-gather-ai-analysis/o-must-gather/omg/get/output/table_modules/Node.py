@@ -103,3 +103,14 @@ WIDE_COLUMNS = {
     "KERNEL-VERSION": _col_kerver,
     "CONTAINER-RUNTIME": _col_crt,
 }
+
+FIELDS = [
+    ["metadata", "labels"],
+    ["spec", "unschedulable"],
+    ["status", "addresses"],
+    ["status", "conditions"],
+    ["status", "nodeInfo", "containerRuntimeVersion"],
+    ["status", "nodeInfo", "kernelVersion"],
+    ["status", "nodeInfo", "kubeletVersion"],
+    ["status", "nodeInfo", "osImage"],
+]
@@ -65,3 +65,14 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["spec", "accessModes"],
+    ["spec", "capacity", "storage"],
+    ["spec", "claimRef", "name"],
+    ["spec", "claimRef", "namespace"],
+    ["spec", "persistentVolumeReclaimPolicy"],
+    ["spec", "storageClassName"],
+    ["status", "phase"],
+    ["status", "reason"],
+]
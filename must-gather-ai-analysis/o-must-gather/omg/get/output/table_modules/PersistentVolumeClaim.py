@@ -53,3 +53,12 @@ DEFAULT_COLUMNS = {
 WIDE_COLUMNS = {
     "VOLUMEMODE": _col_volumemode
 }
+
+FIELDS = [
+    ["spec", "accessModes"],
+    ["spec", "storageClassName"],
+    ["spec", "volumeMode"],
+    ["spec", "volumeName"],
+    ["status", "capacity", "storage"],
+    ["status", "phase"],
+]
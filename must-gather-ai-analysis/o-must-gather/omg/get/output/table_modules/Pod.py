@@ -53,3 +53,11 @@ WIDE_COLUMNS = {
     "IP": _col_ip,
     "NODE": _col_node
 }
+
+FIELDS = [
+    ["spec", "containers"],
+    ["spec", "nodeName"],
+    ["status", "containerStatuses"],
+    ["status", "phase"],
+    ["status", "podIP"],
+]
@@ -55,3 +55,11 @@ WIDE_COLUMNS = {
     "IMAGES": _col_images,
     "SELECTOR": _col_selector
 }
+
+FIELDS = [
+    ["spec", "selector", "matchLabels"],
+    ["spec", "template", "spec", "containers"],
+    ["status", "fullyLabeledReplicas"],
+    ["status", "readyReplicas"],
+    ["status", "replicas"],
+]
@@ -48,3 +48,13 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["spec", "host"],
+    ["spec", "path"],
+    ["spec", "port", "targetPort"],
+    ["spec", "tls", "insecureEdgeTerminationPolicy"],
+    ["spec", "tls", "termination"],
+    ["spec", "to", "name"],
+    ["spec", "wildcardPolicy"],
+]
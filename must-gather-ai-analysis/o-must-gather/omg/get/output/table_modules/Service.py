@@ -53,3 +53,12 @@ DEFAULT_COLUMNS = {
 WIDE_COLUMNS = {
     "SELECTOR": _col_selector
 }
+
+FIELDS = [
+    ["spec", "clusterIP"],
+    ["spec", "externalIP"],
+    ["spec", "externalName"],
+    ["spec", "ports"],
+    ["spec", "selector"],
+    ["spec", "type"],
+]
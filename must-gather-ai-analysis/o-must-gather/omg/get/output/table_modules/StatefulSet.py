@@ -47,3 +47,10 @@ WIDE_COLUMNS = {
     "IMAGES": _col_images,
     "SELECTOR": _col_selector
 }
+
+FIELDS = [
+    ["spec", "selector", "matchLabels"],
+    ["spec", "template", "spec", "containers"],
+    ["status", "readyReplicas"],
+    ["status", "replicas"],
+]
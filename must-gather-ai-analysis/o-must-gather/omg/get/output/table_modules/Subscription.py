@@ -29,3 +29,9 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["spec", "channel"],
+    ["spec", "name"],
+    ["spec", "source"],
+]
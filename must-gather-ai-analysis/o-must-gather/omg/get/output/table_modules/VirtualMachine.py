@@ -29,3 +29,8 @@ DEFAULT_COLUMNS = {
 # In addition to the default columns
 WIDE_COLUMNS = {
 }
+
+FIELDS = [
+    ["status", "conditions"],
+    ["status", "printableStatus"],
+]
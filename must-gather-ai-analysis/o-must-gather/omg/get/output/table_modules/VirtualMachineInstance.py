@@ -59,3 +59,10 @@ WIDE_COLUMNS = {
     "LIVE-MIGRATABLE": _col_live_migratable,
     "PAUSED" : _col_paused
 }
+
+FIELDS = [
+    ["status", "conditions"],
+    ["status", "interfaces"],
+    ["status", "nodeName"],
+    ["status", "phase"],
+]
@@ -1,10 +1,61 @@
 import os
+import re
+from collections import deque
 from loguru import logger as lg
 from omg.config import config
 from omg.utils.dget import dget
+from omg.log import timeline, stream
 
 
-def cmd(resource, container, previous):
+def _all_pod_logs(path, ns, container, previous):
+    """Return (log file, label) for every container log in a namespace ("_all" for all)"""
+    log_name = "previous.log" if previous else "current.log"
+    ns_root = os.path.join(path, "namespaces")
+    if not os.path.isdir(ns_root):
+        return []
+    namespaces = sorted(os.listdir(ns_root)) if ns == "_all" else [ns]
+
+    logs = []
+    for namespace in namespaces:
+        pods_dir = os.path.join(ns_root, namespace, "pods")
+        if not os.path.isdir(pods_dir):
+            continue
+        for pod in sorted(os.listdir(pods_dir)):
+            pod_dir = os.path.join(pods_dir, pod)
+            if not os.path.isdir(pod_dir):
+                continue
+            for con_dir in sorted(os.listdir(pod_dir)):
+                if container and container != con_dir:
+                    continue
+                log_file = os.path.join(pod_dir, con_dir, con_dir, "logs", log_name)
+                if os.path.isfile(log_file):
+                    label = "{}/{}".format(pod, con_dir)
+                    if ns == "_all":
+                        label = "{}/{}".format(namespace, label)
+                    logs.append((log_file, label))
+    return logs
+
+
+def _print_window(path, logs, since, until, labels, tail=None, grep=None):
+    """Print the lines of logs within since/until, merged in time order"""
+    try:
+        lines = timeline.window(path, logs, since, until)
+        if grep:
+            pattern = re.compile(grep)
+            lines = (item for item in lines if pattern.search(item[2]))
+        if tail is not None:
+            lines = deque(lines, maxlen=max(tail, 0))
+        for _, label, line in lines:
+            if labels:
+                print("[{}] {}".format(label, line))
+            else:
+                print(line)
+    except (ValueError, re.error) as e:
+        lg.error(e)
+        raise SystemExit(1)
+
+
+def cmd(resource, container, previous, since=None, until=None, all_pods=False, tail=None, grep=None):
     lg.debug("FUNC_INIT: {}".format(locals()))
 
     cfg = config.get()
@@ -15,6 +66,25 @@ def cmd(resource, container, previous):
         lg.error("No must-gather selected")
         raise SystemExit(1)
 
+    if all_pods:
+        if ns is None:
+            lg.error("No namespace/project selected")
+            raise SystemExit(1)
+        found = False
+        for path in paths:
+            logs = _all_pod_logs(path, ns, container, previous)
+            if logs:
+                found = True
+                lg.info("Merging {} logs from {}".format(len(logs), path))
+                _print_window(path, logs, since, until, labels=True, tail=tail, grep=grep)
+        if not found:
+            lg.error("No log files found")
+        return
+
+    if not resource:
+        lg.error("Specify a pod, or use --all-pods")
+        raise SystemExit(1)
+
     if ns == "_all":
         lg.error("All Namespaces is not supported with `omg log ...` ")
         raise SystemExit(1)
@@ -93,8 +163,11 @@ def cmd(resource, container, previous):
             lg.warning("Log file not found: {}".format(logfile))
         else:
             lg.info(logfile)
-            with open(logfile, "r") as lf:
-                print(lf.read())
+            try:
+                stream.stream_log(logfile, since, until, tail, grep)
+            except (ValueError, re.error) as e:
+                lg.error(e)
+                raise SystemExit(1)
         if len(log_files) > 1:
             print("")
             print("~~~")
@@ -0,0 +1,202 @@
+""" stream.py """
+
+import re
+import sys
+import mmap
+from collections import deque
+from loguru import logger as lg
+from omg.log.timeline import line_timestamp, normalize_bound
+
+# Bytes written to the output at a time
+CHUNK_SIZE = 1024 * 1024
+
+
+def _first_stamped(mm, pos, end):
+    """First timestamped line starting at or after pos
+
+    Args:
+        mm (mmap): Log contents
+        pos (int): Offset to search from
+        end (int): Offset to stop at
+
+    Returns:
+        tuple: (timestamp, line offset) or (None, end) if there is none
+    """
+    if pos > 0 and mm[pos - 1] != 0x0A:
+        pos = mm.find(b"\n", pos, end)
+        if pos == -1:
+            return None, end
+        pos += 1
+    while pos < end:
+        line_end = mm.find(b"\n", pos, end)
+        line_end = end if line_end == -1 else line_end + 1
+        ts = line_timestamp(mm[pos:min(line_end, pos + 64)])
+        if ts:
+            return ts, pos
+        pos = line_end
+    return None, end
+
+
+def _bisect(mm, start, end, past):
+    """Offset of the first timestamped line for which past(timestamp) is true
+
+    Container logs are written in time order, so the lines for which past()
+    is true are all after the ones for which it is false. Lines without a
+    timestamp belong to the line before them.
+
+    Args:
+        mm (mmap): Log contents
+        start (int): Offset of the region to search (a line start)
+        end (int): End offset of the region to search
+        past (callable): Predicate on a timestamp key
+
+    Returns:
+        int: Line offset, or end if there is no such line
+    """
+    lo, hi = start, end
+    while lo < hi:
+        mid = (lo + hi) // 2
+        ts, _ = _first_stamped(mm, mid, end)
+        if ts is None or past(ts):
+            hi = mid
+        else:
+            lo = mid + 1
+    return _first_stamped(mm, lo, end)[1]
+
+
+def _last_timestamp(mm):
+    """Timestamp of the last timestamped line, reading backwards from EOF"""
+    end = len(mm)
+    while end > 0:
+        start = mm.rfind(b"\n", 0, end - 1) + 1
+        ts = line_timestamp(mm[start:start + 64])
+        if ts:
+            return ts
+        end = start
+    return None
+
+
+def time_region(mm, since=None, until=None):
+    """Byte region of the log lines within since/until
+
+    Args:
+        mm (mmap): Log contents
+        since (str, optional): Window start, datetime or time of day
+        until (str, optional): Window end, datetime or time of day.
+                               A time of day is taken on the date of the last log line.
+
+    Returns:
+        tuple: (start, end) offsets
+    """
+    start, end = 0, len(mm)
+    if not since and not until:
+        return start, end
+
+    default_date = None
+    if (since and "T" not in since) or (until and "T" not in until):
+        last = _last_timestamp(mm)
+        default_date = last[:10] if last else None
+
+    if since:
+        since_key = normalize_bound(since, default_date)
+        start = _bisect(mm, start, end, lambda ts: ts >= since_key)
+    if until:
+        until_key = normalize_bound(until, default_date)
+        end = _bisect(mm, start, end, lambda ts: ts > until_key)
+    return start, end
+
+
+def tail_offset(mm, start, end, lines):
+    """Offset of the last `lines` lines of a region, seeking backwards from its end"""
+    if lines <= 0:
+        return end
+    pos = end
+    if pos > start and mm[pos - 1] == 0x0A:
+        pos -= 1
+    for _ in range(lines):
+        pos = mm.rfind(b"\n", start, pos)
+        if pos == -1:
+            return start
+    return pos + 1
+
+
+def grep_lines(mm, start, end, pattern):
+    """Yield the lines of a region in which the compiled bytes pattern matches
+
+    The pattern (compiled with re.MULTILINE) is searched over the whole region
+    at once, lines are only cut out around the matches.
+    """
+    pos = start
+    while pos < end:
+        match = pattern.search(mm, pos, end)
+        if not match:
+            return
+        line_start = mm.rfind(b"\n", start, match.start()) + 1 or start
+        newline = mm.find(b"\n", match.start(), end)
+        line_end = end if newline == -1 else newline + 1
+        # A match running over a line end does not count, look at the line alone
+        if line_end < match.end() and not pattern.search(mm, line_start, newline):
+            pos = line_end
+            continue
+        yield mm[line_start:line_end]
+        pos = line_end
+
+
+def _chunks(mm, start, end):
+    for pos in range(start, end, CHUNK_SIZE):
+        yield mm[pos:min(pos + CHUNK_SIZE, end)]
+
+
+def stream_log(log_file, since=None, until=None, tail=None, grep=None, out=None):
+    """Write (part of) a log to out without reading it into memory
+
+    The log is memory mapped; since/until are found by binary search,
+    --tail by seeking backwards from the end of the window and --grep by
+    searching the window with a compiled regex.
+
+    Args:
+        log_file (str): Log file path
+        since (str, optional): Only lines at or after this time
+        until (str, optional): Only lines at or before this time
+        tail (int, optional): Only the last `tail` lines (of the matching lines with grep)
+        grep (str, optional): Only lines matching this regular expression
+        out (file, optional): Binary file to write to. Defaults to stdout.
+
+    Returns:
+        bool: True if anything was written
+    """
+    lg.debug("FUNC_INIT: {}".format(locals()))
+
+    if out is None:
+        sys.stdout.flush()
+        out = sys.stdout.buffer
+
+    pattern = re.compile(grep.encode("utf-8"), re.MULTILINE) if grep else None
+
+    with open(log_file, "rb") as lf:
+        try:
+            mm = mmap.mmap(lf.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file
+            return False
+        with mm:
+            start, end = time_region(mm, since, until)
+
+            if pattern and tail is not None:
+                parts = deque(grep_lines(mm, start, end, pattern), maxlen=max(tail, 0))
+            elif pattern:
+                parts = grep_lines(mm, start, end, pattern)
+            else:
+                if tail is not None:
+                    start = tail_offset(mm, start, end, tail)
+                parts = _chunks(mm, start, end)
+
+            last = b""
+            for part in parts:
+                out.write(part)
+                last = part
+            # Output always ends at a line end
+            if last and not last.endswith(b"\n"):
+                out.write(b"\n")
+            out.flush()
+            return bool(last)
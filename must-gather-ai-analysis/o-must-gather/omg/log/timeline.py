@@ -0,0 +1,262 @@
+""" timeline.py """
+
+import os
+import re
+import json
+import heapq
+import pickle
+import hashlib
+import tempfile
+from os import getenv
+from loguru import logger as lg
+
+# Where sparse timestamp indexes are cached, one file per must-gather path
+_timeline_dir = os.path.join(getenv("HOME") or "", ".omg.timeline")
+
+# Bytes between two offset marks of a log
+MARK_INTERVAL = 256 * 1024
+
+# Most logs a window merge reads at once; beyond this, batches are merged through temporary files
+MAX_OPEN_LOGS = 256
+
+# Bumped whenever the cached index layout changes
+_INDEX_VERSION = 1
+
+# RFC 3339 prefix written by the kubelet in front of every container log line
+_TIMESTAMP = re.compile(rb"^(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(?:\.(\d+))?")
+
+
+def line_timestamp(line):
+    """Sortable timestamp key of a log line
+
+    Args:
+        line (bytes): Raw log line
+
+    Returns:
+        str: 'YYYY-MM-DDTHH:MM:SS.fffffffff' or None if the line has no timestamp
+    """
+    match = _TIMESTAMP.match(line)
+    if not match:
+        return None
+    fraction = (match.group(2) or b"")[:9].ljust(9, b"0")
+    return (match.group(1) + b"." + fraction).decode("ascii")
+
+
+def normalize_bound(value, default_date=None):
+    """Turn an ISO datetime or a time of day (10:42, 10:42:30) into a timestamp key
+
+    Args:
+        value (str): Datetime or time of day
+        default_date (str, optional): 'YYYY-MM-DD' used for a bare time of day
+
+    Returns:
+        str: Sortable timestamp key
+    """
+    value = value.strip().rstrip("Z").replace(" ", "T")
+    if "T" not in value:
+        if not default_date:
+            raise ValueError("A date is needed to interpret time: {}".format(value))
+        value = "{}T{}".format(default_date, value)
+    date_part, _, time_part = value.partition("T")
+    time_part = re.split(r"[+-]", time_part)[0]
+    clock, _, fraction = time_part.partition(".")
+    parts = clock.split(":")
+    clock = ":".join(part.zfill(2) for part in (parts + ["00", "00"])[:3])
+    key = "{}T{}.{}".format(date_part, clock, fraction[:9].ljust(9, "0"))
+    if not re.match(r"^\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{9}$", key):
+        raise ValueError("Unrecognized time: {}".format(value))
+    return key
+
+
+def build_marks(log_file):
+    """Read a log once and collect its sparse (timestamp, offset) marks
+
+    Args:
+        log_file (str): Log file path
+
+    Returns:
+        dict: marks, first and last timestamp of the log
+    """
+    marks = []
+    first_ts = last_ts = None
+    next_mark = 0
+    offset = 0
+    with open(log_file, "rb") as lf:
+        for line in lf:
+            if offset >= next_mark or first_ts is None:
+                ts = line_timestamp(line)
+                if ts:
+                    if first_ts is None:
+                        first_ts = ts
+                    marks.append([ts, offset])
+                    next_mark = offset + MARK_INTERVAL
+            offset += len(line)
+        lf.seek(max(0, offset - 64 * 1024))
+        for line in lf.read().splitlines():
+            last_ts = line_timestamp(line) or last_ts
+    return {"marks": marks, "first": first_ts, "last": last_ts or first_ts}
+
+
+def _index_file(mg_path):
+    digest = hashlib.sha1(os.path.abspath(mg_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(_timeline_dir, digest + ".json")
+
+
+def load_index(mg_path, log_files):
+    """Sparse timestamp index for the given logs of a must-gather
+
+    Logs are only read when they are new or changed since the cached index was built.
+
+    Args:
+        mg_path (str): Must-gather path
+        log_files (list[str]): Log files (paths under mg_path)
+
+    Returns:
+        dict: log file path -> {marks, first, last}
+    """
+    lg.debug("FUNC_INIT: {}".format(locals()))
+    index_file = _index_file(mg_path)
+    cached = {}
+    if os.path.isfile(index_file):
+        try:
+            with open(index_file, "r") as i_f:
+                data = json.load(i_f)
+            if data.get("version") == _INDEX_VERSION:
+                cached = data.get("logs", {})
+        except Exception as e:
+            lg.debug("Ignoring unreadable timeline index {}: {}".format(index_file, e))
+
+    index = {}
+    dirty = False
+    for log_file in log_files:
+        stat = os.stat(log_file)
+        key = [stat.st_mtime_ns, stat.st_size]
+        entry = cached.get(log_file)
+        if not entry or entry.get("key") != key:
+            lg.debug("Indexing log: {}".format(log_file))
+            entry = dict(build_marks(log_file), key=key)
+            dirty = True
+        index[log_file] = entry
+
+    if dirty:
+        cached.update(index)
+        try:
+            os.makedirs(_timeline_dir, exist_ok=True)
+            tmp_file = index_file + ".tmp"
+            with open(tmp_file, "w") as i_f:
+                json.dump({"version": _INDEX_VERSION, "logs": cached}, i_f)
+            os.replace(tmp_file, index_file)
+        except OSError as e:
+            lg.warning("Could not save timeline index: {}".format(e))
+    return index
+
+
+def read_window(log_file, label, offset, since, until):
+    """Yield (timestamp, label, line) for the lines of a log inside the window
+
+    Args:
+        log_file (str): Log file path
+        label: Passed through with every line
+        offset (int): Byte offset to start reading at (a mark at or before `since`)
+        since (str): Window start timestamp key, or None
+        until (str): Window end timestamp key, or None
+
+    Returns:
+        generator: (timestamp, label, line) tuples; the log is opened on the first item
+    """
+    current_ts = None
+    with open(log_file, "rb") as lf:
+        lf.seek(offset)
+        for raw_line in lf:
+            # Lines without a timestamp belong to the previous line
+            current_ts = line_timestamp(raw_line) or current_ts
+            if current_ts is None or (since and current_ts < since):
+                continue
+            if until and current_ts > until:
+                break
+            yield current_ts, label, raw_line.decode("utf-8", errors="replace").rstrip("\n")
+
+
+def window(mg_path, logs, since=None, until=None):
+    """Merge the lines of several logs within a time window in timestamp order
+
+    Each log is seeked to its last mark before `since` and read only until `until`.
+
+    Args:
+        mg_path (str): Must-gather path
+        logs (list[tuple]): (log file, label) pairs
+        since (str, optional): Window start, datetime or time of day
+        until (str, optional): Window end, datetime or time of day
+
+    Returns:
+        generator: (timestamp, label, line) tuples
+    """
+    lg.debug("FUNC_INIT: {}".format(locals()))
+    index = load_index(mg_path, [log_file for log_file, _ in logs])
+
+    default_date = None
+    if (since and "T" not in since) or (until and "T" not in until):
+        last = max((entry["last"] for entry in index.values() if entry["last"]), default=None)
+        default_date = last[:10] if last else None
+    since_key = normalize_bound(since, default_date) if since else None
+    until_key = normalize_bound(until, default_date) if until else None
+
+    streams = []
+    for log_file, label in logs:
+        entry = index[log_file]
+        if since_key and entry["last"] and entry["last"] < since_key:
+            continue
+        if until_key and entry["first"] and entry["first"] > until_key:
+            continue
+        offset = 0
+        if since_key:
+            for ts, mark_offset in entry["marks"]:
+                if ts > since_key:
+                    break
+                offset = mark_offset
+        streams.append(read_window(log_file, label, offset, since_key, until_key))
+
+    return merge_streams(streams)
+
+
+def _spill(items):
+    """Write a merged batch to a temporary file and stream it back"""
+    spill = tempfile.TemporaryFile()
+    for item in items:
+        pickle.dump(item, spill, protocol=pickle.HIGHEST_PROTOCOL)
+    spill.seek(0)
+
+    def unspill():
+        with spill:
+            while True:
+                try:
+                    yield pickle.load(spill)
+                except EOFError:
+                    return
+
+    return unspill()
+
+
+def merge_streams(streams, max_open=None):
+    """Merge (timestamp, ...) streams in timestamp order, reading at most max_open at once
+
+    Every stream holds an open log while it is merged, so thousands of logs
+    (--all-pods -A) would exhaust file descriptors. Above max_open, batches are
+    merged into temporary files first, which are then merged in turn.
+
+    Args:
+        streams (list[generator]): Streams, each in timestamp order
+        max_open (int, optional): Defaults to MAX_OPEN_LOGS
+
+    Returns:
+        generator: Items of all streams in timestamp order
+    """
+    max_open = max(2, max_open or MAX_OPEN_LOGS)
+    streams = list(streams)
+    while len(streams) > max_open:
+        lg.debug("Merging {} logs in batches of {}".format(len(streams), max_open))
+        streams = [
+            _spill(heapq.merge(*streams[start:start + max_open], key=lambda item: item[0]))
+            for start in range(0, len(streams), max_open)
+        ]
+    return heapq.merge(*streams, key=lambda item: item[0])
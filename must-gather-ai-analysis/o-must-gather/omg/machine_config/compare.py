@@ -1,173 +1,242 @@
 import difflib
+from functools import lru_cache
 from loguru import logger as lg
 
+from omg.utils.dget import dget
 from omg.get.get_resources import get_all_resources
 from omg.machine_config.decode_content import decode
 
+# The base config's contents are decoded once, not once per compared config
+_decode = lru_cache(maxsize=256)(decode)
+
+
+def _index_mcs():
+    """Load all MachineConfigs once and index them by name
+
+    Returns:
+        dict: name -> list of MachineConfigs with that name (one per path)
+    """
+    index = {}
+    all_mcs = get_all_resources({"mc": []})
+    for i, mc_res in all_mcs.items():
+        for _, mc_data_l in mc_res.items():
+            for mc_data in mc_data_l or []:
+                name = dget(mc_data, ["res", "metadata", "name"])
+                index.setdefault(name, []).append(mc_data["res"])
+    return index
+
+
+def _select_mc(index, mc_name):
+    matched_mcs = index.get(mc_name, [])
+    if not matched_mcs:
+        raise Exception("MachineConfig {} not found".format(mc_name))
+    elif len(matched_mcs) > 1:
+        raise Exception(
+            "More than one MachineConfig matched for {}\n"
+            "Use --path/-P to select a single must-gather path"
+            .format(mc_name)
+        )
+    return matched_mcs[0]
+
+
+def _content(d):
+    d = str(d)
+    if d.startswith("data:"):
+        return _decode(d)
+    return d
+
+
+def _show_diff(d1, d2, labels, indent=1):
+    """Show diff of the contents when --show-contents is set
+
+    We either get both strings in d1 and d2 ([*CHANGE]), or
+    we get on empty string on one and a dict on other ([+ADDED], [-REMOVED])
+    """
+    if type(d1) in [str, int, bool] and type(d2) in [str, int, bool]:
+        data1 = _content(d1)
+        data2 = _content(d2)
+        # Add new line at the end if missing
+        if data1[-1:] != "\n" or data2[-1:] != "\n":
+            if data1 != "":
+                data1 += "\n"
+            if data2 != "":
+                data2 += "\n"
+        diff = difflib.unified_diff(
+            data1.splitlines(), data2.splitlines(),
+            fromfile=labels[0], tofile=labels[1], lineterm=""
+        )
+        for x in diff:
+            print("    " * indent + x)
+        print("")
+    elif type(d1) is dict and d2 == "":
+        if len(d1) == 0:
+            _show_diff("{}", "", labels, indent)
+        for key in d1:
+            print("    " * indent + "-> " + key)
+            _show_diff(d1[key], "", labels, indent + 1)
+    elif type(d2) is dict and d1 == "":
+        if len(d2) == 0:
+            _show_diff("", "{}", labels, indent)
+        else:
+            for key in d2:
+                print("    " * indent + "-> " + key)
+                _show_diff("", d2[key], labels, indent + 1)
+
+
+def _lod_key(item):
+    """Key used to match the dicts of two lists (e.g: files by path)"""
+    if type(item) is dict:
+        for lod_key in ["kind", "name", "path"]:
+            if lod_key in item:
+                return lod_key
+    return None
+
+
+def _list_index(items, lod_key):
+    """Index the dicts of a list by their lod_key value, in list order"""
+    index = {}
+    for x in items:
+        if type(x) is dict and lod_key in x:
+            index.setdefault(x[lod_key], []).append(x)
+    return index
+
+
+def _members(items):
+    """Fast membership checks for lists of hashable values"""
+    try:
+        return set(items)
+    except TypeError:
+        return items
+
+
+def mc_diff(d1, d2, labels, show_contents=False, path=None):
+    """Walk through two machine-configs and print the differences between them
+
+    Args:
+        d1: Value in the first (base) machine-config
+        d2: Value in the second machine-config
+        labels (tuple): Names of the two machine-configs
+        show_contents (bool): Show the diff of changed contents
+        path (list): Keys leading to d1/d2
+    """
+    if path is None:
+        path = []
+
+    def show_diff(v1, v2):
+        if show_contents:
+            _show_diff(v1, v2, labels)
+
+    # The two values are equal, nothing to do
+    if d1 == d2:
+        return
+    # One of the two values is None
+    elif d1 is None:
+        print("[+ADDED]", " -> ".join(path), "\n")
+        show_diff("", d2)
+    elif d2 is None:
+        print("[-REMOVED]", " -> ".join(path), "\n")
+        show_diff(d1, "")
+    # The two values are string/int/bool which are not equal
+    elif (
+        (type(d1) is str and type(d2) is str)
+        or (type(d1) is int and type(d2) is int)
+        or (type(d1) is bool and type(d2) is bool)
+    ):
+        print("[*CHANGE]", " -> ".join(path), "\n")
+        show_diff(str(d1), str(d2))
+    # The two values are dict which are not equal
+    elif type(d1) is dict and type(d2) is dict:
+        for k in set(list(d1.keys()) + list(d2.keys())):
+            path.append(k)
+            if k not in d2:
+                mc_diff(d1[k], None, labels, show_contents, path)
+            elif k not in d1:
+                mc_diff(None, d2[k], labels, show_contents, path)
+            else:
+                mc_diff(d1[k], d2[k], labels, show_contents, path)
+            path.pop()
+    # The two values are lists which are not equal
+    # We need to compare the two lists with some extended logic
+    elif type(d1) is list and type(d2) is list:
+        # The two lists contain different types of data
+        ltypes = set([type(x) for x in d1 + d2])
+        if len(ltypes) != 1:
+            print("[WARNING] skipping inconsistent list: ", path)
+            print("          Found mix types in list: ", ltypes)
+            return
+
+        # Entries of the two lists by kind/name/path, indexed on first use
+        indexes = {}
+        members1 = members2 = None
+        done_lod_keys = set()
+        # Traverse on both the list items
+        for l in d1 + d2: # noqa
+            lod_key = _lod_key(l)
+            # If "list of dict" with kind/name/path keys,
+            # we compare based on kind/name/path keys in the dicts
+            if lod_key:
+                if lod_key not in indexes:
+                    indexes[lod_key] = (_list_index(d1, lod_key), _list_index(d2, lod_key))
+                path.append(l[lod_key])
+                ld1 = indexes[lod_key][0].get(l[lod_key], [])
+                ld2 = indexes[lod_key][1].get(l[lod_key], [])
+                if len(ld1) > 1 and l[lod_key] not in done_lod_keys:
+                    print(
+                        "    [WARNING] Duplicate (%i) entries found in "
+                        "1st MachineConfig for %s:%s"
+                        % (len(ld1), lod_key, l[lod_key])
+                    )
+                if len(ld2) > 1 and l[lod_key] not in done_lod_keys:
+                    print(
+                        "    [WARNING] Duplicate (%i) entries found in "
+                        "2nd MachineConfig for %s:%s"
+                        % (len(ld2), lod_key, l[lod_key])
+                    )
+
+                if len(ld1) == 0:
+                    mc_diff(None, ld2[-1], labels, show_contents, path)
+                elif len(ld2) == 0:
+                    mc_diff(ld1[-1], None, labels, show_contents, path)
+                elif l[lod_key] not in done_lod_keys:
+                    mc_diff(ld1[-1], ld2[-1], labels, show_contents, path)
+                    done_lod_keys.add(l[lod_key])
+                path.pop()
+            else:
+                if members1 is None:
+                    members1, members2 = _members(d1), _members(d2)
+                if l not in members2:
+                    mc_diff(l, None, labels, show_contents, path)
+                if l not in members1:
+                    mc_diff(None, l, labels, show_contents, path)
+    else:
+        print("[WARNING] Unhandled condition at", path)
+
 
 def mc_compare(m, show_contents):
-    # NOTE TO SELF: Recursion has gone out of hand,
-    # probably re-impelement the comparison logic without
-    # using recursion
+    """Compare machine-configs against the first one
+
+    All MachineConfigs are loaded once. With more than two names, every
+    machine-config is compared with the first (base) one in turn.
+
+    Args:
+        m (tuple[str]): MachineConfig names, base first
+        show_contents (bool): Show the diff of changed contents
+    """
+    lg.debug("FUNC_INIT: {}".format(locals()))
 
-    if len(m) != 2:
-        lg.error("Provide two machine-configs to compare")
+    if len(m) < 2:
+        lg.error("Provide two or more machine-configs to compare")
         raise SystemExit(1)
 
     try:
-        two_mcs = []
-        for mc_name in m:
-            all_mcs = get_all_resources({"mc": [mc_name]})
-            matched_mcs = []
-            for i, mc_res in all_mcs.items():
-                for _, mc_data_l in mc_res.items():
-                    if mc_data_l:
-                        for mc_data in mc_data_l:
-                            matched_mcs.append(mc_data["res"])
-            if not matched_mcs:
-                raise Exception("MachineConfig {} not found".format(mc_name))
-            elif len(matched_mcs) > 1:
-                raise Exception(
-                    "More than one MachineConfig matched for {}\n"
-                    "Use --path/-P to select a single must-gather path"
-                    .format(mc_name)
-                )
-            else:
-                two_mcs.append(matched_mcs[0])
-        mc1 = two_mcs[0]
-        mc2 = two_mcs[1]
+        index = _index_mcs()
+        mcs = [_select_mc(index, mc_name) for mc_name in m]
     except Exception as e:
         lg.error(e)
         raise SystemExit(1)
 
-    # Recursive function to show diff when --show-contents is set
-    # We either get both strings in d1 and d2 ([*CHANGE]), or
-    # we get on empty string on one and a dict on other ([+ADDED], [-REMOVED])
-    def show_diff(d1, d2, indent=1, show_contents=show_contents):
-        # print(type(d1))
-        # print(type(d2))
-        if show_contents:
-            if type(d1) in [str, int, bool] and type(d2) in [str, int, bool]:
-                if str(d1).startswith("data:"):
-                    data1 = decode(str(d1))
-                else:
-                    data1 = str(d1)
-                if str(d2).startswith("data:"):
-                    data2 = decode(str(d2))
-                else:
-                    data2 = str(d2)
-                # Add new line at the end if missing
-                if data1[-1:] != "\n" or data2[-1:] != "\n":
-                    if data1 != "":
-                        data1 += "\n"
-                    if data2 != "":
-                        data2 += "\n"
-                diff = "".join(
-                    difflib.ndiff(
-                        data1.splitlines(keepends=True), data2.splitlines(keepends=True)
-                    )
-                )
-                for x in diff.splitlines():
-                    print("    " * indent + x)
-                print("")
-            elif type(d1) is dict and d2 == "":
-                if len(d1) == 0:
-                    show_diff("{}", "", indent)
-                for key in d1:
-                    print("    " * indent + "-> " + key)
-                    show_diff(d1[key], "", indent + 1)
-            elif type(d2) is dict and d1 == "":
-                if len(d2) == 0:
-                    show_diff("", "{}", indent)
-                else:
-                    for key in d2:
-                        print("    " * indent + "-> " + key)
-                        show_diff("", d2[key], indent + 1)
-
-    # Recursive function to walk through two machine-configs,
-    # and find differences between them
-    def mc_diff(d1, d2, path=[]):
-        # The two values are equal, nothing to do
-        if d1 == d2:
-            return
-        # One of the two values is None
-        elif d1 is None:
-            print("[+ADDED]", " -> ".join(path), "\n")
-            show_diff("", d2)
-        elif d2 is None:
-            print("[-REMOVED]", " -> ".join(path), "\n")
-            show_diff(d1, "")
-        # The two values are string/int/bool which are not equal
-        elif (
-            (type(d1) is str and type(d2) is str)
-            or (type(d1) is int and type(d2) is int)
-            or (type(d1) is bool and type(d2) is bool)
-        ):
-            print("[*CHANGE]", " -> ".join(path), "\n")
-            show_diff(str(d1), str(d2))
-        # The two values are dict which are not equal
-        elif type(d1) is dict and type(d2) is dict:
-            for k in set(list(d1.keys()) + list(d2.keys())):
-                path.append(k)
-                if k not in d2:
-                    mc_diff(d1[k], None, path)
-                elif k not in d1:
-                    mc_diff(None, d2[k])
-                else:
-                    mc_diff(d1[k], d2[k], path)
-                path.pop()
-        # The two values are lists which are not equal
-        # We need to compare the two lists with some extended logic
-        elif type(d1) is list and type(d2) is list:
-            # The two lists contain different types of data
-            ltypes = set([type(x) for x in d1 + d2])
-            if len(ltypes) != 1:
-                print("[WARNING] skipping inconsistent list: ", path)
-                print("          Found mix types in list: ", ltypes)
-                return
-
-            done_lod_keys = []
-            # Traverse on both the list items
-            for l in d1 + d2: # noqa
-                # If "list of dict" with kind/name/path keys,
-                # we compare based on kind/name/path keys in the dicts
-                if type(l) is dict and ("name" in l or "path" in l or "kind" in l):
-                    if "kind" in l:
-                        lod_key = "kind"
-                    elif "name" in l:
-                        lod_key = "name"
-                    elif "path" in l:
-                        lod_key = "path"
-                    path.append(l[lod_key])
-                    ld1 = [x for x in d1 if x[lod_key] == l[lod_key]]
-                    ld2 = [x for x in d2 if x[lod_key] == l[lod_key]]
-                    if len(ld1) > 1 and l[lod_key] not in done_lod_keys:
-                        print(
-                            "    [WARNING] Duplicate (%i) entries found in "
-                            "1st MachineConfig for %s:%s"
-                            % (len(ld1), lod_key, l[lod_key])
-                        )
-                    if len(ld2) > 1 and l[lod_key] not in done_lod_keys:
-                        print(
-                            "    [WARNING] Duplicate (%i) entries found in "
-                            "2nd MachineConfig for %s:%s"
-                            % (len(ld2), lod_key, l[lod_key])
-                        )
-
-                    if len(ld1) == 0:
-                        mc_diff(None, ld2[-1], path)
-                    elif len(ld2) == 0:
-                        mc_diff(ld1[-1], None, path)
-                    elif l[lod_key] not in done_lod_keys:
-                        mc_diff(ld1[-1], ld2[-1], path)
-                        done_lod_keys.append(l[lod_key])
-                    path.pop()
-                else:
-                    if l not in d2:
-                        mc_diff(l, None, path)
-                    if l not in d1:
-                        mc_diff(None, l, path)
-        else:
-            print("[WARNING] Unhandled condition at", path)
-
-    mc_diff(mc1, mc2)
+    base = mcs[0]
+    for mc_name, mc in zip(m[1:], mcs[1:]):
+        if len(m) > 2:
+            print("=== {} vs {} ===\n".format(m[0], mc_name))
+        mc_diff(base, mc, (m[0], mc_name), show_contents)
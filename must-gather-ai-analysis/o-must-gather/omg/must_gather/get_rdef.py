@@ -23,7 +23,9 @@ An rdef dict consists of the following keys:
     group:      API Group of the resource.
 
 get_rdef() function finds, matches and returns the matching dict for
-a specific resource type, searching built-in rdefs first.
+a specific resource type, searching built-in rdefs first. Lookups go
+through a name index that is built once per process and rebuilt only
+when the generated rdefs file changes.
 
 """
 
@@ -35,53 +37,96 @@ from omg.utils.load_yaml import load_yaml
 from omg.utils.dget import dget
 
 
-def _match_rdef(r_type, rdef):
-    if isinstance(r_type, str) and isinstance(rdef, dict):
-        # kind = dget(rdef, ["kind"])
+# Cached generated rdefs and the name index over all rdefs, keyed by the
+# (mtime, size) of the generated rdefs file so it is only re-read when it changes
+_cache = {"key": None, "generated": [], "index": None}
+
+
+def _rdefs_file():
+    return os.path.join(os.getenv("HOME") or "/tmp/", ".omg.rdefs")
+
+
+def _file_key(rdefs_f):
+    try:
+        stat = os.stat(rdefs_f)
+    except OSError:
+        return None
+    return (rdefs_f, stat.st_mtime_ns, stat.st_size)
+
+
+def _build_index(rdefs):
+    """Build lookup tables for a list of rdefs
+
+    Args:
+        rdefs (list[dict]): rdefs in lookup priority order
+
+    Returns:
+        tuple: (names, kinds) where names maps singular, plural, shortNames,
+               plural.group and singular.group to the first matching rdef, and
+               kinds maps singular/plural to all rdefs with that name (for
+               lookups with a partial group like "route.route")
+    """
+    names = {}
+    kinds = {}
+    for rdef in rdefs:
+        if not isinstance(rdef, dict):
+            continue
         singular = dget(rdef, ["singular"])
         plural = dget(rdef, ["plural"])
         group = dget(rdef, ["group"])
-        shortNames = dget(rdef, ["shortNames"])
-
-        if "." in r_type:
-            r_type_kind = r_type.split(".")[0]
-            r_type_group_list = r_type.split(".")[1:]
-            r_def_group_list = group.split(".")
-            if r_type_kind.lower() in [str(singular), str(plural)]:
-                for rtgl in r_type_group_list:
-                    if rtgl != r_def_group_list[r_type_group_list.index(rtgl)]:
-                        return False
-                return True
-        else:
-            if (
-                r_type == singular or
-                r_type == plural or
-                (shortNames and r_type in shortNames)
-            ):
-                return True
-    return False
-
-
-def _find_rdef(r_type, rdefs):
-    if rdefs:
-        for rdef in rdefs:
-            if _match_rdef(r_type, rdef):
-                return rdef
+        shortNames = dget(rdef, ["shortNames"]) or []
+
+        for name in [singular, plural] + list(shortNames):
+            if name is not None:
+                names.setdefault(name, rdef)
+        for name in {str(singular), str(plural)}:
+            kinds.setdefault(name, []).append(rdef)
+            if group:
+                names.setdefault(name + "." + group, rdef)
+    return names, kinds
+
+
+def _lookup(r_type, index):
+    names, kinds = index
+    rdef = names.get(r_type)
+    if rdef or "." not in r_type:
+        return rdef
+
+    # Partial group: every given group component must match the rdef group from the left
+    r_type_kind = r_type.split(".")[0]
+    r_type_group_list = r_type.split(".")[1:]
+    for rdef in kinds.get(r_type_kind, []):
+        r_def_group_list = str(dget(rdef, ["group"])).split(".")
+        if r_def_group_list[:len(r_type_group_list)] == r_type_group_list:
+            return rdef
     return None
 
 
 def get_generated_rdefs():
-    rdefs_f = os.path.join(os.getenv("HOME") or "/tmp/", ".omg.rdefs")
+    rdefs_f = _rdefs_file()
+    key = _file_key(rdefs_f)
+    if key == _cache["key"]:
+        return _cache["generated"]
 
+    generated = []
     try:
-        if os.path.isfile(rdefs_f):
+        if key:
             rdefs_y = load_yaml(rdefs_f)
             if rdefs_y and type(rdefs_y) is list:
-                return rdefs_y
+                generated = rdefs_y
     except FileNotFoundError:
         lg.warning("Unable to load rdefs file from {}".format(rdefs_f))
 
-    return []
+    _cache.update(key=key, generated=generated, index=None)
+    return generated
+
+
+def _get_index():
+    """Index over built-in RDEFS followed by the generated rdefs"""
+    generated = get_generated_rdefs()
+    if _cache["index"] is None:
+        _cache["index"] = _build_index(RDEFS + generated)
+    return _cache["index"]
 
 
 def get_rdef(r_type):
@@ -97,22 +142,10 @@ def get_rdef(r_type):
 
     r_type = r_type.lower()
 
-    # Lookup rdef in internal RDEFS
-    rdef = _find_rdef(r_type, RDEFS)
-    if rdef:
-        lg.debug("rdef for {} found internally: {}".format(r_type, rdef))
-        return rdef
-
-    lg.debug("rdef for {} not found internally. Trying generated ones".format(
-        r_type
-    ))
-
-    # Find rdefs from generated rdefs file
-
-    rdef = _find_rdef(r_type, get_generated_rdefs())
-
+    # Built-in RDEFS come first in the index, so they win over generated ones
+    rdef = _lookup(r_type, _get_index())
     if rdef:
-        lg.debug("rdef for {} found in generated rdef: {}".format(r_type, rdef))
+        lg.debug("rdef for {} found: {}".format(r_type, rdef))
         return rdef
 
     lg.debug("rdef for {} was not found!".format(r_type))
@@ -16,7 +16,32 @@ def _is_valid_k8_res(res):
     return False
 
 
-def load_res_from_yaml(yfile, rdef=None):
+def _project(r, fields):
+    """Copy of resource r with only the given key paths
+
+    Args:
+        r (dict): k8 resource
+        fields (list[list[str]]): Key paths to keep
+
+    Returns:
+        dict: New nested dict with the values found at the key paths
+    """
+    proj = {}
+    for path in fields:
+        src = r
+        dst = proj
+        for key in path[:-1]:
+            src = src.get(key)
+            if not isinstance(src, dict):
+                break
+            dst = dst.setdefault(key, {})
+        else:
+            if path[-1] in src:
+                dst[path[-1]] = src[path[-1]]
+    return proj
+
+
+def load_res_from_yaml(yfile, rdef=None, fields=None):
     """Load k8 resources from a single yaml file
 
     The yaml file is expected to be a dict when loaded with yaml.load
@@ -28,6 +53,11 @@ def load_res_from_yaml(yfile, rdef=None):
                               this can be used to filter a specific one.
                               Generally must-gather, yamls only have one type
                               per file, this is just as a precaution.
+
+        fields (list[list[str]], optional): Only keep these key paths of each
+                              resource (see build_table.table_fields), so that
+                              table output does not hold complete resources.
+                              Complete resources are returned if None (Default).
     Return:
         list[dict]: list of dictionary [ {'res': <>, 'yfile_ts': <>, rdef}, ...]
                         res:       k8 resource
@@ -81,83 +111,78 @@ def load_res_from_yaml(yfile, rdef=None):
         raise InvalidResource(
             "Invalid yaml file {}. Didn't get 'items' or 'metadata'".format(yfile))
 
+    if fields is not None:
+        for r in res:
+            r["res"] = _project(r["res"], fields)
+
     lg.debug("resources loaded length: {}".format(len(res)))
     lg.trace("res: {}".format(res))
 
     return res
 
 
-def load_res(path, r_type, r_name=None, ns=None):
-    """Load specific resource type from a must-gather path
-
-    This function first calls locate yamls to locate the yamls of the
-    r_type object. Then it calls load_res_from_yaml to load the
-    k8 resources from these yamls. Finally it filters for r_name if is
-    not None, and returns the array.
+def load_located_yaml(y, rdef, fields=None):
+    """Load the resources of one located yaml (see locate_yamls)
 
     Args:
-        path (str): Absolute must-gather path
+        y (str|dict): Yaml path, or {"yaml_missing": ns} for a namespace
+                      directory whose yaml is missing
+        rdef (dict): Resource definition of the located type
+        fields (list[list[str]], optional): Key paths to keep, see load_res_from_yaml
 
-        r_type (str): Resource type e.g, pod, node.
+    Returns:
+        list[dict]: Resources as returned by load_res_from_yaml,
+                    or None if the yaml is not a valid resource
+    """
+    # Handling Partial namespace directory with missing yaml
+    if (
+            dget(rdef, ["kind"]) == "Namespace"
+            and type(y) is dict
+            and dget(y, ["yaml_missing"])
+       ):
+        ns_name = dget(y, ["yaml_missing"])
+        return [{
+            "res": {
+                "apiVersion": "v1",
+                "kind": "Namespace",
+                "metadata": {
+                    "name": ns_name
+                }
+            }
+        }]
+    try:
+        return load_res_from_yaml(y, rdef, fields)
+    except InvalidResource as e:
+        lg.warning(e)
+        return None
 
+
+def filter_res(yamls, loaded, r_name=None):
+    """Combine the resources loaded from located yamls, filtering names
+
+    Args:
+        yamls (list): Located yamls, in order
+        loaded (iterable): load_located_yaml() result for each yaml, in the same order
         r_name (list[str], optional): Resource names to filter.
                                       All names are returned if None (Default).
 
-        ns (str): Namespace if the the object is namespace scoped.
-                  If the r_type is ns-scoped but ns is None, we use Config().project
-                  '_all' would mean all namespaces.
-                  Ignored for cluster scoped resource types.
-
     Returns:
-        list[dict]: list of dictionary [ {'res': <>, 'yfile_ts': <>, rdef}, ...]
-                        res:       k8 resource
-                        yfile_ts:   timestamp of the yaml file from
-                                    which the resource was loaded
-                                    (used for age calculation)
-                        rdef:       resrouce definition of the resource
+        list[dict]: Resources, see load_res
     """
-    lg.debug("FUNC_INIT: {}".format(locals()))
-
-    rdef, yamls = locate_yamls(path, r_type, ns=ns)
-
-    lg.debug("Found {} yamls".format(len(yamls)))
-
-    # Load resources from these yamls and save in res
-    # after filtering names if r_name is set
     res = []
 
     # total counters
     t_matched = 0
     t_not_matched = 0
 
-    for y in yamls:
+    for y, res_yd in zip(yamls, loaded):
 
         # per yaml counters
         matched = 0
         not_matched = 0
 
-        # Handling Partial namespace directory with missing yaml
-        if (
-                dget(rdef, ["kind"]) == "Namespace"
-                and type(y) is dict
-                and dget(y, ["yaml_missing"])
-           ):
-            ns_name = dget(y, ["yaml_missing"])
-            res_yd = [{
-                "res": {
-                    "apiVersion": "v1",
-                    "kind": "Namespace",
-                    "metadata": {
-                        "name": ns_name
-                    }
-                }
-            }]
-        else:
-            try:
-                res_yd = load_res_from_yaml(y, rdef)
-            except InvalidResource as e:
-                lg.warning(e)
-                continue
+        if res_yd is None:
+            continue
 
         if not r_name:
             # res name is not set, get all from yaml
@@ -185,3 +210,43 @@ def load_res(path, r_type, r_name=None, ns=None):
         lg.info("{}/{} from yaml file: {}".format(matched, matched+not_matched, y))
 
     return res
+
+
+def load_res(path, r_type, r_name=None, ns=None):
+    """Load specific resource type from a must-gather path
+
+    This function first calls locate yamls to locate the yamls of the
+    r_type object. Then it calls load_res_from_yaml to load the
+    k8 resources from these yamls. Finally it filters for r_name if is
+    not None, and returns the array.
+
+    Args:
+        path (str): Absolute must-gather path
+
+        r_type (str): Resource type e.g, pod, node.
+
+        r_name (list[str], optional): Resource names to filter.
+                                      All names are returned if None (Default).
+
+        ns (str): Namespace if the the object is namespace scoped.
+                  If the r_type is ns-scoped but ns is None, we use Config().project
+                  '_all' would mean all namespaces.
+                  Ignored for cluster scoped resource types.
+
+    Returns:
+        list[dict]: list of dictionary [ {'res': <>, 'yfile_ts': <>, rdef}, ...]
+                        res:       k8 resource
+                        yfile_ts:   timestamp of the yaml file from
+                                    which the resource was loaded
+                                    (used for age calculation)
+                        rdef:       resrouce definition of the resource
+    """
+    lg.debug("FUNC_INIT: {}".format(locals()))
+
+    rdef, yamls = locate_yamls(path, r_type, ns=ns)
+
+    lg.debug("Found {} yamls".format(len(yamls)))
+
+    # Load resources from these yamls and save in res
+    # after filtering names if r_name is set
+    return filter_res(yamls, (load_located_yaml(y, rdef) for y in yamls), r_name)
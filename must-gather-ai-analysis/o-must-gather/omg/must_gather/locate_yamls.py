@@ -15,12 +15,16 @@ yaml files are located calculated as per following pattern:
                 [plural.yaml | plural/*.yaml]
 
 _detect_yamls "detects" if plural.yaml is present or plural/*.yaml
+
+The directory layout is read from the must-gather's manifest (see manifest.py)
+when there is one, instead of from the filesystem.
 """
 
 from os.path import join, isdir, isfile
 from os import listdir
 from loguru import logger as lg
 from omg.must_gather.get_rdef import get_rdef
+from omg.must_gather import manifest
 from omg.must_gather.exceptions import UnkownResourceType, NameSpaceRequired
 
 
@@ -77,6 +81,25 @@ def locate_project(path, tell):
         list: List of requested item (yamls/paths/names)
     """
     lg.debug("FUNC_INIT: {}".format(locals()))
+    if tell not in ["yamls", "paths", "names"]:
+        raise ValueError("Invalid arg(tell): {}".format(tell))
+
+    mf = manifest.get(path)
+    if mf is not None:
+        p_nss = join(path, "namespaces")
+        result = []
+        for proj, proj_mf in (mf["namespaces"] or {}).items():
+            if tell == "names":
+                result.append(proj)
+            elif tell == "paths":
+                result.append(join(p_nss, proj))
+            elif proj_mf["yaml"]:
+                result.append(join(p_nss, proj, proj+".yaml"))
+            else:
+                result.append({"yaml_missing": proj})
+        lg.trace("result: {}".format(result))
+        return result
+
     result = []
     lg.debug("Looking for projects in {}".format(path))
     p_nss = join(path, "namespaces")
@@ -105,6 +128,14 @@ def locate_project(path, tell):
     return result
 
 
+def _ns_yamls(path, mf, ns, group, plural):
+    """Detect the yamls of a namespaced resource type in a namespace"""
+    ns_path = join(path, "namespaces", ns)
+    if mf is not None and ns in (mf["namespaces"] or {}):
+        return manifest.group_yamls(mf["namespaces"][ns]["groups"], ns_path, group, plural)
+    return _detect_yamls(join(ns_path, group), plural)
+
+
 def locate_yamls(path, r_type, ns=None):
     """Find yaml for a particular resource type in paths.
 
@@ -145,23 +176,27 @@ def locate_yamls(path, r_type, ns=None):
         group = rdef["group"]
         scope = rdef["scope"]
 
+        mf = manifest.get(path)
         if scope == "Namespaced":
             if not ns:
                 raise NameSpaceRequired(
                     "{} is Namespaced but ns/project is not set".format(r_type))
             if ns == "_all":  # all namespaces
-                all_proj_paths = locate_project(path, tell="paths")
-                for app in all_proj_paths:
-                    ymls = _detect_yamls(join(app, group), plural)
+                for proj in locate_project(path, tell="names"):
+                    ymls = _ns_yamls(path, mf, proj, group, plural)
                     if ymls:
                         yaml_paths.extend(ymls)
             else:  # specific ns
-                ymls = _detect_yamls(join(path, "namespaces", ns, group), plural)
+                ymls = _ns_yamls(path, mf, ns, group, plural)
                 if ymls:
                     yaml_paths.extend(ymls)
         else:
             # scope == "Cluster"
-            ymls = _detect_yamls(join(path, "cluster-scoped-resources", group), plural)
+            csr_path = join(path, "cluster-scoped-resources")
+            if mf is not None and mf["cluster"] is not None:
+                ymls = manifest.group_yamls(mf["cluster"], csr_path, group, plural)
+            else:
+                ymls = _detect_yamls(join(csr_path, group), plural)
             if ymls:
                 yaml_paths.extend(ymls)
     lg.trace("rdef: {}, yaml_paths: {}".format(rdef, yaml_paths))
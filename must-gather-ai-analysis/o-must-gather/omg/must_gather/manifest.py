@@ -0,0 +1,206 @@
+""" manifest.py
+
+Directory manifest of a must-gather.
+
+Locating yamls used to stat and list the must-gather tree (isdir, isfile,
+listdir) on every command, one round trip each on network filesystems. The
+manifest records the namespaces and the yaml files of every group directory
+in a single os.scandir walk:
+
+    {
+        "key": [...],
+        "namespaces": {
+            <ns>: {"yaml": <ns>.yaml present, "groups": <groups>},
+            ...
+        },
+        "cluster": <groups>,
+    }
+
+where <groups> is {group: {"files": [plural.yaml, ...], "dirs": {plural: [*.yaml]}}}.
+"namespaces"/"cluster" are None if the directory is missing.
+
+It is built by `omg use`, saved in ~/.omg.manifest and reused as long as the
+mtimes of the must-gather root and of its namespaces and cluster-scoped-resources
+directories are unchanged. Changes deeper in the tree (which must-gathers don't
+get once extracted) are not detected; `omg use` rebuilds the manifest.
+"""
+
+import os
+import json
+import hashlib
+from os import getenv
+from loguru import logger as lg
+
+_manifest_dir = os.path.join(getenv("HOME") or "", ".omg.manifest")
+
+# Bumped whenever the manifest layout changes
+_MANIFEST_VERSION = 1
+
+# Manifests used by this process, by must-gather path
+_cache = {}
+
+
+def _manifest_file(path):
+    digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(_manifest_dir, digest + ".json")
+
+
+def _key(path):
+    """mtimes of the must-gather root and its namespaces/cluster-scoped-resources dirs"""
+    key = []
+    for d in (path, os.path.join(path, "namespaces"), os.path.join(path, "cluster-scoped-resources")):
+        try:
+            key.append(os.stat(d).st_mtime_ns)
+        except OSError:
+            key.append(None)
+    return key
+
+
+def _scan_group(group_dir):
+    """yaml files and plural directories (with their yaml files) in a group directory"""
+    files = []
+    dirs = {}
+    with os.scandir(group_dir) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                with os.scandir(entry.path) as p_entries:
+                    dirs[entry.name] = [y.name for y in p_entries if y.name.endswith(".yaml")]
+            elif entry.name.endswith(".yaml"):
+                files.append(entry.name)
+    return {"files": files, "dirs": dirs}
+
+
+def _scan_groups(path):
+    groups = {}
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                groups[entry.name] = _scan_group(entry.path)
+    return groups
+
+
+def build(path):
+    """Walk a must-gather and build its manifest
+
+    Args:
+        path (str): Must-gather path
+
+    Returns:
+        dict: Manifest (see module docstring)
+    """
+    lg.debug("FUNC_INIT: {}".format(locals()))
+    manifest = {"key": _key(path), "namespaces": None, "cluster": None}
+
+    nss_dir = os.path.join(path, "namespaces")
+    if os.path.isdir(nss_dir):
+        namespaces = {}
+        with os.scandir(nss_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                ns = {"yaml": False, "groups": {}}
+                with os.scandir(entry.path) as ns_entries:
+                    for ns_entry in ns_entries:
+                        if ns_entry.is_dir():
+                            ns["groups"][ns_entry.name] = _scan_group(ns_entry.path)
+                        elif ns_entry.name == entry.name + ".yaml":
+                            ns["yaml"] = True
+                namespaces[entry.name] = ns
+        manifest["namespaces"] = namespaces
+
+    csr_dir = os.path.join(path, "cluster-scoped-resources")
+    if os.path.isdir(csr_dir):
+        manifest["cluster"] = _scan_groups(csr_dir)
+
+    return manifest
+
+
+def _save(path, manifest):
+    manifest_file = _manifest_file(path)
+    try:
+        os.makedirs(_manifest_dir, exist_ok=True)
+        tmp_file = manifest_file + ".tmp"
+        with open(tmp_file, "w") as m_f:
+            json.dump({"version": _MANIFEST_VERSION, "manifest": manifest}, m_f)
+        os.replace(tmp_file, manifest_file)
+    except OSError as e:
+        lg.debug("Could not save manifest {}: {}".format(manifest_file, e))
+
+
+def _load(path):
+    manifest_file = _manifest_file(path)
+    if os.path.isfile(manifest_file):
+        try:
+            with open(manifest_file, "r") as m_f:
+                data = json.load(m_f)
+            if data.get("version") == _MANIFEST_VERSION:
+                return data.get("manifest")
+        except Exception as e:
+            lg.debug("Ignoring unreadable manifest {}: {}".format(manifest_file, e))
+    return None
+
+
+def refresh(path):
+    """Rebuild and save the manifest of a must-gather (used by `omg use`)
+
+    Args:
+        path (str): Must-gather path
+
+    Returns:
+        dict: Manifest, or None if the must-gather could not be walked
+    """
+    try:
+        manifest = build(path)
+    except OSError as e:
+        lg.debug("Could not build manifest for {}: {}".format(path, e))
+        _cache.pop(path, None)
+        return None
+    _save(path, manifest)
+    _cache[path] = manifest
+    return manifest
+
+
+def get(path):
+    """Manifest of a must-gather, built if missing or outdated
+
+    Args:
+        path (str): Must-gather path
+
+    Returns:
+        dict: Manifest, or None if the must-gather could not be walked
+    """
+    manifest = _cache.get(path)
+    if manifest is not None:
+        return manifest
+
+    manifest = _load(path)
+    if manifest is not None and manifest.get("key") == _key(path):
+        _cache[path] = manifest
+        return manifest
+
+    lg.debug("Building manifest for {}".format(path))
+    return refresh(path)
+
+
+def group_yamls(groups, base, group, plural):
+    """Yaml paths of a resource type in a manifest groups dict
+
+    Same result as locate_yamls._detect_yamls(join(base, group), plural)
+
+    Args:
+        groups (dict): "groups" of a namespace, or "cluster" of a manifest
+        base (str): Directory of the groups
+        group (str): Group of the resource type
+        plural (str): Plural name of the resource type
+
+    Returns:
+        list[str]: List of yaml paths, or None if none were found
+    """
+    g = groups.get(group)
+    if g is None:
+        return None
+    if plural + ".yaml" in g["files"]:
+        return [os.path.join(base, group, plural + ".yaml")]
+    if plural in g["dirs"]:
+        return [os.path.join(base, group, plural, y) for y in g["dirs"][plural]]
+    return None
@@ -22,8 +22,9 @@ def scan_mg(tdirs):
             while len(scan_q) > 0:
                 lg.debug('scan_q: ' + str(scan_q))
                 wdir = scan_q.pop()
-                subdirs = [d for d in os.listdir(wdir)
-                           if os.path.isdir(os.path.join(wdir, d))]
+                # scandir tells directories apart without a stat per entry
+                with os.scandir(wdir) as entries:
+                    subdirs = [e.name for e in entries if e.is_dir()]
                 if ("cluster-scoped-resources" in subdirs or "namespaces" in subdirs):
                     lg.debug('Valid dir found: ' + str(wdir))
                     vdirs.append(os.path.abspath(wdir))
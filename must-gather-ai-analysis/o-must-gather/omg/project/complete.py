@@ -1,4 +1,4 @@
-from omg.must_gather.locate_yamls import locate_project
+from omg.completion.names import namespace_names
 from omg.config import config
 from omg.utils.dget import dget
 from loguru import logger as lg
@@ -15,10 +15,7 @@ def complete_projects(ctx, args, incomplete):
         cfg = config.get()
         c_paths = dget(cfg, ["paths"])
         if c_paths:
-            projects = []
-            for path in c_paths:
-                projects.extend(locate_project(path, tell="names"))
-            return projects
+            return namespace_names(c_paths)
         return []
 
     if incomplete is not None:
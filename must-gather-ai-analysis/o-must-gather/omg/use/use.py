@@ -4,6 +4,7 @@ from omg.config import config
 from omg.must_gather.exceptions import NoValidMgFound
 from omg.use.show_mg_info import show_mg_info
 from omg.must_gather.scan_mg import scan_mg
+from omg.must_gather import manifest
 
 
 def cmd(mg_paths=None, cwd=False, cfile=None):
@@ -44,8 +45,9 @@ def cmd(mg_paths=None, cwd=False, cfile=None):
             lg.error(e)
             return 1
 
-        # Foce re-generate rdefs for all discovered paths
+        # Foce re-generate rdefs and the directory manifest for all discovered paths
         for path in valid_mg_paths:
+            manifest.refresh(path)
             try:
                 generate_rdefs(path)
             except Exception:
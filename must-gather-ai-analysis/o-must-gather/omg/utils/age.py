@@ -1,9 +1,79 @@
+from calendar import monthrange
 from datetime import datetime
+from functools import lru_cache
 from dateutil.parser import parse
 from dateutil.relativedelta import relativedelta
 from loguru import logger as lg
 
 
+@lru_cache(maxsize=8192)
+def _iso_datetime(ts):
+    """Parse an iso-8601 timestamp, ignoring the timezone (like parse(ts, ignoretz=True))
+
+    Timestamps written by kubernetes (e.g: '2020-06-04T22:10:41Z') are parsed
+    with datetime.fromisoformat, anything else falls back to dateutil.
+    """
+    if isinstance(ts, datetime):
+        return ts.replace(tzinfo=None)
+    try:
+        if ts.endswith("Z"):
+            return datetime.fromisoformat(ts[:-1])
+        return datetime.fromisoformat(ts).replace(tzinfo=None)
+    except ValueError:
+        return parse(ts, ignoretz=True)
+
+
+@lru_cache(maxsize=1024)
+def _epoch_datetime(ts):
+    return datetime.utcfromtimestamp(ts)
+
+
+def _to_datetime(ts, ts_type):
+    if ts_type == "iso":
+        return _iso_datetime(ts)
+    elif ts_type == "epoch":
+        return _epoch_datetime(ts)
+    raise ValueError("Invalid timestamp type: {}".format(ts_type))
+
+
+def _elapsed(dt1, dt2):
+    """Elapsed (days, hours, minutes, seconds) from dt1 to dt2, with dt2 >= dt1
+
+    Same as the years/months/days/... of relativedelta(dt2, dt1), with years
+    counted as 365 days and months as 30 days.
+    """
+    # Whole months from dt1 (day clipped to the end of month) not after dt2
+    months = (dt2.year - dt1.year) * 12 + dt2.month - dt1.month
+    while True:
+        y, m = divmod(dt1.month - 1 + months, 12)
+        y += dt1.year
+        m += 1
+        dtm = dt1.replace(year=y, month=m, day=min(dt1.day, monthrange(y, m)[1]))
+        if dtm <= dt2:
+            break
+        months -= 1
+
+    delta = dt2 - dtm
+    days = (months // 12) * 365 + (months % 12) * 30 + delta.days
+    hours, rem = divmod(delta.seconds, 3600)
+    return days, hours, rem // 60, rem % 60
+
+
+def _format(days, hours, minutes, seconds):
+    if days > 0:
+        return str(days) + "d"
+    elif hours > 9:
+        return str(hours) + "h"
+    elif hours > 0 and hours < 10:
+        return str(hours) + "h" + str(minutes) + "m"
+    elif minutes > 9:
+        return str(minutes) + "m"
+    elif minutes > 0 and minutes < 10:
+        return str(minutes) + "m" + str(seconds) + "s"
+    else:
+        return str(seconds) + "s"
+
+
 def age(ts1, ts2, ts1_type="iso", ts2_type="epoch"):
     """Calculate age of the objects
 
@@ -26,35 +96,43 @@ def age(ts1, ts2, ts1_type="iso", ts2_type="epoch"):
                 Biggest unit is days (d) and smallest is (s)
     """
     try:
-        if ts1_type == "iso":
-            if isinstance(ts1, datetime):
-                ts1 = ts1.isoformat()
-            dt1 = parse(ts1, ignoretz=True)
-        elif ts1_type == "epoch":
-            dt1 = datetime.utcfromtimestamp(ts1)
-
-        if ts2_type == "iso":
-            if isinstance(ts2, datetime):
-                ts2 = ts2.isoformat()
-            dt2 = parse(ts2, ignoretz=True)
-        elif ts2_type == "epoch":
-            dt2 = datetime.utcfromtimestamp(ts2)
-
+        dt1 = _to_datetime(ts1, ts1_type)
+        dt2 = _to_datetime(ts2, ts2_type)
+        if dt2 >= dt1:
+            return _format(*_elapsed(dt1, dt2))
+        # Object newer than the yaml file (e.g clock skew)
         rd = relativedelta(dt2, dt1)
     except Exception as e:
         lg.debug("error parsing timestamps: {}".format(e))
         return "Unknown"
 
-    if rd.days > 0 or rd.months > 0 or rd.years > 0:
-        days = int(rd.years * 365) + int(rd.months * 30) + int(rd.days)
-        return str(days) + "d"
-    elif rd.hours > 9:
-        return str(rd.hours) + "h"
-    elif rd.hours > 0 and rd.hours < 10:
-        return str(rd.hours) + "h" + str(rd.minutes) + "m"
-    elif rd.minutes > 9:
-        return str(rd.minutes) + "m"
-    elif rd.minutes > 0 and rd.minutes < 10:
-        return str(rd.minutes) + "m" + str(rd.seconds) + "s"
-    else:
-        return str(rd.seconds) + "s"
+    days = int(rd.years * 365) + int(rd.months * 30) + int(rd.days)
+    return _format(days, rd.hours, rd.minutes, rd.seconds)
+
+
+def ages(timestamps, ts1_type="iso", ts2_type="epoch"):
+    """Calculate age of many objects at once
+
+    Objects listed from the same yaml file share ts2 and often have
+    identical ts1 (e.g: events), each distinct pair is only calculated once.
+
+    Args:
+        timestamps (iterable): (ts1, ts2) pairs, see age()
+        ts1_type (str, optional): Type of fist timestamps. Defaults to "iso".
+        ts2_type (str, optional): Type of second timestamps. Defaults to "epoch".
+
+    Returns:
+        list:   Human readable ages, in the same order as timestamps
+    """
+    memo = {}
+    result = []
+    for pair in timestamps:
+        try:
+            a = memo[pair]
+        except KeyError:
+            a = memo[pair] = age(pair[0], pair[1], ts1_type, ts2_type)
+        except TypeError:
+            # unhashable timestamp
+            a = age(pair[0], pair[1], ts1_type, ts2_type)
+        result.append(a)
+    return result
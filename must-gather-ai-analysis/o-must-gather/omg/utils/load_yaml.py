@@ -1,5 +1,6 @@
 """ load_resources_from_yaml.py """
 
+import re
 import yaml
 import os
 from loguru import logger as lg
@@ -11,9 +12,149 @@ except ImportError:
     from yaml import SafeLoader
 
 
+# Marks a failed load (None is a valid yaml document)
+_FAILED = object()
+
+# Top-level "items:" key of a List yaml and the line starting its first item
+_ITEMS_KEY = re.compile(r"^items:[ \t]*\n", re.M)
+_ITEM_START = re.compile(r"( *)- ")
+
+
+def _load(y_d):
+    try:
+        return yaml.load(y_d, Loader=SafeLoader)
+    except (yaml.scanner.ScannerError, yaml.parser.ParserError):
+        return _FAILED
+
+
+def _line_cuts(y_d):
+    """Offsets of the line starts in y_d (except the end of y_d)"""
+    return [0] + [m.end() for m in re.finditer("\n", y_d) if m.end() < len(y_d)]
+
+
+def _item_cuts(y_d):
+    """Offsets of the lines starting an item of the top-level items list
+
+    must-gather Lists are dumped as:
+        apiVersion: v1
+        items:
+        - apiVersion: v1
+          kind: Event
+          ...
+        - apiVersion: v1
+          ...
+    so every item starts with a line at the indentation of the first item.
+    Returns an empty list for yamls which are not a List.
+    """
+    key = _ITEMS_KEY.search(y_d)
+    if not key:
+        return []
+    first = _ITEM_START.match(y_d, key.end())
+    if not first:
+        return []
+    item_start = re.compile("^" + re.escape(first.group(0)), re.M)
+    return [m.start() for m in item_start.finditer(y_d, key.end())]
+
+
+def _last_loadable(y_d, cuts):
+    """Find the last item cut up to which y_d can be loaded
+
+    The last cut is tried first, as it is the answer for files truncated in
+    their last item. Otherwise the cuts are bisected, which assumes that if a
+    prefix of the yaml fails to load, longer prefixes do too. That holds for
+    the item cuts of a List, but not for line cuts: a prefix ending inside a
+    multi-line quoted scalar fails while longer ones load again.
+
+    Args:
+        y_d (str): Yaml that fails to load
+        cuts (list): Increasing offsets into y_d
+
+    Returns:
+        tuple: (index of the cut, python object loaded from y_d[:cuts[index]])
+               or (None, None) if not even y_d[:cuts[0]] can be loaded
+    """
+    ydata = _load(y_d[:cuts[-1]])
+    if ydata is not _FAILED:
+        return len(cuts) - 1, ydata
+
+    lo, hi = 0, len(cuts) - 1
+    ydata = _FAILED
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        mid_data = _load(y_d[:cuts[mid]])
+        if mid_data is _FAILED:
+            hi = mid
+        else:
+            lo, ydata = mid, mid_data
+    if lo == 0:
+        ydata = _load(y_d[:cuts[0]])
+        if ydata is _FAILED:
+            return None, None
+    return lo, ydata
+
+
+def _last_loadable_line(y_d, cuts):
+    """Find the last line cut up to which y_d can be loaded
+
+    Lines are skipped from the end one at a time, so only use this on the
+    part of a yaml that is left after the item cuts (see _last_loadable).
+
+    Args:
+        y_d (str): Yaml that fails to load
+        cuts (list): Increasing line offsets into y_d
+
+    Returns:
+        tuple: (index of the cut, python object loaded from y_d[:cuts[index]])
+               or (None, None) if not even y_d[:cuts[0]] can be loaded
+    """
+    for i in range(len(cuts) - 1, -1, -1):
+        ydata = _load(y_d[:cuts[i]])
+        if ydata is not _FAILED:
+            return i, ydata
+    return None, None
+
+
+def _recover(y_d):
+    """Load what can be loaded from a truncated yaml
+
+    For a List the yaml is cut at the last item boundary it loads up to
+    (normally just before the truncated item) and what loads of the rest of
+    the items is appended. Other yamls are cut at the last line they load up to.
+    Finding the item costs a few full loads instead of one load per skipped
+    line; lines are only skipped one at a time inside the truncated item.
+
+    Args:
+        y_d (str): Yaml that fails to load
+
+    Returns:
+        tuple: (python object, offset in y_d where the loaded part ends)
+    """
+    cuts = _item_cuts(y_d)
+    if cuts:
+        k, ydata = _last_loadable(y_d, cuts)
+        if isinstance(ydata, dict) and isinstance(ydata.get("items") or [], list):
+            # Salvage the rest of the items (normally the truncated one)
+            tail = y_d[cuts[k]:]
+            t_cuts = _line_cuts(tail)
+            j, items = _last_loadable_line(tail, t_cuts)
+            if isinstance(items, list):
+                ydata["items"] = (ydata.get("items") or []) + items
+                return ydata, cuts[k] + t_cuts[j]
+            return ydata, cuts[k]
+
+    l_cuts = _line_cuts(y_d)
+    i, ydata = _last_loadable_line(y_d, l_cuts)
+    if i is None:
+        return None, 0
+    return ydata, l_cuts[i]
+
+
 def load_yaml(yfile):
     """Load yaml file and return python object
 
+    Truncated yaml files (e.g. cut off by a size limit when the must-gather
+    was collected) are loaded up to the point where they are still valid.
+
     Args:
         yfile (str): Yaml file path
 
@@ -25,33 +166,20 @@ def load_yaml(yfile):
     if not os.path.isfile(yfile):
         raise Exception("File not found: {}".format(yfile))
 
-    ydata = None
     with open(yfile, "r") as y_f:
         lg.debug("Opened yaml file: " + yfile)
         y_d = y_f.read()
-        try:
-            ydata = yaml.load(y_d, Loader=SafeLoader)
-        except (yaml.scanner.ScannerError, yaml.parser.ParserError):
-            # yaml load/parse failed
-            # try skipping lines from the bottom
-            # Until we are able to load the yaml file
-            # We will try until > 1 lines are left
-            lines_total = y_d.count("\n")
-            lines_skipped = 0
-            while y_d.count("\n") > 1:
-                # skip last line
-                y_d = y_d[:y_d.rfind("\n")]
-                lines_skipped += 1
-                try:
-                    ydata = yaml.load(y_d, Loader=SafeLoader)
-                except (yaml.scanner.ScannerError, yaml.parser.ParserError):
-                    pass
-                else:
-                    lg.warning("Skipped " +
-                               str(lines_skipped) + "/" + str(lines_total) +
-                               " lines from the end of " + yfile +
-                               " to the load the yaml file properly")
-                    break
+
+    ydata = _load(y_d)
+    if ydata is _FAILED:
+        # yaml load/parse failed
+        # load the longest part of the file that can be loaded
+        ydata, end = _recover(y_d)
+        if end > 0:
+            lg.warning("Skipped " +
+                       str(y_d.count("\n", end) + 1) + "/" + str(y_d.count("\n")) +
+                       " lines from the end of " + yfile +
+                       " to the load the yaml file properly")
 
     lg.debug("yaml file loaded in ydata. type: " + str(type(ydata)))
     lg.trace("ydata: " + str(ydata))
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+from dateutil.relativedelta import relativedelta
+from omg.config.logging import setup_logging
+from omg.utils.age import age, ages
+from omg.get.output.build_table import table_columns, iter_rows
+
+
+setup_logging(loglevel="normal")
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def _epoch(dt):
+    return (dt - EPOCH).total_seconds()
+
+
+def _relativedelta_age(ts1, ts2):
+    """Age as computed with dateutil's relativedelta"""
+    rd = relativedelta(datetime.utcfromtimestamp(ts2), datetime.fromisoformat(ts1[:-1]))
+    if rd.days > 0 or rd.months > 0 or rd.years > 0:
+        return str(int(rd.years * 365) + int(rd.months * 30) + int(rd.days)) + "d"
+    elif rd.hours > 9:
+        return str(rd.hours) + "h"
+    elif rd.hours > 0:
+        return str(rd.hours) + "h" + str(rd.minutes) + "m"
+    elif rd.minutes > 9:
+        return str(rd.minutes) + "m"
+    elif rd.minutes > 0:
+        return str(rd.minutes) + "m" + str(rd.seconds) + "s"
+    return str(rd.seconds) + "s"
+
+
+def test_age_units():
+    ct = datetime(2020, 6, 4, 22, 10, 41)
+    assert age("2020-06-04T22:10:41Z", _epoch(ct + timedelta(seconds=20))) == "20s"
+    assert age("2020-06-04T22:10:41Z", _epoch(ct + timedelta(minutes=3, seconds=5))) == "3m5s"
+    assert age("2020-06-04T22:10:41Z", _epoch(ct + timedelta(minutes=42))) == "42m"
+    assert age("2020-06-04T22:10:41Z", _epoch(ct + timedelta(hours=6, minutes=1))) == "6h1m"
+    assert age("2020-06-04T22:10:41Z", _epoch(ct + timedelta(hours=23))) == "23h"
+    assert age("2020-06-04T22:10:41+02:00", _epoch(ct + timedelta(days=2))) == "2d"
+    assert age(datetime(2020, 6, 4, 22, 10, 41, tzinfo=timezone.utc), _epoch(ct + timedelta(days=2))) == "2d"
+    assert age("2020-06-04T22:10:41Z", "2020-06-05T00:00:00Z", ts2_type="iso") == "1h49m"
+    assert age("2020-06-04T22:10:41Z", _epoch(ct - timedelta(seconds=30))) == "-30s"
+    assert age(None, 0) == "Unknown"
+    assert age("not a timestamp", 0) == "Unknown"
+
+
+def test_age_months_match_relativedelta():
+    for ts1 in ["2021-01-31T10:00:00Z", "2020-02-29T23:59:59Z", "2020-12-31T12:00:00Z"]:
+        ct = datetime.fromisoformat(ts1[:-1])
+        for days in range(0, 800, 7):
+            for seconds in (0, 3599, 43200):
+                ts2 = _epoch(ct + timedelta(days=days, seconds=seconds))
+                assert age(ts1, ts2) == _relativedelta_age(ts1, ts2), (ts1, days, seconds)
+
+
+def test_ages():
+    ts2 = _epoch(datetime(2020, 6, 5))
+    pairs = [("2020-06-04T23:00:00Z", ts2), ("2020-06-01T00:00:00Z", ts2), ("2020-06-04T23:00:00Z", ts2),
+             ([], ts2)]
+    assert ages(pairs) == ["1h0m", "4d", "1h0m", "Unknown"]
+
+
+def test_age_column_matches_relativedelta():
+    # Kind without a table module: NAME and AGE columns
+    yfile_ts = _epoch(datetime(2024, 3, 5, 12))
+    ct = datetime(2024, 3, 5, 12)
+    widgets = [
+        {
+            "rdef": {"kind": "Widget", "scope": "Namespaced"},
+            "yfile_ts": yfile_ts,
+            "res": {
+                "metadata": {
+                    "name": "e{}".format(i),
+                    # Objects created over the last 3 days, a few per second
+                    "creationTimestamp": (ct - timedelta(seconds=i * 13 * 40)).isoformat() + "Z",
+                },
+            },
+        }
+        for i in range(500)
+    ]
+    _, head_f = table_columns(widgets[0]["rdef"], None, None, False, False)
+
+    rows = list(iter_rows(widgets, head_f))
+    expected = [_relativedelta_age(e["res"]["metadata"]["creationTimestamp"], yfile_ts) for e in widgets]
+    assert [row[-1] for row in rows] == expected
@@ -0,0 +1,96 @@
+import os
+import yaml
+from omg.completion import names
+from omg.must_gather import manifest
+from omg.config.logging import setup_logging
+
+
+setup_logging(loglevel="normal")
+
+
+def _write_yaml(data, *parts):
+    os.makedirs(os.path.dirname(os.path.join(*parts)), exist_ok=True)
+    with open(os.path.join(*parts), "w") as f:
+        yaml.dump(data, f)
+
+
+def _pods(ns, *pod_names):
+    return {"apiVersion": "v1", "kind": "PodList", "items": [
+        {"apiVersion": "v1", "kind": "Pod", "metadata": {"name": name, "namespace": ns}} for name in pod_names
+    ]}
+
+
+def _make_mg(root):
+    for ns in ["ns1", "ns2"]:
+        _write_yaml({"apiVersion": "v1", "kind": "Namespace", "metadata": {"name": ns}},
+                    root, "namespaces", ns, ns + ".yaml")
+    _write_yaml(_pods("ns1", "api-0", "api-1"), root, "namespaces", "ns1", "core", "pods.yaml")
+    _write_yaml(_pods("ns2", "etcd-0"), root, "namespaces", "ns2", "core", "pods.yaml")
+    # namespace directory without its yaml
+    os.makedirs(os.path.join(root, "namespaces", "ns3", "core"))
+    return root
+
+
+def _count_parses(monkeypatch):
+    parsed = []
+    names_in_yaml = names._names_in_yaml
+
+    def counting(yfile, rdef):
+        parsed.append(yfile)
+        return names_in_yaml(yfile, rdef)
+
+    monkeypatch.setattr(names, "_names_in_yaml", counting)
+    return parsed
+
+
+def _isolate(tmpdir, monkeypatch):
+    monkeypatch.setattr(names, "_names_dir", str(tmpdir.join("names")))
+    monkeypatch.setattr(manifest, "_manifest_dir", str(tmpdir.join("manifests")))
+    monkeypatch.setattr(manifest, "_cache", {})
+
+
+def test_resource_names_served_from_cache(tmpdir, monkeypatch):
+    _isolate(tmpdir, monkeypatch)
+    root = _make_mg(str(tmpdir.join("mg")))
+    parsed = _count_parses(monkeypatch)
+
+    assert sorted(names.resource_names([root], "pod", ns="_all")) == ["api-0", "api-1", "etcd-0"]
+    assert len(parsed) == 2
+    assert os.path.isfile(names._index_file(root))
+
+    # Repeated completions do not parse any yaml
+    assert sorted(names.resource_names([root], "pod", ns="_all")) == ["api-0", "api-1", "etcd-0"]
+    assert names.resource_names([root], "pod", ns="ns2") == ["etcd-0"]
+    assert len(parsed) == 2
+
+
+def test_resource_names_reparse_changed_yaml(tmpdir, monkeypatch):
+    _isolate(tmpdir, monkeypatch)
+    root = _make_mg(str(tmpdir.join("mg")))
+    parsed = _count_parses(monkeypatch)
+    names.resource_names([root], "pod", ns="_all")
+    del parsed[:]
+
+    ns1_pods = os.path.join(root, "namespaces", "ns1", "core", "pods.yaml")
+    _write_yaml(_pods("ns1", "api-0", "api-1", "api-2"), ns1_pods)
+    assert sorted(names.resource_names([root], "pod", ns="_all")) == ["api-0", "api-1", "api-2", "etcd-0"]
+    assert parsed == [ns1_pods]
+
+
+def test_namespace_names(tmpdir, monkeypatch):
+    _isolate(tmpdir, monkeypatch)
+    root = _make_mg(str(tmpdir.join("mg")))
+
+    assert names.namespace_names([root]) == ["ns1", "ns2", "ns3"]
+    # Namespace directories without their yaml are completed by name
+    assert sorted(names.resource_names([root], "project")) == ["ns1", "ns2", "ns3"]
+
+    # Cached until the namespaces directory changes
+    monkeypatch.setattr(names.os, "scandir", lambda path: (_ for _ in ()).throw(AssertionError("listed")))
+    assert names.namespace_names([root]) == ["ns1", "ns2", "ns3"]
+    monkeypatch.undo()
+    _isolate(tmpdir, monkeypatch)
+
+    os.makedirs(os.path.join(root, "namespaces", "ns4"))
+    os.utime(os.path.join(root, "namespaces"), ns=(0, 1))
+    assert names.namespace_names([root]) == ["ns1", "ns2", "ns3", "ns4"]
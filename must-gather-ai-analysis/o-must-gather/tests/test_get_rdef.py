@@ -0,0 +1,34 @@
+import os
+import yaml
+from omg.must_gather import get_rdef
+from omg.config.logging import setup_logging
+
+
+setup_logging(loglevel="normal")
+
+
+def test_get_rdef_builtin_names():
+    assert get_rdef.get_rdef("pod")["kind"] == "Pod"
+    assert get_rdef.get_rdef("Pods")["kind"] == "Pod"
+    assert get_rdef.get_rdef("co")["kind"] == "ClusterOperator"
+    assert get_rdef.get_rdef("clusteroperators.config.openshift.io")["kind"] == "ClusterOperator"
+    assert get_rdef.get_rdef("clusteroperators.config")["kind"] == "ClusterOperator"
+    assert get_rdef.get_rdef("clusteroperators.openshift") is None
+    assert get_rdef.get_rdef("nosuchresource") is None
+
+
+def test_get_rdef_generated_reloaded_on_change(tmpdir, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmpdir))
+    rdefs_f = os.path.join(str(tmpdir), ".omg.rdefs")
+    assert get_rdef.get_rdef("widget") is None
+
+    with open(rdefs_f, "w") as rdf:
+        yaml.dump([{
+            "kind": "Widget", "singular": "widget", "plural": "widgets",
+            "group": "example.com", "scope": "Namespaced", "shortNames": ["wd"],
+        }], rdf)
+    assert get_rdef.get_rdef("wd")["kind"] == "Widget"
+    assert get_rdef.get_rdef("widgets.example")["kind"] == "Widget"
+
+    os.remove(rdefs_f)
+    assert get_rdef.get_rdef("widget") is None
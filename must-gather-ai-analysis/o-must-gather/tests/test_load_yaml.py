@@ -0,0 +1,146 @@
+import json
+import yaml
+from omg.utils.load_yaml import load_yaml, SafeLoader
+from omg.config.logging import setup_logging
+
+
+setup_logging(loglevel="normal")
+
+
+def _pod(i):
+    pod = {
+        "apiVersion": "v1",
+        "kind": "Pod",
+        "metadata": {
+            "name": "pod-{}".format(i),
+            "namespace": "ns-{}".format(i % 40),
+            "labels": {"app": "app-{}".format(i % 7), "pod-template-hash": "5d8f7c{}".format(i)},
+            "creationTimestamp": "2024-03-05T10:00:00Z",
+        },
+        "spec": {
+            "nodeName": "worker-{}".format(i % 5),
+            "containers": [
+                {
+                    "name": "c{}".format(c),
+                    "image": "quay.io/openshift/app:{}".format(i),
+                    "args": ["--port=8080", "--v=2"],
+                    "resources": {"requests": {"cpu": "10m", "memory": "50Mi"}},
+                }
+                for c in range(3)
+            ],
+        },
+        "status": {
+            "phase": "Running",
+            "conditions": [
+                {"type": t, "status": "True", "lastTransitionTime": "2024-03-05T10:00:0{}Z".format(n)}
+                for n, t in enumerate(["Initialized", "Ready", "ContainersReady", "PodScheduled"])
+            ],
+            "containerStatuses": [
+                {"name": "c{}".format(c), "ready": True, "restartCount": i % 3, "state": {"running": {}}}
+                for c in range(3)
+            ],
+        },
+    }
+    # Long JSON annotations are dumped as multi-line quoted scalars
+    pod["metadata"]["annotations"] = {
+        "kubectl.kubernetes.io/last-applied-configuration": json.dumps(pod["spec"])
+    }
+    return pod
+
+
+def _event(i):
+    return {
+        "apiVersion": "v1",
+        "kind": "Event",
+        "metadata": {"name": "pod-{}.17b9".format(i), "namespace": "ns-{}".format(i % 40)},
+        "involvedObject": {"kind": "Pod", "name": "pod-{}".format(i), "namespace": "ns-{}".format(i % 40)},
+        "reason": "Unhealthy",
+        "type": "Warning",
+        "message": "Readiness probe failed: {}".format(json.dumps(
+            {"status": "failure", "checks": ["check-{}-{}".format(i, c) for c in range(40)]})),
+        "lastTimestamp": "2024-03-05T10:00:00Z",
+        "count": i % 9 + 1,
+    }
+
+
+def _list_yaml(items):
+    return yaml.dump({"apiVersion": "v1", "items": items, "kind": "List", "metadata": {"resourceVersion": ""}},
+                     default_flow_style=False)
+
+
+def _reference_load(y_d):
+    """Previous implementation: skip lines from the end until the yaml loads"""
+    try:
+        return yaml.load(y_d, Loader=SafeLoader)
+    except (yaml.scanner.ScannerError, yaml.parser.ParserError):
+        pass
+    while y_d.count("\n") > 1:
+        y_d = y_d[:y_d.rfind("\n")]
+        try:
+            return yaml.load(y_d, Loader=SafeLoader)
+        except (yaml.scanner.ScannerError, yaml.parser.ParserError):
+            pass
+    return None
+
+
+def _write(tmpdir, name, data):
+    yfile = tmpdir.join(name)
+    yfile.write(data)
+    return str(yfile)
+
+
+def test_load_yaml_complete(tmpdir):
+    y_d = _list_yaml([_pod(i) for i in range(3)])
+    assert load_yaml(_write(tmpdir, "pods.yaml", y_d)) == yaml.safe_load(y_d)
+
+
+def test_load_yaml_truncated_list_matches_line_skipping(tmpdir):
+    y_d = _list_yaml([_pod(i) for i in range(4)])
+    # Cut the file at every few bytes inside the items
+    for cut in range(y_d.index("items:"), len(y_d) - 60, 37):
+        truncated = y_d[:cut]
+        assert load_yaml(_write(tmpdir, "pods.yaml", truncated)) == _reference_load(truncated), cut
+
+
+def test_load_yaml_truncated_resource_matches_line_skipping(tmpdir):
+    y_d = yaml.dump(_pod(0), default_flow_style=False)
+    for cut in range(20, len(y_d), 23):
+        truncated = y_d[:cut]
+        assert load_yaml(_write(tmpdir, "pod.yaml", truncated)) == _reference_load(truncated), cut
+
+
+def test_load_yaml_truncated_after_multi_line_scalar(tmpdir):
+    # Prefixes ending inside the scalar of c fail to load, longer ones load again
+    y_d = "a: 1\nb: 2\nc: \"x\n" + "".join("  continued {}\n".format(i) for i in range(11))
+    y_d += "  end\"\n" + "".join("k{}: {}\n".format(i, i) for i in range(8)) + "last: \"cut\n  of"
+    ydata = load_yaml(_write(tmpdir, "config.yaml", y_d))
+    assert ydata == _reference_load(y_d)
+    assert list(ydata) == ["a", "b", "c"] + ["k{}".format(i) for i in range(8)]
+
+
+def test_load_yaml_truncated_list_keeps_partial_item(tmpdir):
+    y_d = _list_yaml([_event(i) for i in range(10)])
+    ydata = load_yaml(_write(tmpdir, "events.yaml", y_d[:y_d.index("pod-7.17b9") + 3]))
+    assert [e["metadata"]["name"] for e in ydata["items"][:7]] == ["pod-{}.17b9".format(i) for i in range(7)]
+    assert len(ydata["items"]) == 8
+    assert "kind" not in ydata
+
+
+def _truncated_list(item_f, n_items, marker):
+    y_d = _list_yaml([item_f(i) for i in range(n_items)])
+    # Truncate inside a multi-line quoted scalar of the last item, as a size limit would
+    return y_d, y_d[:y_d.rindex(marker) + 400]
+
+
+def test_load_yaml_truncated_event_list_recovers_items(tmpdir):
+    y_d, truncated = _truncated_list(_event, 50, "Readiness probe failed")
+    ydata = load_yaml(_write(tmpdir, "events.yaml", truncated))
+    assert ydata["items"][:49] == yaml.safe_load(y_d)["items"][:49]
+    assert ydata == _reference_load(truncated)
+
+
+def test_load_yaml_truncated_pod_list_recovers_items(tmpdir):
+    y_d, truncated = _truncated_list(_pod, 20, "last-applied-configuration")
+    ydata = load_yaml(_write(tmpdir, "pods.yaml", truncated))
+    assert ydata["items"][:19] == yaml.safe_load(y_d)["items"][:19]
+    assert ydata == _reference_load(truncated)
@@ -0,0 +1,110 @@
+import io
+import re
+import random
+import tracemalloc
+from omg.log import stream
+from omg.log.timeline import line_timestamp, normalize_bound
+from omg.config.logging import setup_logging
+
+
+setup_logging(loglevel="normal")
+
+
+def _log_lines(n, seed=0):
+    rnd = random.Random(seed)
+    lines = []
+    for i in range(n):
+        ts = "2021-06-01T{:02d}:{:02d}:{:02d}.{:06d}Z".format(10 + i // 3600 % 10, i // 60 % 60, i % 60, i)
+        lines.append("{} I0601 {} request id={} {}".format(
+            ts, "etcd" if i % 7 == 0 else "apiserver", i, "error: timeout" if i % 13 == 0 else "ok"))
+        if rnd.random() < 0.05:
+            lines.append("    goroutine {} [running]: continuation without timestamp".format(i))
+    return lines
+
+
+def _reference(lines, since=None, until=None, tail=None, grep=None):
+    """Filter the lines one by one"""
+    since_key = normalize_bound(since, "2021-06-01") if since else None
+    until_key = normalize_bound(until, "2021-06-01") if until else None
+    out = []
+    current = None
+    for line in lines:
+        current = line_timestamp(line.encode()) or current
+        if since_key and (current is None or current < since_key):
+            continue
+        if until_key and current is not None and current > until_key:
+            continue
+        if grep and not re.search(grep, line):
+            continue
+        out.append(line)
+    if tail is not None:
+        out = out[len(out) - tail:] if tail > 0 else []
+    return "".join(line + "\n" for line in out)
+
+
+def _stream(log_file, **kwargs):
+    out = io.BytesIO()
+    stream.stream_log(log_file, out=out, **kwargs)
+    return out.getvalue().decode()
+
+
+def test_stream_log_matches_line_filter(tmpdir):
+    lines = _log_lines(3000)
+    log_file = tmpdir.join("current.log")
+    log_file.write("\n".join(lines) + "\n")
+    log_file = str(log_file)
+
+    cases = [
+        {},
+        {"tail": 0}, {"tail": 1}, {"tail": 25}, {"tail": 100000},
+        {"grep": "error"}, {"grep": "^    goroutine"}, {"grep": "id=29[0-9]{2} "}, {"grep": "ok$"}, {"grep": r"ok\s+2021"}, {"grep": "no such line"},
+        {"since": "10:20"}, {"until": "10:20:30"}, {"since": "10:20:05.5", "until": "10:30"},
+        {"since": "2021-06-01T10:49:59Z"}, {"until": "09:00"}, {"since": "11:00"},
+        {"since": "10:10", "until": "10:40", "grep": "etcd", "tail": 5},
+        {"since": "10:10", "tail": 7},
+    ]
+    for kwargs in cases:
+        assert _stream(log_file, **kwargs) == _reference(lines, **kwargs), kwargs
+
+
+def test_stream_log_without_trailing_newline(tmpdir):
+    log_file = tmpdir.join("current.log")
+    log_file.write("2021-06-01T10:00:00Z a\n2021-06-01T10:00:01Z b")
+    assert _stream(str(log_file)) == "2021-06-01T10:00:00Z a\n2021-06-01T10:00:01Z b\n"
+    assert _stream(str(log_file), tail=1) == "2021-06-01T10:00:01Z b\n"
+    assert _stream(str(log_file), grep="a$") == "2021-06-01T10:00:00Z a\n"
+
+    empty = tmpdir.join("empty.log")
+    empty.write("")
+    assert _stream(str(empty), tail=10) == ""
+
+
+class _Sink:
+    """Binary output that only counts what is written"""
+    size = 0
+
+    def write(self, data):
+        self.size += len(data)
+
+    def flush(self):
+        pass
+
+
+def test_stream_log_memory_is_bounded(tmpdir, monkeypatch):
+    monkeypatch.setattr(stream, "CHUNK_SIZE", 64 * 1024)
+    lines = _log_lines(30000)
+    log_file = tmpdir.join("current.log")
+    # ~2MB, many chunks
+    log_file.write("\n".join(lines) + "\n")
+    log_file = str(log_file)
+
+    for kwargs in [{"tail": 100}, {"since": "2021-06-01T10:20:00Z", "until": "10:21"},
+                   {"grep": "id=2999[0-9] "}, {}]:
+        out = _Sink()
+        tracemalloc.start()
+        stream.stream_log(log_file, out=out, **kwargs)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert out.size > 0, kwargs
+        # Memory does not grow with the log (or the output) size
+        assert peak < 3 * stream.CHUNK_SIZE, kwargs
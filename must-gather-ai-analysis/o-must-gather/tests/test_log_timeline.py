@@ -0,0 +1,66 @@
+import os
+from omg.log import timeline
+from omg.config.logging import setup_logging
+
+
+setup_logging(loglevel="normal")
+
+
+def _write_log(tmpdir, ns, pod, lines):
+    log_dir = os.path.join(str(tmpdir), "namespaces", ns, "pods", pod, pod, pod, "logs")
+    os.makedirs(log_dir)
+    log_file = os.path.join(log_dir, "current.log")
+    with open(log_file, "w") as lf:
+        lf.write("\n".join(lines) + "\n")
+    return log_file
+
+
+def test_normalize_bound():
+    assert timeline.normalize_bound("10:42", "2021-06-01") == "2021-06-01T10:42:00.000000000"
+    assert timeline.normalize_bound("2021-06-01T10:42:30.5Z") == "2021-06-01T10:42:30.500000000"
+
+
+def test_window_merges_logs_in_time_order(tmpdir, monkeypatch):
+    monkeypatch.setattr(timeline, "_timeline_dir", os.path.join(str(tmpdir), "index"))
+    monkeypatch.setattr(timeline, "MARK_INTERVAL", 64)
+    etcd = _write_log(tmpdir, "openshift-etcd", "etcd-0", [
+        "2021-06-01T10:{:02d}:00.000000Z etcd line {}".format(minute, minute) for minute in range(0, 60, 2)
+    ])
+    api = _write_log(tmpdir, "openshift-kube-apiserver", "kube-apiserver-0", [
+        "2021-06-01T10:{:02d}:00.000000Z api line {}".format(minute, minute) for minute in range(1, 60, 2)
+    ] + ["  wrapped continuation of the last api line"])
+
+    lines = list(timeline.window(str(tmpdir), [(etcd, "etcd"), (api, "api")], "10:42", "10:47"))
+
+    assert [label for _, label, _ in lines] == ["etcd", "api", "etcd", "api", "etcd", "api"]
+    assert lines[0][2].endswith("etcd line 42")
+    assert lines[-1][2].endswith("api line 47")
+
+    tail = list(timeline.window(str(tmpdir), [(api, "api")], "10:59"))
+    assert tail[-1][2] == "  wrapped continuation of the last api line"
+
+
+def test_merge_streams_in_batches(tmpdir, monkeypatch):
+    monkeypatch.setattr(timeline, "_timeline_dir", os.path.join(str(tmpdir), "index"))
+    monkeypatch.setattr(timeline, "MAX_OPEN_LOGS", 2)
+    logs = [
+        (_write_log(tmpdir, "ns", "pod-{}".format(pod), [
+            "2021-06-01T10:{:02d}:00.000000Z pod {}".format(minute, pod) for minute in range(pod, 60, 5)
+        ]), "pod-{}".format(pod))
+        for pod in range(5)
+    ]
+    opened = []
+    real_open = open
+
+    def counting_open(*args, **kwargs):
+        f = real_open(*args, **kwargs)
+        opened.append(f)
+        assert sum(not o.closed for o in opened) <= 3
+        return f
+
+    monkeypatch.setattr("builtins.open", counting_open)
+    lines = list(timeline.window(str(tmpdir), logs, "10:00", "10:59"))
+
+    assert [ts for ts, _, _ in lines] == sorted(ts for ts, _, _ in lines)
+    assert len(lines) == 60
+    assert lines[7][1] == "pod-2"
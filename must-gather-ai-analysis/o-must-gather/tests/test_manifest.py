@@ -0,0 +1,75 @@
+import os
+from omg.must_gather import manifest
+from omg.must_gather.locate_yamls import locate_yamls, locate_project
+from omg.config.logging import setup_logging
+
+
+setup_logging(loglevel="normal")
+
+RES_TYPES = ["pod", "deployment", "configmap", "node", "co", "project", "secret", "pv"]
+
+
+def _touch(*parts):
+    os.makedirs(os.path.dirname(os.path.join(*parts)), exist_ok=True)
+    with open(os.path.join(*parts), "w") as f:
+        f.write("apiVersion: v1\n")
+
+
+def _make_mg(root):
+    _touch(root, "namespaces", "ns1", "ns1.yaml")
+    _touch(root, "namespaces", "ns1", "core", "pods.yaml")
+    _touch(root, "namespaces", "ns1", "core", "configmaps.yaml")
+    _touch(root, "namespaces", "ns1", "apps", "deployments", "d1.yaml")
+    _touch(root, "namespaces", "ns1", "apps", "deployments", "d2.yaml")
+    _touch(root, "namespaces", "ns1", "pods", "p1", "p1.yaml")
+    # namespace directory without its yaml
+    _touch(root, "namespaces", "ns2", "core", "pods", "p2.yaml")
+    _touch(root, "namespaces", "ns2", "core", "pods", "notes.txt")
+    _touch(root, "cluster-scoped-resources", "core", "nodes", "n1.yaml")
+    _touch(root, "cluster-scoped-resources", "config.openshift.io", "clusteroperators.yaml")
+    return root
+
+
+def _locate_all(root):
+    located = {}
+    for ns in ["ns1", "ns2", "missing", "_all"]:
+        for r_type in RES_TYPES:
+            _, yamls = locate_yamls(root, r_type, ns=ns)
+            located[(ns, r_type)] = sorted(map(str, yamls))
+    for tell in ["names", "paths", "yamls"]:
+        located[tell] = sorted(map(str, locate_project(root, tell)))
+    return located
+
+
+def test_manifest_locates_like_filesystem(tmpdir, monkeypatch):
+    monkeypatch.setattr(manifest, "_manifest_dir", str(tmpdir.join("manifests")))
+    monkeypatch.setattr(manifest, "_cache", {})
+    root = _make_mg(str(tmpdir.join("mg")))
+
+    from_manifest = _locate_all(root)
+    assert manifest._cache[root]["namespaces"]["ns2"]["yaml"] is False
+
+    monkeypatch.setattr(manifest, "get", lambda path: None)
+    assert from_manifest == _locate_all(root)
+
+
+def test_manifest_reused_until_root_changes(tmpdir, monkeypatch):
+    monkeypatch.setattr(manifest, "_manifest_dir", str(tmpdir.join("manifests")))
+    monkeypatch.setattr(manifest, "_cache", {})
+    root = _make_mg(str(tmpdir.join("mg")))
+
+    manifest.refresh(root)
+    assert os.path.isfile(manifest._manifest_file(root))
+
+    # A new process loads the saved manifest without walking the tree
+    monkeypatch.setattr(manifest, "_cache", {})
+    monkeypatch.setattr(manifest, "build", lambda path: (_ for _ in ()).throw(AssertionError("walked")))
+    assert sorted(locate_project(root, "names")) == ["ns1", "ns2"]
+
+    # A new namespace changes the mtime of namespaces/ and the manifest is rebuilt
+    monkeypatch.undo()
+    monkeypatch.setattr(manifest, "_manifest_dir", str(tmpdir.join("manifests")))
+    monkeypatch.setattr(manifest, "_cache", {})
+    _touch(root, "namespaces", "ns3", "ns3.yaml")
+    os.utime(os.path.join(root, "namespaces"), ns=(0, 1))
+    assert sorted(locate_project(root, "names")) == ["ns1", "ns2", "ns3"]
@@ -0,0 +1,96 @@
+import base64
+from omg.machine_config import compare
+from omg.config.logging import setup_logging
+
+
+setup_logging(loglevel="normal")
+
+
+def _data(text):
+    return "data:text/plain;charset=utf-8;base64," + base64.b64encode(text.encode()).decode()
+
+
+def _mc(name, files, kargs=None):
+    return {
+        "kind": "MachineConfig",
+        "metadata": {"name": name},
+        "spec": {
+            "kernelArguments": kargs or [],
+            "config": {
+                "storage": {
+                    "files": [
+                        {"path": p, "contents": {"source": _data(c)}, "mode": 420}
+                        for p, c in files.items()
+                    ]
+                }
+            },
+        },
+    }
+
+
+def _patch_load(monkeypatch, mcs):
+    calls = []
+
+    def get_all_resources(objects):
+        calls.append(objects)
+        return {0: {"machineconfig": [{"res": mc} for mc in mcs]}}
+
+    monkeypatch.setattr(compare, "get_all_resources", get_all_resources)
+    return calls
+
+
+def test_mc_diff_lists(capsys):
+    base = _mc("base", {"/etc/a": "a\n", "/etc/b": "b\n"}, ["quiet"])
+    other = _mc("other", {"/etc/b": "b\n", "/etc/c": "c\n"}, ["quiet", "nosmt"])
+    compare.mc_diff(base, other, ("base", "other"))
+    out = capsys.readouterr().out
+
+    assert "[-REMOVED] metadata -> name" not in out
+    assert "[*CHANGE] metadata -> name" in out
+    assert "[-REMOVED] spec -> config -> storage -> files -> /etc/a" in out
+    assert "[+ADDED] spec -> config -> storage -> files -> /etc/c" in out
+    assert "/etc/b" not in out
+    assert "[+ADDED] spec -> kernelArguments" in out
+
+
+def test_mc_diff_show_contents(capsys):
+    base = _mc("base", {"/etc/a": "one\ntwo\nthree\n"})
+    other = _mc("base", {"/etc/a": "one\n2\nthree\n"})
+    compare.mc_diff(base, other, ("base", "other"), show_contents=True)
+    out = capsys.readouterr().out
+
+    assert "[*CHANGE] spec -> config -> storage -> files -> /etc/a -> contents -> source" in out
+    lines = [x.strip() for x in out.splitlines()]
+    assert "--- base" in lines
+    assert "+++ other" in lines
+    assert "-two" in lines
+    assert "+2" in lines
+
+
+def test_mc_compare_loads_once(monkeypatch, capsys):
+    mcs = [
+        _mc("base", {"/etc/a": "a\n"}),
+        _mc("same", {"/etc/a": "a\n"}),
+        _mc("changed", {"/etc/a": "b\n"}),
+    ]
+    calls = _patch_load(monkeypatch, mcs)
+    compare.mc_compare(("base", "same", "changed"), False)
+    out = capsys.readouterr().out
+
+    assert calls == [{"mc": []}]
+    assert "=== base vs same ===" in out
+    assert "=== base vs changed ===" in out
+    changed = out.split("=== base vs changed ===")[1]
+    assert "files -> /etc/a -> contents -> source" in changed
+    assert "/etc/a" not in out.split("=== base vs changed ===")[0]
+
+
+def test_mc_compare_errors(monkeypatch):
+    _patch_load(monkeypatch, [_mc("base", {}), _mc("dup", {}), _mc("dup", {})])
+    for names in [("base",), ("base", "missing"), ("base", "dup")]:
+        try:
+            compare.mc_compare(names, False)
+        except SystemExit as e:
+            assert e.code == 1
+        else:
+            raise AssertionError(names)
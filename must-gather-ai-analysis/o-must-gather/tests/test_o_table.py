@@ -0,0 +1,48 @@
+from tabulate import tabulate
+
+from omg.config.logging import setup_logging
+from omg.get.output.o_table import print_plain
+from omg.get.output.build_table import build_table, table_columns
+from omg.get.output.table_modules import Pod
+
+setup_logging(loglevel="normal")
+
+ROWS = [
+    ["NAME", "READY", "STATUS", "RESTARTS", "AGE"],
+    ["etcd-master-0", "4/4", "Running", 0, "3d"],
+    ["installer-7", "0/1", "Completed", None, " 12h "],
+    ["x", "1/1", "Running", 12, "5m"],
+]
+
+
+def test_print_plain_matches_tabulate(capsys):
+    print_plain(ROWS)
+    assert capsys.readouterr().out == tabulate(ROWS, tablefmt="plain") + "\n"
+
+
+def test_print_plain_widens_after_window(capsys):
+    print_plain(ROWS + [["a-much-longer-pod-name", "1/1", "Running", 0, "1s"]], window=2)
+    lines = capsys.readouterr().out.splitlines()
+    # The first window is aligned on its own widths
+    assert lines[0] == "NAME           READY  STATUS   RESTARTS  AGE"
+    # Later rows only widen the columns they overflow
+    assert lines[-1] == "a-much-longer-pod-name  1/1    Running    0         1s"
+
+
+def _pod(name):
+    return {
+        "rdef": {"kind": "Pod", "scope": "Namespaced", "group": "core", "singular": "pod"},
+        "res": {"metadata": {"name": name, "namespace": "ns1"}},
+        "yfile_ts": None,
+    }
+
+
+def test_table_columns_do_not_leak_between_calls():
+    rdef = _pod("p1")["rdef"]
+    header, _ = table_columns(rdef, "_all", "wide", True, True)
+    assert header[0] == "NAMESPACE" and header[-1] == "LABELS"
+
+    table = build_table([_pod("p1")], "ns1", None, False, False)
+    assert table[0] == list(Pod.DEFAULT_COLUMNS)
+    assert table[1][0] == "p1"
+    assert Pod.DEFAULT_COLUMNS["NAME"] is None
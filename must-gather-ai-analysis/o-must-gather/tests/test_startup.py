@@ -0,0 +1,33 @@
+import sys
+import subprocess
+
+# Modules that belong to individual subcommands and must not be imported
+# just to start the CLI or to run a completion callback
+LAZY_MODULES = [
+    "omg.get.get",
+    "omg.get.output.o_table",
+    "omg.log.log",
+    "omg.use.use",
+    "omg.whoami.whoami",
+    "omg.components.ceph.ceph",
+    "omg.components.etcdctl.etcdctl",
+    "omg.machine_config.compare",
+    "omg.machine_config.extract",
+    "tabulate",
+    "dateutil",
+]
+
+
+def _run(code):
+    return subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+
+
+def test_cli_import_is_lazy():
+    loaded = _run(
+        "import sys, omg.cli; "
+        "print('\\n'.join(m for m in {} if m in sys.modules))".format(LAZY_MODULES)
+    ).split()
+    assert loaded == []
+
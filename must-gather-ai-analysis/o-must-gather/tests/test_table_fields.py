@@ -0,0 +1,52 @@
+import ast
+import glob
+import os
+from omg.config.logging import setup_logging
+from omg.get.output import build_table
+from omg.must_gather.load_resources import _project
+
+
+setup_logging(loglevel="normal")
+
+TABLE_MODULES = os.path.join(os.path.dirname(build_table.__file__), "table_modules")
+
+
+def _dget_res_paths(source):
+    """Key paths of all dget(x, ["res", ...]) calls in source"""
+    paths = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Call) and getattr(node.func, "id", None) == "dget":
+            keys = node.args[1]
+            if isinstance(keys, ast.List) and keys.elts and getattr(keys.elts[0], "value", None) == "res":
+                paths.add(tuple(k.value for k in keys.elts[1:]))
+    return paths
+
+
+def test_table_modules_declare_the_fields_they_read():
+    for module in sorted(glob.glob(os.path.join(TABLE_MODULES, "*.py"))):
+        kind = os.path.basename(module)[:-3]
+        with open(module) as m_f:
+            used = _dget_res_paths(m_f.read())
+        fields = [tuple(f) for f in build_table.table_fields(kind)]
+        for path in used:
+            assert any(path[:len(f)] == f for f in fields), "{}: {}".format(kind, path)
+
+
+def test_table_fields_without_module():
+    assert build_table.table_fields("NoSuchKind") == build_table.COMMON_FIELDS
+
+
+def test_project():
+    pod = {
+        "kind": "Pod",
+        "metadata": {"name": "p1", "managedFields": [{"manager": "kubelet"}]},
+        "spec": {"containers": [{"name": "c1"}], "volumes": [{"name": "v1"}]},
+        "status": "not-a-dict",
+    }
+    fields = [["kind"], ["metadata", "name"], ["spec", "containers"],
+              ["status", "phase"], ["metadata", "labels"]]
+    assert _project(pod, fields) == {
+        "kind": "Pod",
+        "metadata": {"name": "p1"},
+        "spec": {"containers": [{"name": "c1"}]},
+    }